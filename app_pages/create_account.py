@@ -0,0 +1,33 @@
+"""Account sign-up page."""
+import streamlit as st
+
+from services.auth import create_user_account
+from services.ui import navigate_to
+
+st.title("Create Account")
+st.write("Fill in the details below to create a new account.")
+
+with st.form(key="create_account_form"):
+    new_school_id = st.text_input("School ID", placeholder="Enter your school ID")
+    new_password = st.text_input("Password", placeholder="Enter your password", type="password")
+    confirm_password = st.text_input("Confirm Password", placeholder="Re-enter your password", type="password")
+    email = st.text_input("Email", placeholder="Enter your email address")
+    school_name = st.text_input("School Name", placeholder="Enter your school name")
+    logo_file = st.file_uploader("Upload School Logo (Optional)", type=["png", "jpg", "jpeg"])
+
+    submitted = st.form_submit_button("Create Account")
+    if submitted:
+        if new_password != confirm_password:
+            st.error("Passwords do not match. Please try again.")
+        elif not new_school_id or not new_password or not email or not school_name:
+            st.error("All fields except the logo are required. Please fill in all the details.")
+        else:
+            success, message = create_user_account(new_school_id, new_password, email, school_name, logo_file)
+            if success:
+                st.success(message)
+                navigate_to('login')
+            else:
+                st.error(message)
+
+if st.button("⮜ Back to Login", key="back_to_login_from_create"):
+    navigate_to('login')
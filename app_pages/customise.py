@@ -0,0 +1,341 @@
+"""Report page: the general PDF report, the custom report builder and feedback."""
+from datetime import date, datetime
+
+import pandas as pd
+import streamlit as st
+
+from services.assets import APNAPAN_LOGO_PATH, load_static_asset
+from services.auth import get_school_details
+from services.feedback import get_feedback_writer
+from services.processing import DEMOGRAPHIC_GROUPS, first_indexed_column, get_crosstab_cube
+# Report libraries are loaded on the first visit to this page only
+from services.reporting import CHART_BACKENDS, demographic_pie_images, generate_custom_pdf, generate_pdf
+from services.ui import navigate_to, render_page_header
+
+render_page_header()
+st.header("Report Generation:")
+st.write("Here you can generate a general report and you can also select categories and custom options for your report!")
+ 
+# Initialize state for PDF generation to prevent re-generation on every interaction
+if 'pdf_buffer' not in st.session_state:
+    st.session_state.pdf_buffer = None
+
+# ---- pull from session_state (no hardcoded numbers) ----
+df_cleaned          = st.session_state.get("df_cleaned", None)
+matched_questions   = st.session_state.get("matched_questions", {})
+category_averages   = st.session_state.get("category_averages", {})
+overall_belonging   = st.session_state.get("overall_belonging_score", None)
+highest_area        = st.session_state.get("highest_area", None)
+lowest_area         = st.session_state.get("lowest_area", None)
+column_index        = st.session_state.get("column_index", {})
+aggregate_cube      = st.session_state.get("aggregate_cube", {})
+# Hash of the uploaded file, so charts of an unchanged dataset come from the chart cache
+dataset_key         = st.session_state.get("processed_fingerprint", None)
+ 
+# ---- Fetch school details for the report ----
+school_name = "your school" # Default
+school_logo = None
+if 'logged_in_user' in st.session_state:
+    school_id = st.session_state['logged_in_user']
+    name, logo = get_school_details(school_id)
+    if name:
+        school_name = name
+    if logo:
+        school_logo = logo
+# Logo is read and encoded once per server process
+apnapan_logo = load_static_asset(APNAPAN_LOGO_PATH)
+
+date_today  = date.today().strftime("%d %B, %Y")
+n_students  = int(df_cleaned.shape[0]) if isinstance(df_cleaned, pd.DataFrame) else 0
+
+# Charts are embedded as 200-dpi images or drawn natively in the PDF (much smaller files)
+CHART_BACKEND_LABELS = {"raster": "Images", "vector": "Vector (smaller PDF)"}
+
+colA, colB = st.columns([1, 1])
+with colA:
+    general_chart_backend = st.radio(
+        "Chart format", CHART_BACKENDS, format_func=CHART_BACKEND_LABELS.get,
+        horizontal=True, key="general_chart_backend"
+    )
+    # The "Generate" button is the primary action. It creates the PDF and stores it in state.
+    if st.button("Generate General Report", use_container_width=True, key="generate_report"):
+        with st.spinner("Generating your report..."):
+            # Gender and religion pies are only drawn for the report, and reused while the data is unchanged
+            gender_pie_buf, religion_pie_buf = demographic_pie_images(
+                df_cleaned, column_index, dataset_key, general_chart_backend
+            )
+            st.session_state.pdf_buffer = generate_pdf(
+                school_name, school_logo, apnapan_logo, category_averages, overall_belonging,
+                highest_area, lowest_area, date_today, n_students, gender_pie_buf, religion_pie_buf
+            )
+
+    # If a report has been generated, show the download button.
+        if st.session_state.get('pdf_buffer'):
+         st.markdown('<div class="report-download-button">', unsafe_allow_html=True)
+         st.download_button(
+            label="Download Report",
+            data=st.session_state.pdf_buffer,
+            use_container_width=True,
+            file_name="Apnapan_Pulse_Report.pdf",
+            mime="application/pdf"
+        )
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+with colB:
+    if st.button("Customise your report", use_container_width=True):
+        st.session_state['show_custom_options'] = True
+        st.rerun()
+
+# Custom report options section
+if st.session_state.get('show_custom_options', False):
+    st.markdown("---")
+    st.subheader(" Custom Report Configuration")
+    
+    # Step 1: Select construct
+    st.markdown("#### Step 1: Select Construct")
+    available_constructs = list(matched_questions.keys()) if matched_questions else []
+    
+    if not available_constructs:
+        st.warning("No constructs available. Please ensure your data has been processed.")
+        st.session_state['show_custom_options'] = False
+    else:
+        selected_construct = st.selectbox(
+            "Choose which construct you want to focus on:",
+            options=available_constructs,
+            key="custom_construct_select"
+        )
+        
+        if selected_construct:
+            st.info(f"Selected construct: **{selected_construct}**")
+            
+            # Step 2: Select demographic breakdowns
+            st.markdown("#### Step 2: Select Charts to Include")
+            st.write("Choose which demographic breakdowns you want to include in your custom report:")
+            
+            # Available demographic options (matching your visualization code)
+            demographic_options = {
+                "Gender Distribution": {
+                    "type": "demographic_pie",
+                    "description": "Pie chart showing gender distribution of respondents",
+                    "demographic": "Gender"
+                },
+                "Religion Distribution": {
+                    "type": "demographic_pie", 
+                    "description": "Pie chart showing religion distribution of respondents",
+                    "demographic": "Religion"
+                },
+                "Grade Distribution": {
+                    "type": "demographic_pie",
+                    "description": "Pie chart showing grade distribution of respondents",
+                    "demographic": "Grade"
+                },
+                f"{selected_construct} by Gender": {
+                    "type": "construct_vs_demographic",
+                    "description": f"Bar chart showing {selected_construct} scores by gender",
+                    "demographic": "Gender"
+                },
+                f"{selected_construct} by Grade": {
+                    "type": "construct_vs_demographic", 
+                    "description": f"Bar chart showing {selected_construct} scores by grade",
+                    "demographic": "Grade"
+                },
+                f"{selected_construct} by Religion": {
+                    "type": "construct_vs_demographic",
+                    "description": f"Bar chart showing {selected_construct} scores by religion", 
+                    "demographic": "Religion"
+                },
+                f"{selected_construct} by Income Status": {
+                    "type": "construct_vs_demographic",
+                    "description": f"Bar chart showing {selected_construct} scores by income status",
+                    "demographic": "Income Status"
+                },
+                f"{selected_construct} by Ethnicity": {
+                    "type": "construct_vs_demographic",
+                    "description": f"Bar chart showing {selected_construct} scores by ethnicity",
+                    "demographic": "Ethnicity"
+                },
+                f"{selected_construct} by Health Condition": {
+                    "type": "construct_vs_demographic",
+                    "description": f"Bar chart showing {selected_construct} scores by health condition",
+                    "demographic": "Health Condition"
+                },
+                f"Gender Breakdown (Percentage)": {
+                    "type": "percentage_breakdown",
+                    "description": f"Stacked bar chart showing percentage breakdown of {selected_construct} responses by gender",
+                    "demographic": "Gender"
+                }
+            }
+            
+            # Create checkboxes for each chart option
+            selected_charts = {}
+            
+            # Group charts by type for better organization
+            st.markdown("**Demographic Overview Charts:**")
+            demo_cols = st.columns(3)
+            demo_idx = 0
+            for chart_name, chart_info in demographic_options.items():
+                if chart_info["type"] == "demographic_pie":
+                    with demo_cols[demo_idx % 3]:
+                        selected_charts[chart_name] = st.checkbox(
+                            chart_name,
+                            key=f"chart_{chart_name}",
+                            help=chart_info["description"]
+                        )
+                    demo_idx += 1
+            
+            st.markdown("**Construct vs Demographics Charts:**")
+            construct_cols = st.columns(2)
+            construct_idx = 0
+            for chart_name, chart_info in demographic_options.items():
+                if chart_info["type"] == "construct_vs_demographic":
+                    with construct_cols[construct_idx % 2]:
+                        selected_charts[chart_name] = st.checkbox(
+                            chart_name,
+                            key=f"chart_{chart_name}",
+                            help=chart_info["description"]
+                        )
+                    construct_idx += 1
+            
+            st.markdown("**Advanced Analysis:**")
+            for chart_name, chart_info in demographic_options.items():
+                if chart_info["type"] == "percentage_breakdown":
+                    selected_charts[chart_name] = st.checkbox(
+                        chart_name,
+                        key=f"chart_{chart_name}",
+                        help=chart_info["description"]
+                    )
+
+            # Two-way table for any pair of demographics
+            group_labels = [label for label in DEMOGRAPHIC_GROUPS if first_indexed_column(column_index, "demographics", label)]
+            crosstab_labels = None
+            if len(group_labels) >= 2:
+                include_crosstab = st.checkbox(
+                    f"{selected_construct} by two demographics (table)",
+                    key="chart_crosstab",
+                    help=f"Table of average {selected_construct} scores for every combination of two demographics' groups"
+                )
+                if include_crosstab:
+                    rows_slot, columns_slot = st.columns(2)
+                    row_label = rows_slot.selectbox("Rows", group_labels, key="crosstab_rows")
+                    column_label = columns_slot.selectbox(
+                        "Columns", [label for label in group_labels if label != row_label], key="crosstab_columns"
+                    )
+                    crosstab_labels = (row_label, column_label)
+            
+            # Step 3: Generate custom report
+            st.markdown("#### Step 3: Generate Custom Report")
+            
+            # Show summary of selections
+            selected_chart_names = [name for name, selected in selected_charts.items() if selected]
+            if selected_chart_names or crosstab_labels:
+                st.success(f"**Selected Charts:** {len(selected_chart_names)} chart(s)"
+                           + (f" and a {crosstab_labels[0]} × {crosstab_labels[1]} table" if crosstab_labels else ""))
+                with st.expander("View selected charts"):
+                    for chart_name in selected_chart_names:
+                        st.write(f"• {chart_name}")
+                    if crosstab_labels:
+                        st.write(f"• {selected_construct} by {crosstab_labels[0]} and {crosstab_labels[1]}")
+            else:
+                st.warning("Please select at least one chart to include in your custom report.")
+            
+            custom_chart_backend = st.radio(
+                "Chart format", CHART_BACKENDS, format_func=CHART_BACKEND_LABELS.get,
+                horizontal=True, key="custom_chart_backend"
+            )
+
+            # Generate button
+            col_gen, col_cancel = st.columns([1, 1])
+            
+            with col_gen:
+                if st.button("Generate Custom Report", 
+                           use_container_width=True, 
+                           disabled=len(selected_chart_names) == 0 and not crosstab_labels,
+                           key="generate_custom_report"):
+                    
+                    # Store custom report configuration in session state
+                    st.session_state['custom_report_config'] = {
+                        'construct': selected_construct,
+                        'selected_charts': selected_chart_names,
+                        'chart_options': demographic_options
+                    }
+                    
+                    with st.spinner("Generating your custom report..."):
+                        # Generate custom PDF
+                        custom_pdf_buffer = generate_custom_pdf(
+                            school_name, 
+                            school_logo, 
+                            apnapan_logo,
+                            selected_construct,
+                            selected_chart_names,
+                            demographic_options,
+                            df_cleaned,
+                            matched_questions,
+                            column_index,
+                            category_averages,
+                            overall_belonging,
+                            date_today,
+                            n_students,
+                            aggregate_cube,
+                            dataset_key,
+                            custom_chart_backend,
+                            crosstab_labels=crosstab_labels,
+                            crosstab_cube=get_crosstab_cube(dataset_key, df_cleaned, column_index, matched_questions)
+                            if crosstab_labels else None
+                        )
+                        st.session_state.custom_pdf_buffer = custom_pdf_buffer
+                    
+                    if st.session_state.get('custom_pdf_buffer'):
+                        st.markdown('<div class="report-download-button">', unsafe_allow_html=True)
+                        st.download_button(
+                            label="Download Custom Report",
+                            data=st.session_state.custom_pdf_buffer,
+                            use_container_width=True,
+                            file_name=f"Apnapan_Custom_Report_{selected_construct.replace(' ', '_')}.pdf",
+                            mime="application/pdf"
+                        )
+                        st.markdown('</div>', unsafe_allow_html=True)
+            
+            with col_cancel:
+                if st.button("Cancel", use_container_width=True, key="cancel_custom"):
+                    st.session_state['show_custom_options'] = False
+                    st.rerun()
+
+
+cA, cB = st.columns([1, 1])
+with cA:
+     if st.button("⮜ Back to Data Tables", use_container_width=True):
+        navigate_to('data_table')
+with cB:
+    # clicking sets a flag that opens the expander automatically below
+    # ---- Feedback section ----
+    if "show_feedback_form" not in st.session_state:
+        st.session_state["show_feedback_form"] = False
+
+    # Feedback button logic
+    if st.button("Feedback", use_container_width=True, key="feedback_button_main"):
+        st.session_state["show_feedback_form"] = not st.session_state["show_feedback_form"]
+
+    # Feedback form (conditionally displayed)
+if st.session_state["show_feedback_form"]:
+     st.write("### Feedback")
+     feedback = st.text_area("Flag any issues or suggestions", key="feedback_text_area")
+     try:
+         pending_feedback = get_feedback_writer().queue_depth()
+     except Exception:  # Only informational; Submit reports a failing Sheets connection
+         pending_feedback = 0
+     if pending_feedback:
+         st.caption(f"{pending_feedback} earlier feedback entr{'y is' if pending_feedback == 1 else 'ies are'} still being sent.")
+     if st.button("Submit Feedback", key="submit_feedback_button"):
+        if feedback:
+            try:
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                get_feedback_writer().submit([timestamp, feedback])  # Sent to the sheet in the background
+                st.success("Thank you! Your feedback has been recorded.")
+                st.session_state["show_feedback_form"] = False  # Close the form after submission
+            except Exception as e:
+                st.error(f"Failed to send feedback: {e}")
+        else:
+            st.warning("Please enter some feedback before submitting.")
+
+with st.expander("Need Help?"):
+         st.write("Contact us at Email: projectapnapan@gmail.com")
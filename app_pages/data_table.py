@@ -0,0 +1,72 @@
+"""Data tables: preview, matched questions, averages and the summary of the cleaned data."""
+import pandas as pd
+import streamlit as st
+
+from services.ui import navigate_to, render_page_header
+
+render_page_header()
+            
+st.header(" Data Tables")
+
+ # ---- pull from session_state (no hardcoded numbers) ----
+df_cleaned          = st.session_state.get("df_cleaned", None)
+matched_questions   = st.session_state.get("matched_questions", {})
+category_averages   = st.session_state.get("category_averages", {})
+overall_belonging   = st.session_state.get("overall_belonging_score", None)
+highest_area        = st.session_state.get("highest_area", None)
+lowest_area         = st.session_state.get("lowest_area", None)
+
+
+# ---- Tables (as you had) ----
+st.write("### Data Preview")
+if "preview_table" in st.session_state:
+    st.dataframe(st.session_state["preview_table"])
+else:
+    st.info("No preview table saved yet.")
+
+st.write("### Matched Questions")
+if "matched_questions_table" in st.session_state:
+    st.dataframe(st.session_state["matched_questions_table"])
+else:
+    # build once if not saved
+    if isinstance(matched_questions, dict) and matched_questions:
+        mq_df = pd.DataFrame.from_dict(matched_questions, orient="index").T.fillna("")
+        st.session_state["matched_questions_table"] = mq_df
+        st.dataframe(mq_df)
+    else:
+        st.info("No matched questions available.")
+
+st.write("### Category Averages")
+if category_averages:
+    averages_df = pd.DataFrame.from_dict(category_averages, orient="index", columns=["Average Score"]).round(2)
+    st.dataframe(averages_df)
+    st.session_state["category_averages_table"] = averages_df
+else:
+    st.info("No category averages available.")
+
+st.write("### Belonging Score by Group")
+group_belonging_scores = st.session_state.get("group_belonging_scores", {})
+if group_belonging_scores:
+    for label, group_df in group_belonging_scores.items():
+        st.write(f"**{label}**")
+        st.dataframe(group_df)
+else:
+    st.info("No demographic groups available.")
+
+if isinstance(df_cleaned, pd.DataFrame) and not df_cleaned.empty:
+    summary = df_cleaned.describe()
+    st.write("### Summary Table ")
+    st.dataframe(summary)
+    st.session_state["summary_table"] = summary
+else:
+    st.info("No cleaned data available.")
+
+
+
+colA, colB = st.columns([1, 1])
+with colA:
+    if st.button("⮜ Back to Visualisations", use_container_width=True):
+        navigate_to('visualisations')
+with colB:
+    if st.button(" Go to Report Generation  ⮞" , use_container_width=True):
+        navigate_to('customise')
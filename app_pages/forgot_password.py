@@ -0,0 +1,68 @@
+"""Two-step password reset: verify the school ID and email, then set a new password."""
+import streamlit as st
+
+from services.auth import update_user_password, validate_reset_request
+from services.ui import navigate_to
+
+st.title("Reset Your Password")
+
+# Initialize state for the multi-step form
+if 'reset_step' not in st.session_state:
+    st.session_state.reset_step = 1
+if 'reset_school_id' not in st.session_state:
+    st.session_state.reset_school_id = None
+
+# Step 1: Verify User
+if st.session_state.reset_step == 1:
+    st.write("Enter your School ID and registered email to verify your account.")
+    with st.form(key="verify_user_form"):
+        school_id = st.text_input("School ID", placeholder="Enter your school ID")
+        email = st.text_input("Registered Email", placeholder="Enter the email you signed up with")
+        
+        submitted = st.form_submit_button("Verify Account")
+        if submitted:
+            if not school_id or not email:
+                st.error("Please enter both your School ID and email address.")
+            else:
+                success, message = validate_reset_request(school_id, email)
+                if success:
+                    st.session_state.reset_school_id = school_id
+                    st.session_state.reset_step = 2
+                    st.success(message)
+                    st.rerun()
+                else:
+                    st.error(message)
+
+# Step 2: Set New Password
+elif st.session_state.reset_step == 2:
+    st.write(f"Account verified for School ID: **{st.session_state.reset_school_id}**")
+    st.write("You can now set a new password.")
+    with st.form(key="set_new_password_form"):
+        new_password = st.text_input("New Password", type="password")
+        confirm_password = st.text_input("Confirm New Password", type="password")
+
+        submitted = st.form_submit_button("Set New Password")
+        if submitted:
+            if not new_password or not confirm_password:
+                st.error("Please fill out both password fields.")
+            elif new_password != confirm_password:
+                st.error("Passwords do not match. Please try again.")
+            else:
+                success, message = update_user_password(st.session_state.reset_school_id, new_password)
+                if success:
+                    st.success(message)
+                    st.info("You can now log in with your new password.")
+                    # Reset state and prepare for navigation
+                    del st.session_state.reset_step
+                    del st.session_state.reset_school_id
+                else:
+                    st.error(message)
+
+# Always show the back to login button, but handle state reset
+if st.button("⮜ Back to Login", key="back_to_login_from_forgot"):
+    # Clean up state if user navigates away mid-process
+    if 'reset_step' in st.session_state:
+        del st.session_state.reset_step
+    if 'reset_school_id' in st.session_state:
+        del st.session_state.reset_school_id
+    navigate_to('login')
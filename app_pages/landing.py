@@ -0,0 +1,99 @@
+"""Landing page: how to use the tool and the sample dataset."""
+import streamlit as st
+
+from services.processing import SAMPLE_DATA
+from services.ui import navigate_to, render_page_header
+
+render_page_header()
+
+st.title("Welcome to the Data Insights Generator!")
+st.write("Your journey to understanding students’ experiences begins here.")
+st.write("This easy-to-use tool is designed to help schools uncover meaningful insights about student belonging and well-being. Let’s get started!")
+
+st.markdown(
+"""
+<div style="font-size:1.15rem;">
+    <div style="margin-bottom: 10px;">
+        <span style="font-size:1.25rem; font-weight:700; color:#003366;">Step-1:</span>
+        <span style="font-weight:600;">Upload Your Data</span>
+        <br>
+        <span>
+            Click on the
+            <span style="color:#d7263d; font-weight:bold; background:#fff3cd; padding:2px 6px; border-radius:4px;">Browse File</span>
+            button to upload your survey or student data.
+        </span>
+    </div>
+    <div style="margin-bottom: 10px;">
+        <span style="font-size:1.25rem; font-weight:700; color:#003366;">Step-2:</span>
+        <span style="font-weight:600;"> 
+            Explore the Key metrics</span>
+            <br>
+            <span>Click on the </span><span style="color:#003366; font-weight:bold; background:#e6b0aa; padding:2px 6px; border-radius:4px;"> Go to Key Metrics </span>
+            <span>to instantly view key trends and  metrics in your data.
+        </span>
+    </div>
+    <div style="margin-bottom: 10px;">
+        <span style="font-size:1.25rem; font-weight:700; color:#003366;">Step-3:</span>
+        <span style="font-weight:600;">
+            Discover Group-Level Insights</span>
+            <br>
+            <span>Head to the</span> <span style="color:#003366; font-weight:bold; background:#a3d8d3; padding:2px 6px; border-radius:4px;"> Go to Visualisations </span>
+            section to see how different student groups (based on gender, grade, religion, etc) experience belonging in your school.
+        </span>
+        </div>
+        <div style="margin-bottom: 10px;">
+            <span style="font-size:1.25rem; font-weight:700; color:#003366;">Step-4:</span>
+            <span style="font-weight:600;">
+                Explore Data Tables</span>
+            <br>
+                <span>Click the <span style="color:#003366; font-weight:bold; background:#fdf8b7; padding:2px 6px; border-radius:4px;">Go to data tables</span>
+                button to get access to data tables in one view. 
+            </span>
+        </div>
+        <div style="margin-bottom: 10px;">
+            <span style="font-size:1.25rem; font-weight:700; color:#003366;">Step-5:</span>
+            <span style="font-weight:600;">
+                Download a Custom Report</span>
+            <br>
+                <span>Click the <span style="color:#003366; font-weight:bold; background:#a3d8d3; padding:2px 6px; border-radius:4px;">Report Generation</span>
+                button to get key insights and charts in a customisable PDF format to share with your team!
+            </span>
+        </div>
+    </div>
+    """,
+    unsafe_allow_html=True
+)
+    
+# Show sample data info directly under Step-4
+st.markdown("### Sample Data Preview")
+st.write("""To get the most out of this tool, your data should include:
+    - **Demographic Columns**: e.g., StudentID, Gender, Grade, Religion, Ethnicity
+    - **Socio-Economic Status Indicators**: e.g., What items do you have at home? (Car, Laptop, Apna Ghar, etc.)
+    - **Survey Responses**: e.g., 'Strongly Agree', 'Agree', 'Neutral', 'Disagree', 'Strongly Disagree'
+    """)
+st.write("This tool is designed with care to support schools in building more inclusive, welcoming, and responsive learning environments. We’re excited you’re here!")
+
+show_sample_onboard = st.toggle("Show Sample Data", value=False, key="toggle_sample_onboard")
+if show_sample_onboard:
+    st.markdown("### Expected Data Structure")
+    st.dataframe(SAMPLE_DATA.head())
+st.download_button(
+    label="📥 Download Sample Data",
+    data=SAMPLE_DATA.to_csv(index=False),
+    file_name="sample_data.csv",
+    mime="text/csv"
+)
+
+# Buttons to navigate
+col1, col2 = st.columns([1, 1])
+with col2:
+    if st.button("Start Exploring ⮞", key="start_exploring_button", use_container_width=True):
+        navigate_to('main')
+with col1:
+    if st.button("⮜ Back to Login", key="back_to_login_from_landing", use_container_width=True):
+        # Clear user-specific session state to effectively log out
+        if 'logged_in_user' in st.session_state:
+            del st.session_state['logged_in_user']
+        if 'df_cleaned' in st.session_state:
+            del st.session_state['df_cleaned']
+        navigate_to('login')
@@ -0,0 +1,70 @@
+"""Login page: the entry point for every new session."""
+import streamlit as st
+
+from services.assets import APNAPAN_LOGO_PATH, load_static_asset
+from services.auth import get_school_details, validate_login
+from services.ui import navigate_to
+
+# Logo is read and encoded once per server process
+apnapan_logo = load_static_asset(APNAPAN_LOGO_PATH)
+logo_data_uri = apnapan_logo["data_uri"] if apnapan_logo else ""
+
+# Display title and logo
+st.markdown("<h1 style='text-align: center; color: white;'>Apnapan Pulse</h1>", unsafe_allow_html=True)
+st.markdown(f"""
+<div style="display: flex; justify-content: center; margin-bottom: 30px;">
+    <img src="{logo_data_uri}" alt="Project Apnapan Logo" style="height: 100px;" />
+</div>
+""", unsafe_allow_html=True)
+
+# Login form container
+st.markdown("<div class='login-container'>", unsafe_allow_html=True)
+st.markdown("<h3 style='text-align: center; color: black;'>Log in credentials</h3>", unsafe_allow_html=True)
+
+with st.form(key="login_form"):
+# Center the input fields using columns
+    col1, col2, col3 = st.columns([1, 2, 1])  # Left padding, content, right padding
+    with col2:  # Center the input fields
+        school_id = st.text_input("School ID", placeholder="Enter your school ID", key="school_id")
+        password = st.text_input("Password", placeholder="Enter your security pin", type="password", key="password")
+        
+        login_button = st.form_submit_button("Find your school pulse!", use_container_width=True)
+
+        # Use columns for the other two actions
+        col_b1, col_b2 = st.columns(2)
+        with col_b1:
+            create_account_button = st.form_submit_button("Create Account", use_container_width=True, help="Click to create a new account")
+        with col_b2:
+            forgot_password_button = st.form_submit_button("Forgot Password?", use_container_width=True, help="Click to reset your password")
+
+        if forgot_password_button:
+            navigate_to('forgot_password')
+
+    # Add custom CSS to reduce the size of the "Show Password" text
+    st.markdown("""
+    <style>
+        label[for="password"] {
+            font-size: 12px !important; /* Reduce font size */
+            color: #666 !important; /* Optional: Change color */
+        }
+    </style>
+    """, unsafe_allow_html=True)
+
+    if login_button:
+            success, message = validate_login(school_id, password)
+            if success:
+                st.session_state['logged_in_user'] = school_id  # Store user's ID
+                st.success(message)
+                # Fetch and store school details in session state to avoid repeated API calls
+                with st.spinner("Loading school details..."):
+                    school_name, school_logo = get_school_details(school_id)
+                    st.session_state['school_name'] = school_name
+                    st.session_state['school_logo_data_uri'] = school_logo["data_uri"] if school_logo else ""
+                navigate_to('landing')
+            else:
+                st.error(message)
+
+    if create_account_button:
+        navigate_to('create_account')
+
+st.markdown("</div>", unsafe_allow_html=True)
@@ -0,0 +1,204 @@
+"""Upload page: loads a new file or one from the history and processes it once per session."""
+import re
+from datetime import datetime
+
+import streamlit as st
+
+from services.processing import load_and_process_file
+from services.storage import (
+    download_file_from_mongo, file_content_hash, get_mime_type, list_user_files,
+    load_processed_snapshot, record_file_hash, save_processed_snapshot, stored_file_info,
+    upload_file_to_mongo
+)
+from services.ui import navigate_to, render_page_header
+
+render_page_header()
+
+# Main content starts here
+col1, col2 = st.columns([3, 1])  # Adjust layout for title and other content
+
+with col1:
+    st.title("Data Insights Generator")
+    st.write("Explore your data and generate insights.")
+
+file_source = None  # Track if from upload or history
+
+# File Uploader with History (MongoDB-based)
+if 'logged_in_user' in st.session_state:
+    school_id = st.session_state['logged_in_user']
+    
+    # List history
+    history_files = list_user_files(school_id)
+    if history_files:
+        st.subheader("Upload New File or Select from History")
+
+        # Create display options with timestamps
+        history_options = []
+        for f in history_files:
+            ts = f.get('timestamp')
+            # Ensure timestamp is a datetime object before formatting
+            if isinstance(ts, datetime):
+                display_text = f"{f['filename']} (Uploaded: {ts.strftime('%Y-%m-%d %H:%M')})"
+            else:
+                display_text = f['filename']  # Fallback if no timestamp
+            history_options.append(display_text)
+
+        selected_option = st.selectbox(
+            "Select a previous file",
+            options=["-- New Upload --"] + history_options,
+            help="Choose a previously uploaded file or upload a new one."
+        )
+        
+        if selected_option != "-- New Upload --":
+            # Extract the original filename from the selected option
+            match = re.match(r"^(.*?) \(Uploaded: .*\)$", selected_option)
+            if match:
+                selected_file_name = match.group(1)
+            else:
+                selected_file_name = selected_option # Fallback for old files without timestamp
+            # Load from history. The stored content hash identifies the file, so
+            # reruns and snapshot lookups never need to fetch the raw bytes.
+            history_file = stored_file_info(school_id, selected_file_name)
+            if history_file:
+                file_source = "history"
+                st.success(f"Loaded {selected_file_name} from history.")
+
+                # The file itself is only read from GridFS when asked for
+                st.markdown('<div class="history-download-button">', unsafe_allow_html=True)
+                if st.button(f"Download {selected_file_name}", key="prepare_history_download"):
+                    downloaded_file = download_file_from_mongo(school_id, selected_file_name)
+                    if downloaded_file:
+                        st.download_button(
+                            label=f"Save {selected_file_name}",
+                            data=downloaded_file.read(),
+                            file_name=selected_file_name,
+                            mime=get_mime_type(selected_file_name)
+                        )
+                        downloaded_file.close()
+                st.markdown('</div>', unsafe_allow_html=True)
+            else:
+                st.error("File not found.")
+    else:
+        st.info("No previous files found in your history.")
+
+# Standard Uploader (always show, but if history selected, skip upload)
+if file_source != "history":
+    uploaded_file = st.file_uploader("Choose a file", type=["csv", "xlsx", "xls", "txt"])
+    if uploaded_file:
+        # Hash each uploaded file once; reruns reuse the digest for the history and the processing below
+        upload_hash = st.session_state.get('upload_hash')
+        if upload_hash is None or upload_hash[0] != uploaded_file.file_id:
+            upload_hash = (uploaded_file.file_id, file_content_hash(uploaded_file.getvalue()))
+            st.session_state['upload_hash'] = upload_hash
+        # Upload to MongoDB if logged in. Streamlit reruns this script on every
+        # interaction, so remember which files this session already persisted.
+        if 'logged_in_user' in st.session_state:
+            if 'persisted_uploads' not in st.session_state:
+                st.session_state['persisted_uploads'] = set()
+            upload_key = (school_id, uploaded_file.name, upload_hash[1])
+            if upload_key not in st.session_state['persisted_uploads']:
+                success = upload_file_to_mongo(school_id, uploaded_file, file_hash=upload_hash[1])
+                if success:
+                    st.session_state['persisted_uploads'].add(upload_key)
+                    st.success(f"File uploaded to your history: {uploaded_file.name}")
+        file_source = "upload"
+
+# Process the File (from upload or history)
+if file_source:
+    try:
+        if file_source == "history":
+            file_content = None  # Read from MongoDB below, only if there is no snapshot
+            file_name = selected_file_name
+            # Files stored before hashing are versioned by upload time
+            fingerprint = history_file.get("file_hash") or str(history_file.get("timestamp"))
+        else:
+            file_content = uploaded_file.getvalue()
+            file_name = uploaded_file.name
+            fingerprint = upload_hash[1]
+
+        file_type = file_name.split('.')[-1].lower()
+        if file_type not in ["csv", "txt", "xlsx", "xls"]:
+            st.error("Unsupported file format.")
+            st.stop()
+
+        # --- Centralized Processing: Process Once, Use Many ---
+        # This is the core performance improvement. All calculations happen here, once.
+        # The results are stored in the session state for other pages to use instantly.
+        # Reruns with the same file skip both the processing and the session state rebuild.
+        if st.session_state.get('processed_fingerprint') != fingerprint or 'df_cleaned' not in st.session_state:
+            with st.spinner("Analyzing your data... This may take a moment."):
+                # Clear any previous results to ensure a fresh start
+                keys_to_clear = [
+                    'df_cleaned', 'matched_questions', 'belonging_questions',
+                    'overall_belonging_score', 'category_averages', 'highest_area',
+                    'lowest_area', 'matched_questions_table', 'summary_table',
+                    'category_averages_table', 'preview_table', 'memory_usage',
+                    'group_belonging_scores', 'aggregate_cube', 'cohort_filter'
+                ]
+                for key in keys_to_clear:
+                    if key in st.session_state:
+                        del st.session_state[key]
+
+                # Reopened history files load their stored snapshot and skip parsing and cleaning
+                processing_results = None
+                if file_source == "history":
+                    processing_results = load_processed_snapshot(fingerprint)
+                downloaded_file = None
+                if processing_results is None and file_content is None:
+                    downloaded_file = download_file_from_mongo(school_id, file_name)
+                    if not downloaded_file:
+                        st.stop()
+                    if history_file.get("file_hash"):
+                        file_content = downloaded_file  # Hash already known: stream the stored chunks into the reader
+                    else:
+                        file_content = downloaded_file.read()
+                        fingerprint = file_content_hash(file_content)
+                        # Record the hash so the next reopen finds the snapshot saved under it
+                        record_file_hash(school_id, file_name, fingerprint)
+                        processing_results = load_processed_snapshot(fingerprint)
+                try:
+                    if processing_results is None:
+                        # Process data and calculate all metrics (served from the cache for known files)
+                        processing_results = load_and_process_file(fingerprint, file_type, file_content)
+                        if 'logged_in_user' in st.session_state:
+                            save_processed_snapshot(fingerprint, processing_results)
+                finally:
+                    if downloaded_file is not None:
+                        downloaded_file.close()
+                # Store all results in the session state
+                for key, value in processing_results.items():
+                    st.session_state[key] = value
+                st.session_state['processed_fingerprint'] = fingerprint
+
+        st.write("### Data Preview")
+        col1, col2 = st.columns([8, 2])
+        with col1:
+            show_preview = st.toggle("Show Table", value=True, key="toggle_preview")
+        if show_preview:
+            st.dataframe(st.session_state["preview_table"])
+
+        st.success("Data analysis complete! You can now explore the metrics and visualizations.")
+        memory_usage = st.session_state.get("memory_usage")
+        if memory_usage:
+            st.caption(
+                f"Cleaned data uses {memory_usage['after_bytes'] / 1e6:.1f} MB in memory "
+                f"({memory_usage['saved_bytes'] / 1e6:.1f} MB saved by compact column types)."
+            )
+
+    except Exception as e:
+        st.error(f"Error processing file: {str(e)}")
+        st.stop()
+
+# Ensure a file has been processed before continuing
+if not file_source:
+    st.error("No data available. Please upload a valid file.")
+    st.stop()
+# Detect questionnaire columns dynamically
+
+col1, col2 = st.columns([1, 1])
+with col1:
+    if st.button(" ⮜ Back to Landing page", use_container_width=True):
+        navigate_to('landing')
+with col2:
+    if st.button(" Go to Key Metrics  ⮞", use_container_width=True):
+        navigate_to('metrics')
@@ -0,0 +1,169 @@
+"""Key metrics: the overall belonging score and the construct averages."""
+import streamlit as st
+
+from services.assets import LIKERT_SCALE_MAX_WIDTH, LIKERT_SCALE_PATH, load_static_asset
+from services.cohorts import render_cohort_filter
+from services.ui import navigate_to, render_page_header
+
+# Likert scale image, downsized for display and encoded once per server process
+likert_scale = load_static_asset(LIKERT_SCALE_PATH, max_width=LIKERT_SCALE_MAX_WIDTH)
+
+render_page_header()
+st.header("Key Metrics (Scale of 5)")
+
+# --- Retrieve pre-calculated results from session state ---
+# All calculations are now done on the main page for performance.
+# This page just displays the results.
+overall_belonging_score = st.session_state.get("overall_belonging_score")
+category_averages = st.session_state.get("category_averages", {})
+highest_area = st.session_state.get("highest_area")
+lowest_area = st.session_state.get("lowest_area")
+matched_questions_df = st.session_state.get("matched_questions_table")
+
+# --- Check if data is available ---
+if overall_belonging_score is None:
+    st.warning("No data has been processed yet. Please go to the main page and upload a file.")
+    if st.button("⮜ Back to Upload Page"):
+        st.stop()
+
+# --- Cohort filter: the same metrics for a subset of students ---
+cohort = render_cohort_filter()
+if cohort:
+    overall_belonging_score = cohort["overall_belonging_score"]
+    category_averages = cohort["category_averages"]
+    highest_area = cohort["highest_area"]
+    lowest_area = cohort["lowest_area"]
+
+# Show Likert scale image above the three score cards
+if likert_scale:
+    st.markdown(
+    f'''
+    <div style="display: flex; justify-content: center; align-items: center;">
+        <img src="{likert_scale['data_uri']}" alt="Likert Scale" style="width:70%; max-width:600px; min-width:300px; height:150px; margin-bottom:18px;"/>
+    </div>
+    ''',
+    unsafe_allow_html=True
+)
+# Three-column horizontal layout
+col1, col2, col3 = st.columns(3)
+
+if overall_belonging_score is not None and category_averages:
+    with col1:
+        st.markdown(f"""
+            <div style="background-color:#e6b0aa; border: 4px solid #ff9999; border-radius:10px; padding:1rem; text-align:center;
+                        box-shadow: 0 2px 5px rgba(0,0,0,0.1); color:black; height: 120px; display: flex; flex-direction: column; justify-content: center;">
+                <h4> &#9734; Overall Belonging Score</h4>
+                <h4 style="margin:0;">{overall_belonging_score:.2f}</h4>
+            </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        st.markdown(f"""
+            <div style="background-color:#99ccff; border: 4px solid #A7C7E7; border-radius:10px; padding:0.5rem; text-align:center;
+                        box-shadow: 0 2px 5px rgba(0,0,0,0.1); color:black; height: 120px; display: flex; flex-direction: column; justify-content: center;">
+                <h4 style="font-size: 1.5rem; margin: 0;"> Highest Score: {highest_area} </h4>
+                <h2 style="font-size: 1.5rem; margin: 0;">{category_averages[highest_area]:.2f}</h2>
+            </div>
+        """, unsafe_allow_html=True)
+
+    with col3:
+        if lowest_area is not None:
+            st.markdown(f"""
+                <div style="background-color:#FAC898; border: 4px solid #ffcc00; border-radius:10px; padding:0.5rem; text-align:center;
+                            box-shadow: 0 2px 5px rgba(0,0,0,0.1); color:black; height: 120px; display: flex; flex-direction: column; justify-content: center;">
+                    <h4 style="font-size: 1.5rem; margin: 0;">Lowest Score: {lowest_area}</h4>
+                    <h2 style="font-size: 1.5rem; margin: 0;">{category_averages[lowest_area]:.2f}</h2>
+                </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.markdown(f"""
+                <div style="background-color:#FAC898; border: 4px solid #ffcc00; border-radius:10px; padding:0.5rem; text-align:center;
+                            box-shadow: 0 2px 5px rgba(0,0,0,0.1); color:black; height: 120px; display: flex; flex-direction: column; justify-content: center;">
+                    <h4 style="font-size: 1.5rem; margin: 0;">Lowest Score</h4>
+                    <h2 style="font-size: 1.5rem; margin: 0;">N/A</h2>
+                </div>
+            """, unsafe_allow_html=True)
+st.markdown("<hr style='border: 1px dashed black; border-radius: 5px;'>", unsafe_allow_html=True)
+st.subheader("Category-wise Averages")
+# Two-column layout
+left_col, right_col = st.columns([1, 1])
+
+
+# Right column: Safety, Respect, and Welcome
+with left_col:
+    if category_averages:
+        if "Safety" in category_averages:
+            st.markdown(f"""
+                <div style="background-color:#DFC5FE; border-radius:10px; padding:1rem; text-align:center;
+                            box-shadow: 0 2px 5px rgba(0,0,0,0.1); color:black; width: 100%; height: 120px; display: flex; flex-direction: column; justify-content: center;">
+                    <h4 style="font-size: 1rem; margin: 0;">Safety</h4>
+                    <h2 style="font-size: 1.5rem; margin: 0;"">{category_averages['Safety']:.2f}</h2>
+                </div>
+            """, unsafe_allow_html=True)
+        if "Respect" in category_averages:
+            st.markdown(f"""
+                <div style="background-color:#fdf8b7; border-radius:10px; padding:0.5rem; text-align:center;
+                            box-shadow: 0 2px 5px rgba(0,0,0,0.1); color:black; width: 100%; height: 120px; display: flex; flex-direction: column; justify-content: center; margin-top: 1rem;">
+                    <h4 style="font-size: 1rem; margin: 0;">Respect</h4>
+                    <h2 style="font-size: 1.5rem; margin: 0;">{category_averages['Respect']:.2f}</h2>
+                </div>
+            """, unsafe_allow_html=True)
+        if "Welcome" in category_averages:
+            st.markdown(f"""
+                <div style="background-color:#a3d8d3; border-radius:10px; padding:0.5rem; text-align:center;
+                            box-shadow: 0 2px 5px rgba(0,0,0,0.1); color:black; width: 100%; height: 120px; display: flex; flex-direction: column; justify-content: center; margin-top: 1rem;">
+                    <h4 style="font-size: 1rem; margin: 0;">Welcome</h4>
+                    <h2 style="font-size: 1.5rem; margin: 0;">{category_averages['Welcome']:.2f}</h2>
+                </div>
+            """, unsafe_allow_html=True)
+with right_col:
+    if category_averages:
+        if "Participation" in category_averages:
+            st.markdown(f"""
+                <div style="background-color:#DFC5FE; border-radius:10px; padding:1rem; text-align:center;
+                            box-shadow: 0 2px 5px rgba(0,0,0,0.1); color:black; width: 100%; height: 120px; display: flex; flex-direction: column; justify-content: center;">
+                    <h4 style="font-size: 1rem; margin: 0;">Participation</h4>
+                    <h2 style="font-size: 1.5rem; margin: 0;"">{category_averages['Participation']:.2f}</h2>
+                </div>
+            """, unsafe_allow_html=True)
+        if "Acknowledgement" in category_averages:
+            st.markdown(f"""
+                <div style="background-color:#fdf8b7; border-radius:10px; padding:0.5rem; text-align:center;
+                            box-shadow: 0 2px 5px rgba(0,0,0,0.1); color:black; width: 100%; height: 120px; display: flex; flex-direction: column; justify-content: center; margin-top: 1rem;">
+                    <h4 style="font-size: 1rem; margin: 0;">Acknowledgement</h4>
+                    <h2 style="font-size: 1.5rem; margin: 0;">{category_averages['Acknowledgement']:.2f}</h2>
+                </div>
+            """, unsafe_allow_html=True)
+        if "Relationships with Teachers" in category_averages:
+            st.markdown(f"""
+                <div style="background-color:#a3d8d3; border-radius:10px; padding:0.5rem; text-align:center;
+                            box-shadow: 0 2px 5px rgba(0,0,0,0.1); color:black; width: 100%; height: 120px; display: flex; flex-direction: column; justify-content: center; margin-top: 1rem;">
+                    <h4 style="font-size: 1rem; margin: 0;">Relationships with Teachers</h4>
+                    <h2 style="font-size: 1.5rem; margin: 0;">{category_averages['Relationships with Teachers']:.2f}</h2>
+                </div>
+            """, unsafe_allow_html=True)
+
+
+st.markdown("<hr style='border: 1px dashed black; border-radius: 5px;'>", unsafe_allow_html=True)
+
+# if category_averages:
+#     col1, col2 = st.columns([8, 2])
+#     with col1:
+#         show_averages = st.toggle("Show Table", value=False, key="toggle_averages")
+#     if show_averages:
+#         st.dataframe(pd.DataFrame.from_dict(category_averages, orient="index", columns=["Average Score"]).round(2))
+
+# if not df_cleaned.empty:
+#     summary = df_cleaned.describe()
+#     col1, col2 = st.columns([8, 2])
+#     with col1:
+#         show_summary = st.toggle("Show Summary Table", value=False, key="toggle_summary")
+#     if show_summary:
+#         st.dataframe(summary)
+col1, col2 = st.columns([1, 1])
+with col1:
+ if st.button("⮜ Back to Upload Page", use_container_width=True):
+    navigate_to('main')
+with col2:
+ if st.button("Go to Visualisations  ⮞" , use_container_width=True):
+    navigate_to('visualisations')
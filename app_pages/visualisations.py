@@ -0,0 +1,447 @@
+"""Charts of the demographic overview and of each construct by student group."""
+import pandas as pd
+import plotly.express as px  # Loaded on the first visit to this page only
+import streamlit as st
+
+from services.cohorts import cohort_crosstab_cube, render_cohort_filter
+from services.processing import (
+    DEMOGRAPHIC_GROUPS, crosstab_table, first_indexed_column, get_crosstab_cube, group_means,
+    response_level_percentages, sort_group_values
+)
+from services.ui import navigate_to, render_page_header
+
+render_page_header()
+st.header("Visualization Tab")
+# --- Retrieve previously saved values into the same variable names ---
+df_cleaned = st.session_state.get("df_cleaned", None)
+matched_questions = st.session_state.get("matched_questions", {})
+
+belonging_questions = st.session_state.get("belonging_questions", {})
+overall_belonging_score = st.session_state.get("overall_belonging_score", None)
+category_averages = st.session_state.get("category_averages", {})
+highest_area = st.session_state.get("highest_area", None)
+lowest_area = st.session_state.get("lowest_area", None)
+column_index = st.session_state.get("column_index", {})
+aggregate_cube = st.session_state.get("aggregate_cube", {})
+
+# --- Cohort filter: charts for a subset of students ---
+cohort = render_cohort_filter()
+if cohort:
+    df_cleaned = df_cleaned[cohort["mask"]]
+    aggregate_cube = cohort["aggregate_cube"]
+
+# Cache key of the students shown: the dataset, narrowed to the cohort when a filter is set
+view_key = (st.session_state.get("processed_fingerprint"), cohort["key"] if cohort else None)
+# Demographics with a matched column, in DEMOGRAPHIC_GROUPS order
+group_labels = [label for label in DEMOGRAPHIC_GROUPS if first_indexed_column(column_index, "demographics", label)]
+
+# --- Chart sections ---
+# Each section is a fragment: its own widgets rerun only that section, not the whole page
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def demographic_value_counts(view_key, label, _values):
+    """Students per value of one demographic, computed once per dataset and cohort."""
+    return _values.value_counts(dropna=False).rename_axis(label).reset_index(name='Count')
+
+@st.fragment
+def demographic_overview(df_cleaned, column_index, view_key):
+    """Pie chart of each main demographic."""
+    st.subheader(" Demographic Overview")
+    demographic_data = {}
+    for label in ["Gender", "Grade", "Religion", "Ethnicity"]:
+        matched_col = first_indexed_column(column_index, "demographics", label)
+        if matched_col:
+            demographic_data[label] = matched_col
+
+    if demographic_data:
+        items = list(demographic_data.items())
+
+        for row_i in range(0, len(items), 2):
+            row = st.columns(2)
+
+            for col_i in range(2):
+                idx = row_i + col_i
+                if idx >= len(items):
+                    break
+
+                label, col_name = items[idx]
+                col = row[col_i]
+
+                value_counts = demographic_value_counts(view_key, label, df_cleaned[col_name])
+                fig = px.pie(
+                    value_counts,
+                    names=label,
+                    values='Count',
+                    title=f"{label} Distribution",
+                    hole=0.3
+                )
+
+                num_categories = len(value_counts)
+                if num_categories > 3 or any(len(str(cat)) > 8 for cat in value_counts[label]):
+                    fig.update_traces(
+                        textposition='auto',
+                        textinfo='value',
+                        textfont=dict(size=15),
+                        marker=dict(line=dict(color='#000000', width=1))
+                    )
+                else:
+                    fig.update_traces(
+                        textposition='auto',
+                        textinfo='value',
+                        textfont=dict(size=15)
+                    )
+
+                fig.update_layout(
+                    uniformtext_minsize=7,
+                    margin=dict(t=45, b=45, l=45, r=45),
+                    height=400,
+                    width=400,
+                    showlegend=True
+                )
+
+                config = {
+                    'displayModeBar': True,
+                    'modeBarButtonsToAdd': ['zoom2d', 'autoScale2d', 'resetScale2d', 'toImage'],
+                    'toImageButtonOptions': {
+                        'format': 'png',
+                        'filename': f'{label}_distribution',
+                        'height': 500,
+                        'width': 700
+                    }
+                }
+
+                col.plotly_chart(fig, use_container_width=True, config=config)
+
+@st.fragment
+def construct_by_group_grid(selected_area, matched_cols, aggregate_cube, column_index):
+    """Average answer of the aspect's first question for every student group, two charts per row."""
+    target_col = matched_cols[0]
+    st.markdown(f"**Showing results for:** {', '.join(matched_cols)}")
+            
+            
+
+
+    col1, col2 = st.columns(2)
+    col_slots = [col1, col2]
+    chart_index = 0
+
+    # Gave a white box that looked unclean in most charts 
+    # st.markdown(   
+    #     """
+    #     <style>
+    #     .modebar {
+    #         display: block !important;
+    #         background-color: white !important;
+    #         border: 1px solid #ddd !important;
+    #         border-radius: 4px !important;
+    #         padding: 2px !important;
+    #     }
+    #     .modebar-group {
+    #         display: flex !important;
+    #         align-items: center !important;
+    #     }
+    #     .modebar-btn {
+    #         background-color: transparent !important;
+    #         border: none !important;
+    #         padding: 2px 6px !important;
+    #         color: #333333 !important;
+    #     }
+    #     .modebar-btn:hover {
+    #         background-color: #f0f0f0 !important;
+    #     }
+    #     </style>
+    #     """,
+    #     unsafe_allow_html=True
+    # )
+
+    st.markdown(
+        """
+        <style>
+        .modebar {
+            background-color: transparent !important;
+            border: none !important;
+            box-shadow: none !important;
+        }
+        .modebar-btn > svg { 
+            stroke: white !important;
+            fill: white !important;
+            opacity: 1 !important 
+        }
+        .modebar-btn:hover {
+            background-color: rgba(255, 255, 255, 0.2) !important;
+        }
+        </style>
+        """,
+        unsafe_allow_html=True
+    )
+
+
+    for label in DEMOGRAPHIC_GROUPS:
+        matched_group_col = first_indexed_column(column_index, "demographics", label)
+        if matched_group_col:
+            # Averages per group come straight from the aggregate cube built during processing
+            group_avg = group_means(aggregate_cube, label, target_col, matched_group_col)
+            if group_avg is None:
+                st.warning(f"Column '{target_col}' not found in the data.")
+                continue
+
+            # Special handling for 'Grade' to ensure correct numeric sorting.
+            if label == "Grade":
+                # Convert grade to a numeric type for sorting, coercing errors for non-numeric grades
+                group_avg[matched_group_col] = pd.to_numeric(group_avg[matched_group_col], errors='coerce')
+                group_avg = group_avg.sort_values(by=matched_group_col).dropna(subset=[matched_group_col])
+                # Convert back to string for plotting, ensuring it's handled as a category
+                group_avg[matched_group_col] = group_avg[matched_group_col].astype(int).astype(str)
+            with col_slots[chart_index % 2]:
+                # Convert the grouping column to string for discrete color mapping
+                group_avg_display = group_avg.copy()
+                group_avg_display[matched_group_col] = group_avg_display[matched_group_col].astype(str)
+
+                # Define category_orders to ensure Grade is treated as a category from the start.
+                # This is the most robust way to prevent annotation misalignment.
+                category_orders = {}
+                if label == "Grade":
+                    sorted_grades = group_avg_display[matched_group_col].tolist()
+                    category_orders[matched_group_col] = sorted_grades
+
+                fig = px.bar(
+                    group_avg_display,
+                    x=matched_group_col,
+                    y="AvgScore",
+                    text="Count",
+                    title=f"{selected_area} by {label}",
+                    labels={matched_group_col: label, "AvgScore": "Avg Score"},
+                    height=400,
+                    color=matched_group_col,
+                    color_discrete_sequence=px.colors.qualitative.Set3,
+                    category_orders=category_orders
+                )
+
+                fig.update_traces(
+                    texttemplate='N=%{text}',
+                    textposition='inside',
+                    width=0.5,
+                    insidetextanchor='middle',
+                    hovertemplate="%{x}<br>Avg Score: %{y:.2f}<br>Students: %{text}<extra></extra>"
+                )
+                for i, row in group_avg_display.iterrows():
+                    fig.add_annotation(
+                        x=row[matched_group_col],
+                        y=row["AvgScore"],
+                        text=f"Avg={row['AvgScore']:.2f}",
+                        showarrow=False,
+                        yshift=20,  # Moved above the bar
+                        font=dict(color='white'),
+                        bgcolor='rgba(0,0,0,0.5)',
+                    )
+                max_y = group_avg["AvgScore"].max()
+                fig.update_layout(
+                    margin=dict(t=50),
+                    yaxis=dict(range=[0, max_y + 0.6]),  # Added space for annotations on top
+                )
+                # For the Grade chart, explicitly set the tick values and labels.
+                # This is the most robust way to handle the single-point case,
+                # ensuring the bar sits over the integer label, not a decimal.
+                if label == "Grade":
+                    grade_ticks = group_avg_display[matched_group_col].tolist()
+                    fig.update_xaxes(tickvals=grade_ticks, ticktext=grade_ticks)
+                config = {
+                    'displayModeBar': True,
+                    'modeBarButtonsToRemove': [
+                    'pan2d', 'select2d', 'lasso2d', 'zoom2d', 'autoScale2d', 'hoverClosestCartesian',
+                    'hoverCompareCartesian', 'toggleSpikelines', 'zoomInGeo', 'zoomOutGeo',
+                    'resetGeo', 'hoverClosestGeo', 'sendDataToCloud', 'toggleHover', 'drawline',
+                    'drawopenpath', 'drawclosedpath', 'drawcircle', 'drawrect', 'eraseshape'
+                    ],
+                    'modeBarButtonsToAdd': ['zoomIn2d', 'zoomOut2d', 'resetScale2d', 'toImage', 'toggleFullscreen'],
+                    #'modeBarButtonsToAdd': ['zoom2d', 'autoScale2d', 'resetScale2d', 'toImage'],
+                    'toImageButtonOptions': {
+                        'format': 'png',
+                        'filename': 'Bar_chart_screenshot',
+                        'height': 500,
+                        'width': 700
+                    },
+                    'displaylogo': False
+                }
+                st.plotly_chart(fig, use_container_width=True, config=config)
+                chart_index += 1
+            # else:
+            #      st.info(f"No data found for {label}.")
+
+@st.fragment
+def percentage_breakdown(selected_area, target_col, aggregate_cube, column_index, group_labels):
+    """Agree/Neutral/Disagree shares of the aspect's first question for the groups of one demographic."""
+    st.markdown("### Breakdown by Group (Percentage)")
+    show_breakdown = st.toggle("Show Chart", value=True, key="toggle_breakdown")
+    if show_breakdown and group_labels:
+        breakdown_label = st.selectbox(
+            "Break down by", group_labels,
+            index=group_labels.index("Gender") if "Gender" in group_labels else 0, key="breakdown_demographic"
+        )
+        breakdown_col = first_indexed_column(column_index, "demographics", breakdown_label)
+        if breakdown_col and target_col:
+            percent_df = response_level_percentages(aggregate_cube, breakdown_label, target_col, breakdown_col)
+            if percent_df is not None and not percent_df.empty:
+                response_order = ["Agree", "Neutral", "Disagree", "Unknown"]
+                percent_df["ResponseLevel"] = pd.Categorical(percent_df["ResponseLevel"], categories=response_order, ordered=True)
+                percent_df["text"] = percent_df.apply(lambda row: f"{row['Percent']}% ({row['Count']} students)", axis=1
+)
+                fig = px.bar(
+                    percent_df,
+                    x=breakdown_col,
+
+                    color="ResponseLevel",
+                    y=percent_df["Percent"].astype(str) + '%',                            text="text",
+                    barmode="stack",
+                    title=f"Percentage Breakdown of Responses to '{selected_area}' by {breakdown_label}",
+                    color_discrete_map={
+                        "Agree": "#4CAF50",
+                        "Neutral": "#FFC107",
+                        "Disagree": "#F44336",
+                        "Unknown": "#9E9E9E"
+                    },
+                    height=450
+                )
+                fig.update_layout(
+                    yaxis_title="Percentage (%)",
+                    xaxis_title=breakdown_col,
+                    bargap=0.2,
+                    legend_title="Response Level",
+                    uniformtext_minsize=8,
+                    uniformtext_mode='hide'
+                )
+                fig.update_traces(
+                    textposition="inside",
+                    insidetextanchor="middle",
+                    cliponaxis=False
+                )
+                config = {
+                    'displayModeBar': True,
+                    'modeBarButtonsToRemove': [
+                        'pan2d', 'select2d', 'lasso2d', 'zoom2d', 'autoScale2d', 'hoverClosestCartesian',
+                        'hoverCompareCartesian', 'toggleSpikelines', 'zoomInGeo', 'zoomOutGeo',
+                        'resetGeo', 'hoverClosestGeo', 'sendDataToCloud', 'toggleHover', 'drawline',
+                        'drawopenpath', 'drawclosedpath', 'drawcircle', 'drawrect', 'eraseshape'
+                    ],
+                    'modeBarButtonsToAdd': ['zoomIn2d', 'zoomOut2d', 'resetScale2d', 'toImage', 'toggleFullscreen'],
+                    'toImageButtonOptions': {
+                        'format': 'png',
+                        'filename': 'bar_chart_screenshot',
+                        'height': 500,
+                        'width': 700,
+                        'scale': 2
+                    },
+                                'displaylogo': False
+                }
+
+
+                st.plotly_chart(fig, use_container_width=True, config=config)
+
+@st.fragment
+def two_way_drilldown(belonging_questions, df_cleaned, column_index, matched_questions, cohort, group_labels):
+    """One aspect broken down by a pair of demographics, from the cached cross-tab cube."""
+    st.markdown("### Two-way Drilldown")
+    show_drilldown = st.toggle("Show Drilldown", value=True, key="toggle_drilldown")
+    if show_drilldown and len(group_labels) >= 2:
+        area_slot, rows_slot, columns_slot = st.columns(3)
+        drilldown_area = area_slot.selectbox("Belonging aspect", list(belonging_questions.keys()), key="drilldown_area")
+        row_label = rows_slot.selectbox("Rows", group_labels, key="drilldown_rows")
+        column_labels = [label for label in group_labels if label != row_label]
+        column_label = columns_slot.selectbox("Columns", column_labels, key="drilldown_columns")
+        drilldown_cols = column_index.get("constructs", {}).get(drilldown_area, [])
+        if not drilldown_cols:
+            st.warning("No matching questions found for this aspect.")
+        else:
+            # Every pair is aggregated once per dataset; a cohort combines its bitmaps instead
+            if cohort:
+                crosstab_cube = cohort_crosstab_cube(
+                    cohort["cohort_index"], cohort["mask"], row_label, column_label, column_index
+                )
+            else:
+                crosstab_cube = get_crosstab_cube(
+                    st.session_state.get("processed_fingerprint"), df_cleaned, column_index, matched_questions
+                )
+            crosstab = crosstab_table(crosstab_cube, row_label, column_label, drilldown_cols[0])
+            if crosstab is None or crosstab.empty:
+                st.info(f"No answers to compare by {row_label} and {column_label}.")
+            else:
+                means = crosstab["AvgScore"].unstack()
+                counts = crosstab["Count"].unstack()
+                row_order = sort_group_values(row_label, means.index)
+                column_order = sort_group_values(column_label, means.columns)
+                means = means.reindex(index=row_order, columns=column_order)
+                counts = counts.reindex(index=row_order, columns=column_order)
+                cell_text = [
+                    [f"{mean:.2f}<br>N={int(count)}" if pd.notna(mean) else "" for mean, count in zip(mean_row, count_row)]
+                    for mean_row, count_row in zip(means.to_numpy(), counts.to_numpy())
+                ]
+                fig = px.imshow(
+                    means.to_numpy(),
+                    x=[str(value) for value in column_order],
+                    y=[str(value) for value in row_order],
+                    zmin=1, zmax=5,
+                    color_continuous_scale="RdYlGn",
+                    aspect="auto",
+                    labels={"x": column_label, "y": row_label, "color": "Avg Score"},
+                    title=f"{drilldown_area} by {row_label} and {column_label}",
+                    height=450
+                )
+                fig.update_traces(text=cell_text, texttemplate="%{text}",
+                                  hovertemplate="%{y} / %{x}<br>Avg Score: %{z:.2f}<extra></extra>")
+                fig.update_xaxes(type="category")
+                fig.update_yaxes(type="category")
+                st.plotly_chart(fig, use_container_width=True, config={'displaylogo': False})
+
+                drilldown_table = crosstab.reset_index()
+                drilldown_table.columns = [row_label, column_label] + list(crosstab.columns)
+                drilldown_table["AvgScore"] = drilldown_table["AvgScore"].round(2)
+                st.dataframe(drilldown_table.rename(columns={"AvgScore": "Avg Score", "Count": "Students"}),
+                             hide_index=True, use_container_width=True)
+
+@st.fragment
+def belonging_aspect_charts(belonging_questions, aggregate_cube, column_index, group_labels):
+    """The aspect selector and the charts of the selected aspect; changing the aspect reruns only these."""
+    selected_area = st.selectbox(
+        "Which belonging aspect do you want to explore?", list(belonging_questions.keys()), key="explore_area"
+    )
+    target_col = None
+    if selected_area:
+        matched_cols = column_index.get("constructs", {}).get(selected_area, [])
+        if not matched_cols:
+            st.warning("No matching questions found for this aspect.")
+        else:
+            target_col = matched_cols[0]
+            construct_by_group_grid(selected_area, matched_cols, aggregate_cube, column_index)
+
+    percentage_breakdown(selected_area, target_col, aggregate_cube, column_index, group_labels)
+
+show_explore = st.toggle("Show Charts", value=True, key="toggle_explore")
+if show_explore and not df_cleaned.empty:
+    demographic_overview(df_cleaned, column_index, view_key)
+
+    st.write("### Food for Thought")
+    st.write(
+        """
+        Take a moment to observe the differences in the following charts.  
+        - Do certain groups consistently score higher or lower? Why do you think that happens? 
+        - What kind of experiences or challenges could be influencing their responses?  
+        - Are there social, cultural, or school-related factors that might be shaping these patterns?
+
+        """
+    ) 
+    st.write("")
+
+
+
+    belonging_aspect_charts(belonging_questions, aggregate_cube, column_index, group_labels)
+    two_way_drilldown(belonging_questions, df_cleaned, column_index, matched_questions, cohort, group_labels)
+
+col1, col2 = st.columns([1, 1])
+
+with col1:
+    if st.button("⮜ Back to Key Metrics", use_container_width=True):
+        navigate_to('metrics')
+
+with col2:
+    if st.button("Go to Data Tables  ⮞", use_container_width=True):
+        navigate_to('data_table')
@@ -0,0 +1,134 @@
+"""
+Compares the raster (matplotlib PNG) and vector (ReportLab Drawing) chart
+backends of the PDF reports: generation time and file size of the general
+report and of a custom report with all ten charts. Raster charts are timed
+once per --workers value, so the parallel render pool is compared with
+rendering in the report's own process (1 worker).
+
+A synthetic survey is run through the processing pipeline first. The chart
+cache is bypassed, so every run renders all of its charts.
+
+Usage:
+    python benchmarks/chart_backend_report.py
+    python benchmarks/chart_backend_report.py --workers 1 2 4
+    python benchmarks/chart_backend_report.py --students 5000 --repeat 5 > benchmarks/chart_backend_report.md
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))  # So the services package resolves
+
+from services import reporting  # noqa: E402
+from services.processing import process_data_and_calculate_metrics  # noqa: E402
+from services.reporting import (  # noqa: E402
+    CHART_BACKENDS, CHART_RENDER_WORKERS, demographic_pie_images, generate_custom_pdf, generate_pdf
+)
+
+LIKERT_ANSWERS = ["Strongly Disagree", "Disagree", "Neutral", "Agree", "Strongly Agree"]
+CONSTRUCT = "Safety"
+
+
+def synthetic_survey(n_students, seed=0):
+    """A survey with every demographic and construct the reports chart."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "What gender do you use": rng.choice(["Male", "Female", "Other"], n_students),
+        "Which grade are you in": rng.choice(["6", "7", "8", "9", "10", "11", "12"], n_students),
+        "Religion": rng.choice(["Hindu", "Muslim", "Christian", "Sikh", "Buddhist", "Jain"], n_students),
+        "Ethnicity": rng.choice(["General", "SC", "ST", "Other Backward Class"], n_students),
+        "What items among these do you have at home": rng.choice(
+            ["Car, Computer, Apna Ghar", "Laptop, Rent", "Apna Ghar", "Computer", "Rent"], n_students),
+        "Do you have any disability or health condition": rng.choice(["Yes", "No"], n_students),
+        "I feel safe at school": rng.choice(LIKERT_ANSWERS, n_students),
+        "I am respected at school": rng.choice(LIKERT_ANSWERS, n_students),
+        "I feel welcome here": rng.choice(LIKERT_ANSWERS, n_students),
+        "I get opportunities to participate": rng.choice(LIKERT_ANSWERS, n_students),
+    })
+
+
+def custom_chart_options(construct):
+    """The ten charts the report page offers for a construct."""
+    options = {
+        f"{demographic} Distribution": {"type": "demographic_pie", "description": "", "demographic": demographic}
+        for demographic in ["Gender", "Religion", "Grade"]
+    }
+    for demographic in ["Gender", "Grade", "Religion", "Income Status", "Ethnicity", "Health Condition"]:
+        options[f"{construct} by {demographic}"] = {
+            "type": "construct_vs_demographic", "description": "", "demographic": demographic
+        }
+    options["Gender Breakdown (Percentage)"] = {
+        "type": "percentage_breakdown", "description": "", "demographic": "Gender"
+    }
+    return options
+
+
+def use_render_workers(workers):
+    """Replaces the chart render pool with one of the given size (1 renders in this process)."""
+    if reporting.CHART_RENDER_WORKERS > 1:
+        reporting.get_chart_pool().shutdown()
+    reporting.get_chart_pool.clear()
+    reporting.CHART_RENDER_WORKERS = workers
+
+
+def time_report(build, repeat):
+    """Median seconds of build() and the size of the PDF it returns."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pdf = build()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), len(pdf.getvalue())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=2000, help="Rows in the synthetic survey")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per report; the median is reported")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, CHART_RENDER_WORKERS}),
+                        help="Chart render pool sizes to time the raster backend with")
+    args = parser.parse_args()
+
+    results = process_data_and_calculate_metrics(synthetic_survey(args.students))
+    df_cleaned, column_index = results["df_cleaned"], results["column_index"]
+    chart_options = custom_chart_options(CONSTRUCT)
+    common = dict(date_today=date.today().strftime("%d %B, %Y"), n_students=len(df_cleaned))
+
+    def general_report(backend):
+        gender_pie, religion_pie = demographic_pie_images(df_cleaned, column_index, backend=backend)
+        return generate_pdf(
+            "Benchmark School", None, None, results["category_averages"], results["overall_belonging_score"],
+            results["highest_area"], results["lowest_area"], gender_pie_buf=gender_pie, religion_pie_buf=religion_pie,
+            **common
+        )
+
+    def custom_report(backend):
+        return generate_custom_pdf(
+            "Benchmark School", None, None, CONSTRUCT, list(chart_options), chart_options, df_cleaned,
+            results["matched_questions"], column_index, results["category_averages"],
+            results["overall_belonging_score"], aggregate_cube=results["aggregate_cube"], chart_backend=backend,
+            **common
+        )
+
+    print(f"Python {sys.version.split()[0]}, {os.cpu_count()} CPU(s), {args.students} students, "
+          f"median of {args.repeat} run(s)\n")
+    print("| report | backend | render workers | time | PDF size |")
+    print("| --- | --- | ---: | ---: | ---: |")
+    for report_name, build_report in [("general", general_report), (f"custom, {len(chart_options)} charts", custom_report)]:
+        for backend in CHART_BACKENDS:
+            # Drawings are built in the report's own process whatever the pool size
+            for workers in args.workers if backend == "raster" else [1]:
+                use_render_workers(workers)
+                build_report(backend)  # Warm up imports and the render pool
+                seconds, size = time_report(lambda: build_report(backend), args.repeat)
+                workers_label = workers if backend == "raster" else "-"
+                print(f"| {report_name} | {backend} | {workers_label} | {seconds * 1000:.0f} ms | {size / 1024:.0f} KB |")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Import-time report for app.py, built from `python -X importtime`.
+
+Each group of imports is timed in a fresh interpreter, so the numbers are
+cold-start costs (after the OS file cache is warm). The "startup" group is
+read from the module-level imports of app.py and of the login page (the
+first page every session opens); the page groups list what the
+visualisations and report pages import on their first visit.
+
+With --baseline, the same groups are also timed on another git revision
+(exported to a temporary directory) and reported in a second column; a page
+group whose packages that revision already loads at startup is shown as
+"at startup".
+
+Usage:
+    python benchmarks/import_time_report.py                     # current app.py
+    python benchmarks/import_time_report.py --app old_app.py    # compare another version
+    python benchmarks/import_time_report.py --baseline af7b9f4^ --repeat 5 > benchmarks/import_time_report.md
+"""
+import argparse
+import ast
+import io
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+APP_DIR = os.path.join(os.path.dirname(__file__), "..")
+APP_PATH = os.path.join(APP_DIR, "app.py")
+
+PAGE_IMPORTS = {
+    "visualisations page": ["import plotly.express as px"],
+    "report page": [
+        "import matplotlib.pyplot as plt",
+        "from reportlab.lib.pagesizes import A4",
+        "from reportlab.lib import colors",
+        "from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image",
+        "from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle",
+        "from reportlab.lib.units import inch",
+    ],
+    "Google Sheets client": [
+        "import gspread",
+        "from oauth2client.service_account import ServiceAccountCredentials",
+    ],
+}
+
+
+def module_level_imports(app_path):
+    """Returns the import statements at module level of a script, in order."""
+    with open(app_path, encoding="utf-8") as source:
+        tree = ast.parse(source.read())
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def startup_imports(app_dir):
+    """Module-level imports of app.py plus those of the login page, where the tree has one."""
+    statements = module_level_imports(os.path.join(app_dir, "app.py"))
+    login_page_path = os.path.join(app_dir, "app_pages", "login.py")
+    if os.path.exists(login_page_path):
+        statements += module_level_imports(login_page_path)
+    return statements
+
+
+def export_revision(ref, target_dir):
+    """Writes the tree of a git revision into target_dir."""
+    archive = subprocess.run(["git", "archive", ref], capture_output=True, check=True, cwd=APP_DIR).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(target_dir)
+
+
+def measure(statements, app_dir=APP_DIR):
+    """Runs the statements under -X importtime; returns (total_ms, {top-level package: cumulative ms})."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "; ".join(statements)],
+        capture_output=True, text=True, check=True, cwd=app_dir  # So the services package resolves
+    )
+    total_us = 0
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total_us += int(self_us)
+        if not name[1:].startswith(" "):  # Depth-0 entries carry the cost of the whole package
+            package = name.strip().split(".")[0]
+            packages[package] = packages.get(package, 0) + int(cumulative_us) / 1000
+    return total_us / 1000, packages
+
+
+def measure_groups(groups, repeat, app_dir=APP_DIR):
+    """Returns {group: (median total ms, packages of the last run)}."""
+    measured = {}
+    for name, statements in groups.items():
+        runs = [measure(statements, app_dir) for _ in range(repeat)]
+        measured[name] = (statistics.median(run[0] for run in runs), runs[-1][1])
+    return measured
+
+
+def print_slowest_packages(title, packages, interpreter_modules, top):
+    print(f"\n{title}, slowest packages (cumulative):\n")
+    packages = {package: ms for package, ms in packages.items() if package not in interpreter_modules}
+    for package, ms in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"- {package}: {ms:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--app", default=APP_PATH, help="app.py to read the startup imports from")
+    parser.add_argument("--baseline", help="git revision to time as well, e.g. the commit before a change")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per group; the median is reported")
+    parser.add_argument("--top", type=int, default=8, help="Packages listed per group")
+    args = parser.parse_args()
+
+    startup_group = "startup (app.py and the login page)"
+    if os.path.abspath(args.app) == os.path.abspath(APP_PATH):
+        startup = startup_imports(APP_DIR)
+    else:
+        startup = module_level_imports(args.app)
+    groups = {startup_group: startup}
+    groups.update(PAGE_IMPORTS)
+
+    interpreter_modules = set(measure(["pass"])[1])  # site, encodings, ... are paid by every run
+    current = measure_groups(groups, args.repeat)
+    baseline = None
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as baseline_dir:
+            export_revision(args.baseline, baseline_dir)
+            baseline_groups = {startup_group: startup_imports(baseline_dir)}
+            baseline = measure_groups(baseline_groups, args.repeat, baseline_dir)
+            baseline_startup_packages = set(baseline[startup_group][1])
+            for name, statements in PAGE_IMPORTS.items():
+                page_packages = set(current[name][1]) - interpreter_modules
+                if page_packages <= baseline_startup_packages:
+                    baseline[name] = None  # Already paid for when that revision started
+                else:
+                    baseline.update(measure_groups({name: statements}, args.repeat, baseline_dir))
+
+    print(f"Python {sys.version.split()[0]}, median of {args.repeat} cold interpreter(s)\n")
+    if baseline is None:
+        print("| group | import time |")
+        print("| --- | ---: |")
+        for name, (total_ms, _packages) in current.items():
+            print(f"| {name} | {total_ms:.0f} ms |")
+    else:
+        print(f"| group | baseline ({args.baseline}) | current |")
+        print("| --- | ---: | ---: |")
+        for name, (total_ms, _packages) in current.items():
+            baseline_time = "at startup" if baseline[name] is None else f"{baseline[name][0]:.0f} ms"
+            print(f"| {name} | {baseline_time} | {total_ms:.0f} ms |")
+        print_slowest_packages(
+            f"Baseline ({args.baseline}) {startup_group}", baseline[startup_group][1], interpreter_modules, args.top
+        )
+
+    for name, (_total_ms, packages) in current.items():
+        print_slowest_packages(name, packages, interpreter_modules, args.top)
+
+
+if __name__ == "__main__":
+    main()
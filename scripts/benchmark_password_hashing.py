@@ -0,0 +1,59 @@
+"""
+Times scrypt at increasing cost on this machine and recommends the largest
+SCRYPT_N (see services/auth.py) that keeps one password check under the target.
+
+Usage:
+    python scripts/benchmark_password_hashing.py
+    python scripts/benchmark_password_hashing.py --target-ms 150 --rounds 7
+
+Run it on the deployed instance type: a login verifies the password once,
+so the reported time is roughly the CPU each login costs.
+"""
+import argparse
+import hashlib
+import statistics
+import time
+
+# Must match SCRYPT_R and SCRYPT_P in services/auth.py
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+
+def time_scrypt(n, rounds, r=SCRYPT_R, p=SCRYPT_P):
+    """Returns the median time in milliseconds of one scrypt hash at cost n."""
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        hashlib.scrypt(
+            b"correct horse battery staple", salt=b"0123456789abcdef0123456789abcdef",
+            n=n, r=r, p=p, maxmem=128 * r * (n + p + 2) + 1024 * 1024
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250, help="Latency budget for one password check")
+    parser.add_argument("--rounds", type=int, default=5, help="Hashes timed per cost")
+    parser.add_argument("--max-log2-n", type=int, default=20, help="Largest cost tried, as log2(n)")
+    args = parser.parse_args()
+
+    recommended = None
+    print(f"{'n':>10} {'memory':>9} {'median':>10}")
+    for log2_n in range(12, args.max_log2_n + 1):
+        n = 2 ** log2_n
+        median_ms = time_scrypt(n, args.rounds)
+        print(f"{'2**' + str(log2_n):>10} {128 * SCRYPT_R * n / 2 ** 20:>7.0f}MB {median_ms:>8.1f}ms")
+        if median_ms > args.target_ms:
+            break
+        recommended = log2_n
+
+    if recommended is None:
+        print(f"Even n=2**12 exceeds {args.target_ms:.0f} ms; keep the current SCRYPT_N and review the instance size.")
+    else:
+        print(f"Recommended: SCRYPT_N = 2 ** {recommended} (target {args.target_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
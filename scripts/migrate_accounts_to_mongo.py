@@ -0,0 +1,92 @@
+"""
+One-shot copy of the "Apnapan User Accounts" sheet into the MongoDB
+accounts collection used when secrets.toml sets backend = "mongo" under
+[accounts].
+
+Usage:
+    python scripts/migrate_accounts_to_mongo.py --dry-run
+    python scripts/migrate_accounts_to_mongo.py
+
+Accounts that already exist in MongoDB are left untouched, so the script
+can be re-run safely.
+"""
+import argparse
+import os
+from urllib.parse import quote_plus
+
+from pymongo import MongoClient
+
+# Must match ACCOUNTS_SHEET_NAME, ACCOUNTS_COLLECTION_NAME and ACCOUNT_COLUMNS in services/auth.py
+ACCOUNTS_SHEET_NAME = "Apnapan User Accounts"
+ACCOUNTS_COLLECTION_NAME = "accounts"
+ACCOUNT_COLUMNS = ["school_id", "password_hash", "salt", "email", "school_name", "logo_identifier", "created"]
+SECRETS_PATH = os.path.join(os.path.dirname(__file__), "..", ".streamlit", "secrets.toml")
+
+
+def load_secrets(path=SECRETS_PATH):
+    import toml  # Installed with streamlit
+
+    return toml.load(path)
+
+
+def read_sheet_rows(secrets):
+    """Reads every row of the accounts sheet with the app's service account."""
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+    creds = ServiceAccountCredentials.from_json_keyfile_dict(dict(secrets["connections"]["gsheets"]), scope)
+    return gspread.authorize(creds).open(ACCOUNTS_SHEET_NAME).sheet1.get_all_values()
+
+
+def accounts_collection(secrets):
+    """Opens the accounts collection in the same database as get_mongo_collection in services/storage.py."""
+    mongo = secrets["mongo"]
+    username = quote_plus(mongo["username"])
+    password = quote_plus(mongo["password"])
+    uri = f"mongodb+srv://{username}:{password}@{mongo['host']}/{mongo['db_name']}?retryWrites=true&w=majority"
+    return MongoClient(uri)[mongo["db_name"]][ACCOUNTS_COLLECTION_NAME]
+
+
+def migrate_accounts(rows, collection, dry_run=False):
+    """Inserts one document per sheet row (header row skipped) keyed by school_id.
+
+    Works with any pymongo-compatible collection (Atlas, a local mongod or mongomock).
+    Returns (inserted_count, skipped_count).
+    """
+    collection.create_index("school_id", unique=True)
+    inserted, skipped = 0, 0
+    seen = set()
+    for values in rows[1:]:
+        if not values or not values[0] or values[0] in seen:
+            skipped += 1  # Blank rows and repeated IDs (the app always used the first row)
+            continue
+        seen.add(values[0])
+        values = list(values) + [""] * (len(ACCOUNT_COLUMNS) - len(values))
+        account = dict(zip(ACCOUNT_COLUMNS, values))
+        if dry_run:
+            exists = collection.find_one({"school_id": account["school_id"]}, projection={"_id": 1})
+            inserted += 0 if exists else 1
+            skipped += 1 if exists else 0
+            continue
+        result = collection.update_one({"school_id": account["school_id"]}, {"$setOnInsert": account}, upsert=True)
+        if result.upserted_id is not None:
+            inserted += 1
+        else:
+            skipped += 1
+    return inserted, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Count the accounts that would be copied")
+    args = parser.parse_args()
+
+    secrets = load_secrets()
+    inserted, skipped = migrate_accounts(read_sheet_rows(secrets), accounts_collection(secrets), dry_run=args.dry_run)
+    action = "Would copy" if args.dry_run else "Copied"
+    print(f"{action} {inserted} account(s); {skipped} row(s) skipped or already present.")
+
+
+if __name__ == "__main__":
+    main()
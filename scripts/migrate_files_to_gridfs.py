@@ -0,0 +1,90 @@
+"""
+Moves uploaded files stored inline in the files collection (`file_data`)
+into GridFS, leaving a `file_id` reference on each document.
+
+Usage:
+    python scripts/migrate_files_to_gridfs.py                  # uses .streamlit/secrets.toml
+    python scripts/migrate_files_to_gridfs.py --uri mongodb://localhost:27017 --db apnapan --collection files
+    python scripts/migrate_files_to_gridfs.py --dry-run
+
+Documents are migrated one at a time, so the script can be stopped and
+re-run safely: already migrated documents no longer carry `file_data`.
+"""
+import argparse
+import hashlib
+import io
+import os
+from urllib.parse import quote_plus
+
+import gridfs
+from pymongo import MongoClient
+
+# Must match FILE_BUCKET_NAME in services/storage.py
+FILE_BUCKET_NAME = "uploads"
+SECRETS_PATH = os.path.join(os.path.dirname(__file__), "..", ".streamlit", "secrets.toml")
+
+
+def mongo_settings_from_secrets(path=SECRETS_PATH):
+    """Builds the same connection URI as get_mongo_collection in services/storage.py."""
+    import toml  # Installed with streamlit
+
+    mongo = toml.load(path)["mongo"]
+    username = quote_plus(mongo["username"])
+    password = quote_plus(mongo["password"])
+    uri = f"mongodb+srv://{username}:{password}@{mongo['host']}/{mongo['db_name']}?retryWrites=true&w=majority"
+    return uri, mongo["db_name"], mongo["collection_name"]
+
+
+def migrate_inline_files(collection, bucket, dry_run=False):
+    """Copies every inline file into the GridFS bucket and swaps `file_data` for `file_id`.
+
+    Works with any pymongo-compatible collection (Atlas, a local mongod or mongomock).
+    Returns (migrated_count, migrated_bytes).
+    """
+    migrated, migrated_bytes = 0, 0
+    pending = collection.find({"file_data": {"$exists": True}}, projection={"_id": 1})
+    for doc_id in [doc["_id"] for doc in pending]:
+        doc = collection.find_one({"_id": doc_id, "file_data": {"$exists": True}})
+        if doc is None:
+            continue  # Migrated concurrently
+        file_data = bytes(doc["file_data"])
+        file_hash = doc.get("file_hash") or hashlib.sha256(file_data).hexdigest()
+        print(f"{'Would migrate' if dry_run else 'Migrating'} {doc.get('school_id')}/{doc.get('filename')} ({len(file_data)} bytes)")
+        if not dry_run:
+            file_id = bucket.put(
+                io.BytesIO(file_data),
+                filename=doc["filename"],
+                metadata={"school_id": doc.get("school_id"), "file_hash": file_hash}
+            )
+            collection.update_one(
+                {"_id": doc_id},
+                {"$set": {"file_id": file_id, "file_hash": file_hash}, "$unset": {"file_data": ""}}
+            )
+        migrated += 1
+        migrated_bytes += len(file_data)
+    return migrated, migrated_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--uri", help="MongoDB URI (defaults to the app's secrets.toml)")
+    parser.add_argument("--db", help="Database name")
+    parser.add_argument("--collection", help="Files collection name")
+    parser.add_argument("--dry-run", action="store_true", help="List the documents that would be migrated")
+    args = parser.parse_args()
+
+    uri, db_name, collection_name = args.uri, args.db, args.collection
+    if not (uri and db_name and collection_name):
+        secret_uri, secret_db, secret_collection = mongo_settings_from_secrets()
+        uri, db_name, collection_name = uri or secret_uri, db_name or secret_db, collection_name or secret_collection
+
+    client = MongoClient(uri)
+    db = client[db_name]
+    bucket = gridfs.GridFS(db, collection=FILE_BUCKET_NAME)
+    migrated, migrated_bytes = migrate_inline_files(db[collection_name], bucket, dry_run=args.dry_run)
+    action = "Would migrate" if args.dry_run else "Migrated"
+    print(f"{action} {migrated} file(s), {migrated_bytes / 1e6:.1f} MB.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""
+Services shared by the pages in app_pages/. Streamlit re-executes a page
+script on every interaction, but these modules are imported once per server
+process, so their constants, functions and caches are built only once.
+"""
@@ -0,0 +1,89 @@
+"""Image assets: the static logos and school logos, loaded and encoded once per process."""
+import base64
+import io
+import os
+import threading
+
+import streamlit as st
+
+from services.storage import download_file_from_mongo, stored_file_version
+
+# --- Static Assets ---
+APNAPAN_LOGO_PATH = "images/project_apnapan_logo.png"
+LIKERT_SCALE_PATH = "images/Likert_Scale.png"
+LIKERT_SCALE_MAX_WIDTH = 1200  # Shown at up to 600px wide; twice that stays sharp on high-DPI screens
+SCHOOL_LOGO_MAX_WIDTH = 400  # Shown 50px high on pages and one inch wide in reports
+SCHOOL_LOGO_VERSION_TTL = 600  # Seconds a logo version check is reused before asking MongoDB again
+IMAGE_MIME_TYPES = {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg"}
+
+def encode_image_asset(image_bytes, filename):
+    """Packs image bytes with their data URI so pages never re-encode them."""
+    mime_type = IMAGE_MIME_TYPES.get(filename.rsplit('.', 1)[-1].lower(), "image/png")
+    encoded = base64.b64encode(image_bytes).decode()
+    return {"bytes": image_bytes, "data_uri": f"data:{mime_type};base64,{encoded}"}
+
+def downsize_image(image_bytes, max_width):
+    """Scales an image down to max_width pixels, keeping its format; smaller images are returned as is."""
+    from PIL import Image as PILImage
+    with PILImage.open(io.BytesIO(image_bytes)) as img:
+        if img.width <= max_width:
+            return image_bytes
+        image_format = img.format or "PNG"
+        resized = img.resize((max_width, round(img.height * max_width / img.width)), PILImage.LANCZOS)
+        output = io.BytesIO()
+        resized.save(output, format=image_format, optimize=True)
+        return output.getvalue()
+
+@st.cache_resource(show_spinner=False)
+def load_static_asset(path, max_width=None):
+    """Reads, optionally downsizes and encodes an image file once per server process."""
+    if not os.path.exists(path):
+        print(f"Asset file not found: {path}")
+        return None
+    try:
+        with open(path, "rb") as img_file:
+            image_bytes = img_file.read()
+        if max_width:
+            image_bytes = downsize_image(image_bytes, max_width)
+        return encode_image_asset(image_bytes, path)
+    except Exception as e:
+        print(f"Error loading asset {path}: {e}")
+        return None
+
+# Cached assets are shared by every session, so adding the reader to one must not race
+_image_reader_lock = threading.Lock()
+
+def asset_image_reader(asset):
+    """ReportLab ImageReader for an asset, decoded on first use and kept with the cached asset."""
+    with _image_reader_lock:
+        if "image_reader" not in asset:
+            from reportlab.lib.utils import ImageReader
+            image_reader = ImageReader(io.BytesIO(asset["bytes"]))
+            image_reader.getRGBData()  # Decode now; ImageReader decodes lazily and is not safe to do so concurrently
+            asset["image_reader"] = image_reader
+        return asset["image_reader"]
+
+@st.cache_resource(max_entries=256, show_spinner=False)
+def _load_school_logo(school_id, logo_identifier, logo_version):
+    # logo_version is only part of the cache key: a new logo upload gets a new entry
+    logo_file_buffer = download_file_from_mongo(school_id, logo_identifier)
+    if not logo_file_buffer:
+        return None
+    try:
+        logo_bytes = downsize_image(logo_file_buffer.read(), SCHOOL_LOGO_MAX_WIDTH)
+    except Exception as e:
+        print(f"Could not read logo {logo_identifier}: {e}")
+        return None
+    return encode_image_asset(logo_bytes, logo_identifier)
+
+@st.cache_data(ttl=SCHOOL_LOGO_VERSION_TTL, max_entries=256, show_spinner=False)
+def school_logo_version(school_id, logo_identifier):
+    """Version of the stored logo, looked up in MongoDB at most once per TTL rather than on every rerun."""
+    return stored_file_version(school_id, logo_identifier)
+
+def load_school_logo(school_id, logo_identifier):
+    """Returns the school's logo asset; it is downloaded again only when the stored logo changes."""
+    logo_version = school_logo_version(school_id, logo_identifier)
+    if logo_version is None:
+        return None
+    return _load_school_logo(school_id, logo_identifier, logo_version)
@@ -0,0 +1,297 @@
+"""School accounts: account stores, password hashing and the login/sign-up flows."""
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from datetime import datetime
+
+import streamlit as st
+
+from services.assets import load_school_logo
+from services.sheets import connect_to_google_sheet
+from services.storage import FILE_KIND_LOGO, get_mongo_collection, upload_file_to_mongo
+
+# --- Account Stores ---
+# Accounts live in the Google Sheet by default; set backend = "mongo" under [accounts] in
+# secrets.toml to use the MongoDB store (run scripts/migrate_accounts_to_mongo.py first).
+ACCOUNTS_SHEET_NAME = "Apnapan User Accounts"
+ACCOUNTS_COLLECTION_NAME = "accounts"
+# Sheet columns, in order: School ID (1), Password (2), Salt (3), Email (4), School Name (5), Logo Identifier (6), Timestamp (7)
+ACCOUNT_COLUMNS = ["school_id", "password_hash", "salt", "email", "school_name", "logo_identifier", "created"]
+ACCOUNT_DIRECTORY_TTL_SECONDS = 300  # Picks up accounts edited directly in the sheet
+
+class SheetsAccountStore:
+    """
+    Account store backed by the accounts sheet, with an in-process directory
+    cache. The whole sheet is read with one
+    get_all_values call and indexed by school ID; lookups are then dict hits.
+    The index is reloaded after the TTL expires and updated in place after
+    writes made through it. Before a write, the cached row is checked against
+    the sheet, since admins may reorder rows within the TTL. Works with any
+    object exposing the gspread worksheet methods used here (get_all_values,
+    append_row, cell, update_cell).
+    """
+
+    def __init__(self, open_sheet, ttl_seconds=ACCOUNT_DIRECTORY_TTL_SECONDS):
+        self._open_sheet = open_sheet
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._sheet = None
+        self._rows = {}
+        self._loaded_at = None
+
+    def _worksheet(self):
+        if self._sheet is None:
+            self._sheet = self._open_sheet()
+        return self._sheet
+
+    def _ensure_fresh(self):
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self._ttl_seconds:
+                return
+            rows = {}
+            for row_number, values in enumerate(self._worksheet().get_all_values(), start=1):
+                if values and values[0] not in rows:  # The first row for a school ID wins, as with list.index
+                    rows[values[0]] = (row_number, list(values))
+            self._rows = rows
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def get(self, school_id):
+        """Returns the account as a dict of ACCOUNT_COLUMNS fields, or None."""
+        self._ensure_fresh()
+        entry = self._rows.get(school_id)
+        if entry is None:
+            return None
+        values = entry[1] + [""] * (len(ACCOUNT_COLUMNS) - len(entry[1]))
+        return dict(zip(ACCOUNT_COLUMNS, values))
+
+    def exists(self, school_id):
+        self._ensure_fresh()
+        return school_id in self._rows
+
+    def append(self, account):
+        values = [account.get(field, "") for field in ACCOUNT_COLUMNS]
+        self._worksheet().append_row(values)
+        # The new row number is only known to the sheet, so reload on the next lookup
+        self.invalidate()
+
+    def _locate(self, school_id):
+        """The (row number, values) entry of a school, reloaded if the sheet no longer has it on that row."""
+        self._ensure_fresh()
+        entry = self._rows.get(school_id)
+        if entry is not None and self._worksheet().cell(entry[0], 1).value == school_id:
+            return entry
+        # Rows were inserted, deleted or re-sorted since the last load
+        self.invalidate()
+        self._ensure_fresh()
+        return self._rows[school_id]
+
+    def update_field(self, school_id, field, value):
+        row_number, values = self._locate(school_id)
+        column = ACCOUNT_COLUMNS.index(field) + 1
+        self._worksheet().update_cell(row_number, column, value)
+        with self._lock:
+            values.extend([""] * (column - len(values)))
+            values[column - 1] = value
+
+class MongoAccountStore:
+    """
+    Account store backed by a MongoDB collection with a unique index on
+    school_id, so every lookup is a single indexed query. Exposes the same
+    methods as SheetsAccountStore.
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+        self._collection.create_index("school_id", unique=True)
+
+    def invalidate(self):
+        pass  # Nothing is cached locally
+
+    def get(self, school_id):
+        """Returns the account as a dict of ACCOUNT_COLUMNS fields, or None."""
+        doc = self._collection.find_one({"school_id": school_id}, projection={"_id": 0})
+        if doc is None:
+            return None
+        return {field: doc.get(field, "") for field in ACCOUNT_COLUMNS}
+
+    def exists(self, school_id):
+        return self._collection.find_one({"school_id": school_id}, projection={"_id": 1}) is not None
+
+    def append(self, account):
+        self._collection.insert_one({field: account.get(field, "") for field in ACCOUNT_COLUMNS})
+
+    def update_field(self, school_id, field, value):
+        self._collection.update_one({"school_id": school_id}, {"$set": {field: value}})
+
+@st.cache_resource
+def get_account_store():
+    """One account store per server process, shared by every session."""
+    backend = st.secrets.get("accounts", {}).get("backend", "sheets")
+    if backend == "mongo":
+        return MongoAccountStore(get_mongo_collection().database[ACCOUNTS_COLLECTION_NAME])
+    return SheetsAccountStore(lambda: connect_to_google_sheet(ACCOUNTS_SHEET_NAME))
+
+# --- Password Hashing ---
+# Stored hashes look like "scrypt$<n>$<r>$<p>$<hex digest>", so the cost travels with the hash.
+# Raise SCRYPT_N after running scripts/benchmark_password_hashing.py on the server; existing
+# hashes are upgraded to the new cost the next time each school logs in.
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+
+def hash_password(password, salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    """Hashes a password with scrypt and returns it in the versioned storage format."""
+    digest = hashlib.scrypt(
+        password.encode(), salt=salt.encode(), n=n, r=r, p=p,
+        maxmem=128 * r * (n + p + 2) + 1024 * 1024  # Room for the cost; OpenSSL caps it at 32 MB by default
+    )
+    return f"scrypt${n}${r}${p}${digest.hex()}"
+
+def legacy_hash_password(password, salt):
+    """Single SHA-256 over salt+password, used by accounts created before scrypt."""
+    return hashlib.sha256(salt.encode() + password.encode()).hexdigest()
+
+def verify_password(password, salt, stored_hash):
+    """
+    Checks a password against a stored hash of any supported version.
+    Returns (matches, needs_rehash); needs_rehash is set for legacy SHA-256
+    hashes and for scrypt hashes made with a different cost.
+    """
+    if stored_hash.startswith("scrypt$"):
+        try:
+            _, n, r, p, _digest = stored_hash.split("$")
+            n, r, p = int(n), int(r), int(p)
+        except ValueError:
+            return False, False
+        matches = hmac.compare_digest(hash_password(password, salt, n=n, r=r, p=p), stored_hash)
+        return matches, matches and (n, r, p) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    matches = hmac.compare_digest(legacy_hash_password(password, salt), stored_hash)
+    return matches, matches
+
+# Function to create a new user account in Google Sheet
+def create_user_account(school_id, password, email, school_name, logo_file):
+    try:
+        # --- Password Policy Validation ---
+        if len(password) < 6:
+            return False, "Password must be at least 6 characters long."
+        accounts = get_account_store()
+        if accounts.exists(school_id):
+            return False, "School ID already exists."
+
+        # Generate a salt and hash the password
+        salt = secrets.token_hex(16)
+        hashed_password = hash_password(password, salt)
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        # Handle logo upload to MongoDB to avoid Google Sheets cell size limit
+        logo_identifier = ""  # This will be stored in the sheet
+        if logo_file:
+            # Create a unique, predictable name for the logo in MongoDB
+            file_extension = os.path.splitext(logo_file.name)[1]
+            logo_filename_in_mongo = f"logo_{school_id}{file_extension}"
+
+            # To use upload_file_to_mongo, we can temporarily change the name
+            # of the uploaded file object.
+            original_name = logo_file.name
+            logo_file.name = logo_filename_in_mongo
+            logo_file.seek(0)  # Rewind file pointer as a good practice
+
+            # Upload to MongoDB
+            if not upload_file_to_mongo(school_id, logo_file, kind=FILE_KIND_LOGO):
+                return False, "Error saving school logo. Account not created."
+
+            logo_file.name = original_name  # Restore original name
+            logo_identifier = logo_filename_in_mongo
+
+        # Append new user data including the school name and logo identifier
+        accounts.append({
+            "school_id": school_id,
+            "password_hash": hashed_password,
+            "salt": salt,
+            "email": email,
+            "school_name": school_name,
+            "logo_identifier": logo_identifier,
+            "created": timestamp
+        })
+        return True, "Account created successfully!"
+    except Exception as e:
+        return False, f"Error creating account: {str(e)}"
+
+# Function to validate login credentials
+def validate_login(school_id, password):
+    """Validates user login using salted password hashes."""
+    try:
+        accounts = get_account_store()
+        account = accounts.get(school_id)
+        if account:
+            # Hash the provided password with the stored salt and compare
+            matches, needs_rehash = verify_password(password, account["salt"], account["password_hash"])
+            if matches:
+                if needs_rehash:
+                    # Upgrade old hashes while the plain password is at hand
+                    try:
+                        accounts.update_field(school_id, "password_hash", hash_password(password, account["salt"]))
+                    except Exception as e:
+                        print(f"Could not upgrade password hash for {school_id}: {e}")
+                return True, "Login successful!"
+            else:
+                return False, "Invalid password."
+        else:
+            return False, "School ID not found."
+
+    except Exception as e:
+        return False, f"Error validating login: {str(e)}"
+
+# Function to validate user for password reset
+def validate_reset_request(school_id, email):
+    """Checks if the school_id and email match a record."""
+    try:
+        account = get_account_store().get(school_id)
+        if account:
+            stored_email = account["email"]
+            if email.strip().lower() == stored_email.strip().lower():
+                return True, "Verification successful. Please set your new password."
+            else:
+                return False, "The email address provided does not match our records for this School ID."
+        else:
+            return False, "School ID not found."
+    except Exception as e:
+        return False, f"An error occurred during verification: {str(e)}"
+
+# Function to update user password in the sheet
+def update_user_password(school_id, new_password):
+    """Finds a user by school_id and updates their password."""
+    try:
+        accounts = get_account_store()
+        account = accounts.get(school_id)
+        if account:
+            new_hashed_password = hash_password(new_password, account["salt"])
+            accounts.update_field(school_id, "password_hash", new_hashed_password)
+            return True, "Password has been updated successfully!"
+        else:
+            # This case should ideally not be hit if the flow is correct
+            return False, "School ID not found. Could not update password."
+    except Exception as e:
+        return False, f"An error occurred while updating password: {str(e)}"
+
+def get_school_details(school_id):
+    """Returns (school name, logo asset or None)."""
+    try:
+        account = get_account_store().get(school_id)
+        if account:
+            school_logo = None
+            if account["logo_identifier"]:
+                school_logo = load_school_logo(school_id, account["logo_identifier"])
+            return account["school_name"], school_logo
+        else:
+            return None, None
+    except Exception as e:
+        st.error(f"Error fetching school details: {str(e)}")
+        return None, None
@@ -0,0 +1,207 @@
+"""
+Matplotlib renderers for the report charts. A chart spec is a dict of plain
+Python values (kind, title and the data to draw) and render_chart turns it
+into PNG bytes with the Agg backend. Specs and results are picklable and this
+module imports nothing but matplotlib, so charts can be rendered in worker
+processes without loading Streamlit or pandas there.
+"""
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib
+
+matplotlib.use("Agg")  # Render to PNG without a display, also in worker processes
+import matplotlib.pyplot as plt
+import numpy as np
+
+CHART_DPI = 200
+# Part of every chart cache key: bump when a renderer's output changes
+CHART_STYLE_VERSION = "1"
+
+# Default Plotly color sequence, to match the charts on the visualisations page
+PLOTLY_COLORS = [
+    '#636EFA', '#EF553B', '#00CC96', '#AB63FA', '#FFA15A',
+    '#19D3F3', '#FF6692', '#B6E880', '#FF97FF', '#FECB52'
+]
+
+RESPONSE_LEVEL_COLORS = {
+    "Agree": "#4CAF50",
+    "Neutral": "#FFC107",
+    "Disagree": "#F44336",
+    "Unknown": "#9E9E9E"
+}
+
+
+def _draw_summary_pie(spec):
+    """Compact pie for the general report; uses a legend for more than 4 categories."""
+    labels, sizes = spec["labels"], spec["sizes"]
+    # Use a legend if there are more than 4 categories to prevent label overlap
+    show_labels_on_pie = len(labels) <= 4
+
+    # Adjust figure size to accommodate legend if needed
+    figsize = (4.5, 3) if not show_labels_on_pie else (3, 3)
+    fig, ax = plt.subplots(figsize=figsize, dpi=CHART_DPI)
+
+    # Cycle through the defined colors if there are more labels than colors
+    colors_map = [PLOTLY_COLORS[i % len(PLOTLY_COLORS)] for i in range(len(labels))]
+
+    wedges, texts, autotexts = ax.pie(
+        sizes,
+        autopct=lambda p: f'{p:.1f}%' if p > 1 else '',  # Only show percentage for slices > 1%
+        startangle=90,
+        colors=colors_map,
+        pctdistance=0.8,  # Move percentage inside the slice
+        labels=labels if show_labels_on_pie else None,
+        labeldistance=1.1,
+        textprops={'fontsize': 7}  # Smaller font for labels on pie
+    )
+
+    # Style the percentage text for better visibility
+    for autotext in autotexts:
+        autotext.set_color('black')
+        autotext.set_weight('bold')
+        autotext.set_fontsize(7)
+
+    ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
+    ax.set_title(spec["title"], fontsize=10, pad=15)
+
+    # If not showing labels on pie, add a legend outside the chart
+    if not show_labels_on_pie:
+        ax.legend(wedges, labels,
+                  title="Categories",
+                  loc="center left",
+                  bbox_to_anchor=(1, 0, 0.5, 1),
+                  fontsize='x-small')
+    return fig
+
+
+def _draw_demographic_pie(spec):
+    """Demographic pie for the custom report."""
+    labels, sizes = spec["labels"], spec["sizes"]
+    colors_map = [PLOTLY_COLORS[i % len(PLOTLY_COLORS)] for i in range(len(labels))]
+
+    fig, ax = plt.subplots(figsize=(4, 3), dpi=CHART_DPI)
+    wedges, texts, autotexts = ax.pie(
+        sizes,
+        labels=labels if len(labels) <= 4 else None,
+        autopct=lambda p: f'{p:.1f}%' if p > 1 else '',
+        startangle=90,
+        colors=colors_map,
+        textprops={'fontsize': 8}
+    )
+
+    # Add legend if too many categories
+    if len(labels) > 4:
+        ax.legend(wedges, labels, title="Categories", loc="center left",
+                  bbox_to_anchor=(1, 0, 0.5, 1), fontsize='x-small')
+
+    ax.set_title(spec["title"], fontsize=10, pad=15)
+    ax.axis('equal')
+    return fig
+
+
+def _draw_bar(spec):
+    """Average construct score per group, labelled with the score and group size."""
+    groups, averages, counts = spec["groups"], spec["averages"], spec["counts"]
+    fig, ax = plt.subplots(figsize=(6, 4), dpi=CHART_DPI)
+
+    bars = ax.bar(groups, averages, color=PLOTLY_COLORS[:5][:len(groups)])
+
+    # Add value labels on bars
+    for bar, count in zip(bars, counts):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.05,
+                f'{height:.2f}\n(N={count})',
+                ha='center', va='bottom', fontsize=8, weight='bold')
+
+    ax.set_xlabel(spec["xlabel"], fontsize=10)
+    ax.set_ylabel('Average Score', fontsize=10)
+    ax.set_title(spec["title"], fontsize=11, pad=15)
+    ax.set_ylim(0, max(averages) + 0.5)
+
+    plt.setp(ax.get_xticklabels(), rotation=45 if len(groups) > 3 else 0)
+    return fig
+
+
+def _draw_stacked_percentages(spec):
+    """Agree/Neutral/Disagree percentages per group as stacked bars."""
+    groups = spec["groups"]
+    fig, ax = plt.subplots(figsize=(6, 4), dpi=CHART_DPI)
+
+    bottom = None
+    for response_level, percents in spec["levels"]:
+        bars = ax.bar(groups, percents, bottom=bottom, label=response_level,
+                      color=RESPONSE_LEVEL_COLORS[response_level])
+
+        # Add percentage labels on bars
+        for bar, value in zip(bars, percents):
+            if value > 5:  # Only show labels for segments > 5%
+                height = bar.get_height()
+                ax.text(bar.get_x() + bar.get_width()/2.,
+                        bar.get_y() + height/2.,
+                        f'{value:.1f}%',
+                        ha='center', va='center', fontsize=7, weight='bold')
+
+        bottom = np.asarray(percents, dtype=float) if bottom is None else bottom + np.asarray(percents, dtype=float)
+
+    ax.set_xlabel(spec["xlabel"], fontsize=10)
+    ax.set_ylabel('Percentage (%)', fontsize=10)
+    ax.set_title(spec["title"], fontsize=11, pad=15)
+    ax.legend(title="Response Level", bbox_to_anchor=(1.05, 1), loc='upper left')
+    ax.set_ylim(0, 100)
+    return fig
+
+
+CHART_RENDERERS = {
+    "summary_pie": _draw_summary_pie,
+    "demographic_pie": _draw_demographic_pie,
+    "bar": _draw_bar,
+    "stacked_percentages": _draw_stacked_percentages,
+}
+
+
+def render_chart(spec):
+    """Renders one chart spec to PNG bytes."""
+    fig = CHART_RENDERERS[spec["kind"]](spec)
+    buf = io.BytesIO()
+    fig.tight_layout()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+class ChartImageCache:
+    """
+    Rendered chart PNGs by content address, shared by every session of the
+    server process. Least recently used charts are evicted once the PNGs
+    take more than max_bytes.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._pngs = OrderedDict()
+        self._size = 0
+
+    def get(self, key):
+        """PNG bytes for the key, or None when the chart has not been rendered."""
+        with self._lock:
+            png = self._pngs.get(key)
+            if png is not None:
+                self._pngs.move_to_end(key)
+            return png
+
+    def put(self, key, png):
+        with self._lock:
+            if key in self._pngs:
+                self._size -= len(self._pngs.pop(key))
+            self._pngs[key] = png
+            self._size += len(png)
+            while self._size > self.max_bytes and len(self._pngs) > 1:
+                _, evicted = self._pngs.popitem(last=False)
+                self._size -= len(evicted)
+
+    def size_bytes(self):
+        with self._lock:
+            return self._size
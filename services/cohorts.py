@@ -0,0 +1,207 @@
+"""
+Cohort filter: metrics and group charts for a subset of students (e.g. Grade 9
+girls) without reprocessing the file. Every demographic value gets a boolean
+bitmap over the rows of the cleaned frame, built once per dataset; a cohort is
+an AND/OR combination of bitmaps and its metrics are masked array ops over the
+answer matrix.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from services.processing import (
+    BELONGING_SCORE_MEASURE, DEMOGRAPHIC_GROUPS, construct_means_from_totals, finish_aggregate_cube,
+    first_indexed_column, group_belonging_scores_from_cube, highest_and_lowest_areas, numeric_matrix
+)
+
+COHORT_MODES = {
+    "and": "In every selected group (AND)",
+    "or": "In any selected group (OR)",
+}
+
+def build_cohort_index(df_cleaned, column_index, matched_questions):
+    """
+    Precomputes everything a cohort needs: per demographic, one bool array per
+    value (missing values get none), and the float matrix of answers to every
+    matched question plus the belonging score, in row order.
+    """
+    bitmaps = {}
+    for label in DEMOGRAPHIC_GROUPS:
+        group_col = first_indexed_column(column_index, "demographics", label)
+        if not group_col or group_col not in df_cleaned.columns:
+            continue
+        codes, uniques = pd.factorize(df_cleaned[group_col], sort=True)
+        bitmaps[label] = {value: codes == i for i, value in enumerate(uniques.tolist())}
+
+    questions = list(dict.fromkeys(col for cols in matched_questions.values() for col in cols))
+    measures = numeric_matrix(df_cleaned, questions)
+    has_score = bool(questions)
+    if has_score:
+        score = df_cleaned[BELONGING_SCORE_MEASURE].to_numpy(dtype=float, na_value=np.nan)
+        measures = np.column_stack([measures, score])
+    return {
+        "bitmaps": bitmaps,
+        "questions": questions,
+        "measures": measures,
+        "has_score": has_score,
+        "n_students": len(df_cleaned),
+    }
+
+@st.cache_resource(max_entries=8, show_spinner=False)  # Read-only arrays, shared by every session viewing the dataset
+def get_cohort_index(fingerprint, _df_cleaned, _column_index, _matched_questions):
+    """The cohort index of a processed dataset, built on first use and cached on its file fingerprint."""
+    return build_cohort_index(_df_cleaned, _column_index, _matched_questions)
+
+def cohort_mask(cohort_index, selections, mode="and"):
+    """
+    Combines the bitmaps of the selected values into one row mask. Values of
+    the same demographic are always ORed (a student has one grade); the
+    demographics are combined with AND or OR. None when nothing is selected.
+    """
+    masks = []
+    for label, values in selections.items():
+        bitmaps = cohort_index["bitmaps"].get(label, {})
+        values = [value for value in values if value in bitmaps]
+        if values:
+            masks.append(np.logical_or.reduce([bitmaps[value] for value in values]))
+    if not masks:
+        return None
+    combine = np.logical_and if mode == "and" else np.logical_or
+    return combine.reduce(masks)
+
+def _cohort_stats(cohort_index, mask):
+    """Per-row contributions to every cube column for the rows in mask, as float matrices."""
+    values = cohort_index["measures"][mask]
+    answered = ~np.isnan(values)
+    stats = {
+        "sum": np.where(answered, values, 0.0),
+        "count": answered,
+        "sumsq": np.where(answered, values ** 2, 0.0),
+        "Agree": values >= 4,
+        "Neutral": values == 3,
+        "Disagree": values <= 2,
+    }
+    stats["Unknown"] = answered & ~(stats["Agree"] | stats["Neutral"] | stats["Disagree"])
+    return {name: stat.astype(float) for name, stat in stats.items()}
+
+def _membership_totals(cohort_index, stats, members):
+    """
+    Cube rows for groups given as {group tuple: masked bool array}: one
+    (groups x rows) @ (rows x measures) product per statistic. None when no
+    group has a member or there is nothing to measure.
+    """
+    groups = [group for group, member in members.items() if member.any()]
+    measure_names = cohort_index["questions"] + ([BELONGING_SCORE_MEASURE] if cohort_index["has_score"] else [])
+    if not groups or not measure_names:
+        return None
+    membership = np.stack([members[group] for group in groups]).astype(float)
+    # Flattened question-major to match the index
+    totals = {name: (membership @ stat).T.ravel() for name, stat in stats.items()}
+    index = pd.MultiIndex.from_tuples([(question,) + group for question in measure_names for group in groups])
+    return pd.DataFrame(totals, index=index)
+
+def cohort_aggregate_cube(cohort_index, mask, column_index):
+    """
+    The aggregate cube of the rows in mask, in the layout processing builds
+    for the whole dataset. Each demographic's totals are one product of its
+    masked value bitmaps with the per-row statistics.
+    """
+    stats = _cohort_stats(cohort_index, mask)
+    cube = {}
+    for label, bitmaps in cohort_index["bitmaps"].items():
+        totals = _membership_totals(cohort_index, stats, {(value,): bitmap[mask] for value, bitmap in bitmaps.items()})
+        if totals is not None:
+            cube[label] = totals
+    return finish_aggregate_cube(cube, column_index)
+
+def cohort_crosstab_cube(cohort_index, mask, label_a, label_b, column_index):
+    """
+    The cross-tab cube of one pair of demographics for the rows in mask; the
+    members of each combination of groups are the AND of two bitmaps.
+    """
+    bitmaps_a = cohort_index["bitmaps"].get(label_a, {})
+    bitmaps_b = cohort_index["bitmaps"].get(label_b, {})
+    members = {
+        (value_a, value_b): (bitmap_a & bitmap_b)[mask]
+        for value_a, bitmap_a in bitmaps_a.items() for value_b, bitmap_b in bitmaps_b.items()
+    }
+    totals = _membership_totals(cohort_index, _cohort_stats(cohort_index, mask), members)
+    return finish_aggregate_cube({(label_a, label_b): totals}, column_index) if totals is not None else {}
+
+def cohort_metrics(cohort_index, mask, matched_questions, column_index):
+    """
+    Recomputes the key metrics, category averages and aggregate cube for the
+    students in mask, exactly as processing does for the whole dataset.
+    """
+    values = cohort_index["measures"][mask]
+    questions = cohort_index["questions"]
+    answers = values[:, :len(questions)]
+    answered = ~np.isnan(answers)
+    category_averages = construct_means_from_totals(
+        matched_questions, questions, np.where(answered, answers, 0.0).sum(axis=0), answered.sum(axis=0)
+    )
+    overall_belonging_score = None
+    if cohort_index["has_score"]:
+        scores = values[:, -1]
+        scores = scores[~np.isnan(scores)]
+        overall_belonging_score = float(scores.mean()) if scores.size else np.nan
+    highest_area, lowest_area = highest_and_lowest_areas(category_averages)
+    aggregate_cube = cohort_aggregate_cube(cohort_index, mask, column_index)
+    return {
+        "cohort_index": cohort_index,
+        "mask": mask,
+        "n_students": int(mask.sum()),
+        "overall_belonging_score": overall_belonging_score,
+        "category_averages": category_averages,
+        "highest_area": highest_area,
+        "lowest_area": lowest_area,
+        "aggregate_cube": aggregate_cube,
+        "group_belonging_scores": group_belonging_scores_from_cube(aggregate_cube),
+    }
+
+def render_cohort_filter():
+    """
+    Draws the cohort filter panel for the processed dataset and returns the
+    cohort metrics of the selected students plus a hashable 'key' of the
+    selection, or None when no filter is set or no student matches. The
+    selection is kept in session state across pages.
+    """
+    df_cleaned = st.session_state.get("df_cleaned")
+    if df_cleaned is None or df_cleaned.empty:
+        return None
+    column_index = st.session_state.get("column_index", {})
+    matched_questions = st.session_state.get("matched_questions", {})
+    fingerprint = st.session_state.get("processed_fingerprint")
+    if fingerprint is None:
+        cohort_index = build_cohort_index(df_cleaned, column_index, matched_questions)
+    else:
+        cohort_index = get_cohort_index(fingerprint, df_cleaned, column_index, matched_questions)
+
+    saved = st.session_state.setdefault("cohort_filter", {"selections": {}, "mode": "and"})
+    with st.expander("Filter students (cohort)", expanded=bool(saved["selections"])):
+        selections = {}
+        columns = st.columns(3)
+        for i, (label, bitmaps) in enumerate(cohort_index["bitmaps"].items()):
+            key = f"cohort_{label}"
+            # Widget state is dropped on pages without the panel; restore it from the saved selection
+            previous = st.session_state.get(key, saved["selections"].get(label, []))
+            st.session_state[key] = [value for value in previous if value in bitmaps]
+            with columns[i % 3]:
+                selections[label] = st.multiselect(label, list(bitmaps), key=key)
+        if "cohort_mode" not in st.session_state:
+            st.session_state["cohort_mode"] = saved["mode"]
+        mode = st.radio("Students to include", list(COHORT_MODES), format_func=COHORT_MODES.get,
+                        horizontal=True, key="cohort_mode")
+    saved.update(selections={label: values for label, values in selections.items() if values}, mode=mode)
+
+    mask = cohort_mask(cohort_index, selections, mode)
+    if mask is None:
+        return None
+    if not mask.any():
+        st.warning("No students match this filter; showing all students.")
+        return None
+    st.info(f"Showing a cohort of {int(mask.sum())} of {cohort_index['n_students']} students.")
+    cohort = cohort_metrics(cohort_index, mask, matched_questions, column_index)
+    # Hashable description of the selection, for caching per-cohort results
+    cohort["key"] = (mode, tuple(sorted((label, tuple(values)) for label, values in saved["selections"].items())))
+    return cohort
@@ -0,0 +1,116 @@
+"""Background writer that batches feedback rows into the feedback sheet."""
+import json
+import os
+import threading
+import time
+
+import streamlit as st
+
+from services.sheets import get_gspread_client
+
+# --- Feedback Queue ---
+FEEDBACK_SHEET_NAME = "Apnapan Data Insights Generator Tool Feedbacks"
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FEEDBACK_SPOOL_PATH = os.path.join(APP_DIR, ".feedback_spool.jsonl")  # Next to app.py
+FEEDBACK_BATCH_SIZE = 50
+FEEDBACK_FLUSH_INTERVAL_SECONDS = 2
+FEEDBACK_MAX_BACKOFF_SECONDS = 300
+
+class AsyncFeedbackWriter:
+    """
+    Buffers feedback rows and appends them to the feedback sheet from a
+    background thread, in batches with append_rows. Every row is written to a
+    local spool file before submit returns, so rows that have not reached the
+    sheet yet survive a restart and are sent by the next writer. Failed
+    batches are retried with exponential backoff.
+    """
+
+    def __init__(self, open_sheet, spool_path=FEEDBACK_SPOOL_PATH, batch_size=FEEDBACK_BATCH_SIZE):
+        self._open_sheet = open_sheet
+        self._spool_path = spool_path
+        self._batch_size = batch_size
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._sheet = None
+        self._pending = self._read_spool()
+        self._thread = threading.Thread(target=self._run, name="feedback-writer", daemon=True)
+        self._thread.start()
+        if self._pending:
+            self._wake.set()
+
+    def _read_spool(self):
+        if not os.path.exists(self._spool_path):
+            return []
+        rows = []
+        with open(self._spool_path, encoding="utf-8") as spool:
+            for line_number, line in enumerate(spool, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:  # e.g. a line cut short by a crash mid-append
+                    print(f"Skipping malformed line {line_number} of {self._spool_path}")
+        return rows
+
+    def _rewrite_spool(self):
+        temp_path = self._spool_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as spool:
+            for row in self._pending:
+                spool.write(json.dumps(row) + "\n")
+            spool.flush()
+            os.fsync(spool.fileno())
+        os.replace(temp_path, self._spool_path)
+
+    def submit(self, row):
+        """Spools the row and returns immediately; the background thread sends it."""
+        with self._lock:
+            with open(self._spool_path, "a", encoding="utf-8") as spool:
+                spool.write(json.dumps(row) + "\n")
+                spool.flush()
+                os.fsync(spool.fileno())
+            self._pending.append(row)
+        self._wake.set()
+
+    def queue_depth(self):
+        """Number of rows not yet confirmed by the sheet."""
+        with self._lock:
+            return len(self._pending)
+
+    def _send(self, batch):
+        if self._sheet is None:
+            self._sheet = self._open_sheet()
+        self._sheet.append_rows(batch)  # RAW input: feedback text is never parsed as a formula
+
+    def _run(self):
+        failures = 0
+        while True:
+            self._wake.wait(timeout=FEEDBACK_FLUSH_INTERVAL_SECONDS)
+            self._wake.clear()
+            while True:
+                with self._lock:
+                    batch = self._pending[:self._batch_size]
+                if not batch:
+                    break
+                try:
+                    self._send(batch)
+                except Exception as e:
+                    failures += 1
+                    self._sheet = None  # Reopen in case the connection went stale
+                    backoff = min(FEEDBACK_FLUSH_INTERVAL_SECONDS * 2 ** failures, FEEDBACK_MAX_BACKOFF_SECONDS)
+                    print(f"Feedback batch of {len(batch)} failed ({e}); retrying in {backoff}s")
+                    time.sleep(backoff)
+                    continue
+                failures = 0
+                with self._lock:
+                    # Rows submitted while the batch was in flight stay queued
+                    del self._pending[:len(batch)]
+                    try:
+                        self._rewrite_spool()
+                    except Exception as e:  # Keep sending; the next successful rewrite catches the spool up
+                        print(f"Could not rewrite the feedback spool ({e}); sent rows may be sent again after a restart")
+
+@st.cache_resource
+def get_feedback_writer():
+    """One writer thread per server process. The Sheets client is resolved here, on the script thread."""
+    client = get_gspread_client()
+    return AsyncFeedbackWriter(lambda: client.open(FEEDBACK_SHEET_NAME).sheet1)
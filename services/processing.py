@@ -0,0 +1,706 @@
+"""Survey processing: column matching, cleaning, Likert mapping and belonging scores."""
+import functools
+import io
+import itertools
+import re
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from pandas.api.types import union_categoricals
+
+# --- Column Matching ---
+# Keywords that identify each belonging construct's question columns
+BELONGING_QUESTIONS = {
+    "Safety": ["safe", "surakshit"],
+    "Respect": ["respected", "izzat", "as much respect"],
+    "Welcome": ["being welcomed", "welcome", "swagat"],
+    "Relationships with Teachers": ["one teacher", "share your problem", "care about your feelings", " care about how I feel", "feel close", "close to your teachers"],
+    "Participation": ["opportunities", "participate", "school activities", "take part", "join in many activities"],
+    "Acknowledgement": ["notice", "noticed", "listen to you", "dekhein", "acknowledge", "recognized", "listen to what I say", "valued", "heard", "seen", "like you", "like me", "do something well"]
+}
+
+# Keywords that identify the demographic column used for each student group
+DEMOGRAPHIC_GROUPS = {
+    "Gender": ["gender", "What gender do you use"],
+    "Grade": ["grade", "Which grade are you in"],
+    "Income Status": ["Income Category"],
+    "Health Condition": ["disability", "health condition"],
+    "Ethnicity": ["ethnicity_cleaned"],
+    "Religion": ["religion"]
+}
+
+# Keywords for the raw columns the cleaning stage works on
+CLEANING_KEYWORDS = {
+    "normalize": ["gender", "religion"],
+    "grade": ["grade"],
+    "ethnicity": ["ethnicity"],
+    "kaash": ["kaash"],
+    "possessions": ["what items among these do you have at home"]
+}
+
+# Columns derived during cleaning, added when their source column exists
+DERIVED_COLUMNS = {
+    "ethnicity": "ethnicity_cleaned",
+    "possessions": "Income Category"
+}
+
+def _compile_keyword_matcher():
+    """
+    Compiles all construct, demographic and cleaning keywords into one regex.
+    The pattern is a lookahead so it reports the longest keyword starting at
+    every position of a column name; shorter keywords starting at the same
+    position are its prefixes, so their groups are recorded with it.
+    """
+    sections = {"constructs": BELONGING_QUESTIONS, "demographics": DEMOGRAPHIC_GROUPS, "cleaning": CLEANING_KEYWORDS}
+    owners = {}
+    for section, groups in sections.items():
+        for name, keywords in groups.items():
+            for keyword in keywords:
+                owners.setdefault(keyword.lower(), set()).add((section, name))
+    ordered = sorted(owners, key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(re.escape(k) for k in ordered) + "))")
+    prefix_owners = {
+        keyword: frozenset().union(*(groups for other, groups in owners.items() if keyword.startswith(other)))
+        for keyword in owners
+    }
+    return pattern, prefix_owners
+
+KEYWORD_PATTERN, KEYWORD_OWNERS = _compile_keyword_matcher()
+
+def match_column_groups(column):
+    """Returns the set of (section, name) keyword groups whose keywords occur in a column name."""
+    groups = set()
+    for match in KEYWORD_PATTERN.finditer(str(column).lower()):
+        groups |= KEYWORD_OWNERS[match.group(1)]
+    return groups
+
+def build_column_index(columns):
+    """
+    Builds the column index for a dataset: for every construct, demographic
+    group and cleaning rule, the list of matching columns in column order.
+    Derived columns (e.g. ethnicity_cleaned) are included when their source
+    column is present, so every page can look columns up instead of scanning.
+    """
+    column_index = {
+        "constructs": {name: [] for name in BELONGING_QUESTIONS},
+        "demographics": {name: [] for name in DEMOGRAPHIC_GROUPS},
+        "cleaning": {name: [] for name in CLEANING_KEYWORDS}
+    }
+    columns = list(columns)
+    matched = [(col, match_column_groups(col)) for col in columns]
+    for source, derived in DERIVED_COLUMNS.items():
+        if any(("cleaning", source) in groups for _, groups in matched) and derived not in columns:
+            matched.append((derived, match_column_groups(derived)))
+    for col, groups in matched:
+        for section, name in groups:
+            column_index[section][name].append(col)
+    # Cleaning rules only apply to columns that exist in the raw data
+    column_index["cleaning"] = {
+        name: [col for col in cols if col in columns] for name, cols in column_index["cleaning"].items()
+    }
+    return column_index
+
+def first_indexed_column(column_index, section, name):
+    """Returns the first column matched for a keyword group, or None."""
+    if not column_index:
+        return None
+    cols = column_index.get(section, {}).get(name, [])
+    return cols[0] if cols else None
+
+# Likert answers and their numeric values
+LIKERT_MAPPING = {
+    "Strongly Disagree": 1, "Disagree": 2, "Neutral": 3, "Agree": 4, "Strongly Agree": 5
+}
+# Answer sets larger than this are checked without being memoized (free text, IDs, ...)
+LIKERT_LOOKUP_CACHE_MAX_VALUES = 64
+
+def _likert_lookup(unique_values):
+    """
+    Normalizes a set of distinct answers once. Returns (is_likert, values) where
+    values holds the numeric value of each answer: its Likert score, the number
+    itself for numeric answers, or NaN.
+    """
+    normalized = pd.Index(unique_values).astype(str).str.strip().str.title()
+    likert_scores = normalized.map(LIKERT_MAPPING)
+    is_likert = bool(likert_scores.notna().any())
+    values = np.where(
+        likert_scores.notna(),
+        likert_scores.to_numpy(dtype=float, na_value=np.nan),
+        pd.to_numeric(pd.Series(normalized), errors="coerce").to_numpy(dtype=float)
+    )
+    return is_likert, values
+
+@functools.lru_cache(maxsize=256)
+def _cached_likert_lookup(unique_values):
+    return _likert_lookup(unique_values)
+
+def map_likert_column(series, force=False):
+    """
+    Detects whether a column holds Likert answers by looking at its distinct
+    values only, and if so returns the column mapped to numbers in one pass
+    through the factorized codes. Returns None for non-Likert columns unless
+    force is set (used when another chunk of the same column was Likert).
+    """
+    # Numbers, booleans and dates can never spell out a Likert answer
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)
+            or isinstance(series.dtype, pd.CategoricalDtype)):
+        return None
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return None
+    # Surveys repeat the same answer set across many questions, so memoize per answer set
+    if len(uniques) <= LIKERT_LOOKUP_CACHE_MAX_VALUES:
+        is_likert, values = _cached_likert_lookup(tuple(pd.Index(uniques).astype(str)))
+    else:
+        is_likert, values = _likert_lookup(uniques)
+    if not (is_likert or force):
+        return None
+    return pd.Series(np.where(codes >= 0, values[codes], np.nan), index=series.index, name=series.name)
+
+def numeric_matrix(df, columns):
+    """Converts the given columns to a single float matrix (non-numeric values become NaN)."""
+    if not columns:
+        return np.empty((len(df), 0))
+    return df[columns].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+def compute_belonging_scores(df, matched_questions, kaash_cols):
+    """
+    Vectorized scoring engine. Every matched construct column is converted to
+    numbers exactly once; the per-row belonging scores and the per-construct
+    averages are then derived from that one float matrix with masked array ops.
+    Returns a dict of NumPy arrays ('raw', 'count', 'kaash', 'score') plus
+    'construct_means', the per-column sums/counts behind them and the float
+    'matrix' of answers itself.
+    """
+    n_rows = len(df)
+    score_cols = list(dict.fromkeys(col for cols in matched_questions.values() for col in cols))
+    position = {col: i for i, col in enumerate(score_cols)}
+    matrix = numeric_matrix(df, score_cols)
+    valid = ~np.isnan(matrix)
+    filled = np.where(valid, matrix, 0.0)
+
+    # Row-level scores (a question matched by two constructs counts twice, as before)
+    belonging_idx = [position[col] for cols in matched_questions.values() for col in cols]
+    raw = filled[:, belonging_idx].sum(axis=1)
+    count = valid[:, belonging_idx].sum(axis=1)
+
+    # Kaash responses are averaged per row and subtracted from the raw total
+    if kaash_cols:
+        kaash_matrix = numeric_matrix(df, kaash_cols)
+        kaash_valid = ~np.isnan(kaash_matrix)
+        kaash_count = kaash_valid.sum(axis=1)
+        kaash_sum = np.where(kaash_valid, kaash_matrix, 0.0).sum(axis=1)
+        kaash = np.divide(kaash_sum, kaash_count, out=np.full(n_rows, np.nan), where=kaash_count > 0)
+    else:
+        kaash = np.zeros(n_rows)
+    score = np.divide(raw - kaash, count, out=np.zeros(n_rows), where=count > 0)
+
+    column_sums = filled.sum(axis=0)
+    column_counts = valid.sum(axis=0)
+
+    return {
+        "raw": raw,
+        "count": count,
+        "kaash": kaash,
+        "score": score,
+        "construct_means": construct_means_from_totals(matched_questions, score_cols, column_sums, column_counts),
+        "columns": score_cols,
+        "column_sums": column_sums,
+        "column_counts": column_counts,
+        "matrix": matrix,
+    }
+
+def construct_means_from_totals(matched_questions, columns, column_sums, column_counts):
+    """
+    Construct averages are the mean of each question's mean, skipping empty
+    questions. Works from per-question sums and counts so that totals
+    accumulated over several chunks give the same result as one pass.
+    """
+    position = {col: i for i, col in enumerate(columns)}
+    column_means = np.divide(column_sums, column_counts, out=np.full(len(columns), np.nan), where=column_counts > 0)
+    construct_means = {}
+    for cat, cols in matched_questions.items():
+        if not cols:
+            construct_means[cat] = 0
+            continue
+        means = column_means[[position[col] for col in cols]]
+        means = means[~np.isnan(means)]
+        construct_means[cat] = float(means.mean()) if means.size else np.nan
+    return construct_means
+
+# Derived per-student scores stored at single precision in the compact frame
+DERIVED_SCORE_COLUMNS = ["KaashScore", "BelongingRaw", "BelongingScore"]
+
+def compact_likert_column(values):
+    """Stores Likert answers as nullable Int8, or float32 when an answer is not a small integer."""
+    answered = values.dropna()
+    if ((answered % 1 == 0) & answered.between(-128, 127)).all():
+        return values.astype("Int8")
+    return values.astype("float32")
+
+def compact_cleaned_frame(df_cleaned, column_index, likert_cols):
+    """
+    Converts the cleaned frame to a compact representation: demographic text
+    columns become categoricals, Likert answers nullable Int8 and derived
+    scores float32.
+    """
+    demographic_cols = {col for cols in column_index["cleaning"].values() for col in cols}
+    demographic_cols |= {col for cols in column_index["demographics"].values() for col in cols}
+    # Kaash answers are scores and possessions lists are free text (summarised by Income Category)
+    demographic_cols -= set(column_index["cleaning"]["kaash"]) | set(column_index["cleaning"]["possessions"])
+    for col in df_cleaned.columns:
+        if col in demographic_cols and col not in likert_cols and df_cleaned[col].dtype == object:
+            df_cleaned[col] = df_cleaned[col].astype("category")
+
+    for col in likert_cols:
+        df_cleaned[col] = compact_likert_column(df_cleaned[col])
+
+    for col in DERIVED_SCORE_COLUMNS:
+        df_cleaned[col] = df_cleaned[col].astype("float32")
+    df_cleaned["BelongingCount"] = pd.to_numeric(df_cleaned["BelongingCount"], downcast="integer")
+    return df_cleaned
+
+def concat_compact_chunks(chunks):
+    """Concatenates compacted chunks, merging categoricals so they stay categorical."""
+    if len(chunks) == 1:
+        return chunks[0]
+    columns = {}
+    for col in chunks[0].columns:
+        parts = [chunk[col] for chunk in chunks]
+        is_categorical = [isinstance(part.dtype, pd.CategoricalDtype) for part in parts]
+        if all(is_categorical):
+            columns[col] = pd.Series(union_categoricals(parts, sort_categories=True), name=col)
+        elif any(is_categorical):
+            columns[col] = pd.concat([part.astype(object) for part in parts], ignore_index=True).astype("category")
+        else:
+            columns[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+# --- Demographic Normalization ---
+# Each rule takes the distinct raw values of a column (missing values included,
+# as an object Series) and returns the cleaned value for each of them.
+def normalize_text_values(values):
+    """Trimmed, title-cased text; missing answers become "Unknown"."""
+    return values.astype(str).str.strip().str.title().replace('Nan', 'Unknown')
+
+def normalize_grade_values(values):
+    """The first number in each answer ("Grade 8" -> "8"), else the title-cased text or "Unknown"."""
+    text = values.astype(str).str.strip()
+    fallback = text.str.title().where(~text.str.lower().isin(['nan', '']), 'Unknown')
+    return text.str.extract(r'(\d+)', expand=False).fillna(fallback)
+
+# Checked in order: "sc" must win over "st", "other" stands for OBC, "do" for "Don't know"
+ETHNICITY_RULES = [("general", "General"), ("sc", "SC"), ("other", "OBC"), ("do", "Don't Know"), ("st", "ST")]
+
+def clean_ethnicity_values(values):
+    """Maps ethnicity answers onto General/SC/OBC/Don't Know/ST, title-casing anything else."""
+    text = values.astype(str)
+    lowered = text.str.lower().str.strip()
+    conditions = [lowered.str.contains(keyword, regex=False) for keyword, _ in ETHNICITY_RULES]
+    return np.select(conditions, [label for _, label in ETHNICITY_RULES], default=text.str.strip().str.title())
+
+def income_category_values(values):
+    """High/Mid/Low income from the list of possessions at home; "Unknown" when unanswered."""
+    missing = values.isna()
+    items = values.where(~missing, "").astype(str).str.lower()
+    has_car = items.str.contains("car", regex=False)
+    has_computer = items.str.contains("computer", regex=False) | items.str.contains("laptop", regex=False)
+    has_home = items.str.contains("apna ghar", regex=False)
+    return np.select(
+        [missing, has_car & has_home, has_computer | (has_home & ~has_car)],
+        ["Unknown", "High", "Mid"],
+        default="Low"
+    )
+
+def map_distinct_values(series, rule):
+    """
+    Evaluates a normalization rule once per distinct value of a column and
+    broadcasts the results to every row through categorical codes, so no
+    Python code runs per row. Returns a categorical Series with sorted
+    categories, aligned with the input.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    cleaned = np.asarray(rule(pd.Series(uniques, dtype=object)), dtype=object)
+    categories, cleaned_codes = np.unique(cleaned.astype(str), return_inverse=True)
+    return pd.Series(
+        pd.Categorical.from_codes(cleaned_codes[codes], categories=categories),
+        index=series.index, name=series.name
+    )
+
+def clean_chunk(df_cleaned, column_index):
+    """
+    Row-level cleaning: normalizes demographics, maps Likert answers to numbers
+    and derives ethnicity_cleaned and Income Category. Works on a whole file or
+    on one chunk of it. Returns the cleaned frame and the Likert columns found in it.
+    """
+    # --- Demographic Normalization (Case-Insensitive), over distinct values only ---
+    for col in column_index["cleaning"]["normalize"]:
+        df_cleaned[col] = map_distinct_values(df_cleaned[col], normalize_text_values)
+
+    grade_column = first_indexed_column(column_index, "cleaning", "grade")
+    if grade_column:
+        df_cleaned[grade_column] = map_distinct_values(df_cleaned[grade_column], normalize_grade_values)
+
+    # --- Questionnaire Mapping (convert to numeric) ---
+    likert_cols = []
+    for col in df_cleaned.columns:
+        likert_values = map_likert_column(df_cleaned[col])
+        if likert_values is not None:
+            df_cleaned[col] = likert_values
+            likert_cols.append(col)
+
+    # --- Derived Demographics ---
+    ethnicity_column = first_indexed_column(column_index, "cleaning", "ethnicity")
+    if ethnicity_column:
+        df_cleaned[DERIVED_COLUMNS["ethnicity"]] = map_distinct_values(df_cleaned[ethnicity_column], clean_ethnicity_values)
+
+    possessions_column = first_indexed_column(column_index, "cleaning", "possessions")
+    if possessions_column:
+        df_cleaned[DERIVED_COLUMNS["possessions"]] = map_distinct_values(df_cleaned[possessions_column], income_category_values)
+
+    return df_cleaned, likert_cols
+
+# --- Aggregate Cube ---
+# Answers are bucketed like the percentage breakdown charts; "Unknown" holds
+# numeric answers between the Likert points (e.g. 2.5)
+RESPONSE_LEVELS = ["Agree", "Neutral", "Disagree", "Unknown"]
+CUBE_COLUMNS = ["sum", "count", "sumsq"] + RESPONSE_LEVELS
+# Per-student belonging score, aggregated in the cube next to the questions
+BELONGING_SCORE_MEASURE = "BelongingScore"
+
+def response_stats(values):
+    """
+    Per-row contributions to every cube column for each column of values
+    (floats, NaN = unanswered): a frame with (statistic, question) columns.
+    """
+    answered = values.notna()
+    stats = {
+        "sum": values.fillna(0.0),
+        "count": answered,
+        "sumsq": values.pow(2).fillna(0.0),
+        "Agree": values >= 4,
+        "Neutral": values == 3,
+        "Disagree": values <= 2,
+    }
+    stats["Unknown"] = answered & ~(stats["Agree"] | stats["Neutral"] | stats["Disagree"])
+    return pd.concat(stats, axis=1)
+
+def aggregate_by_group(stats, groups):
+    """
+    Sums the response_stats rows per group, or per combination of groups when
+    given a list of grouping Series. Returns a frame indexed by (question,
+    group, ...) with CUBE_COLUMNS; rows without a group are skipped.
+    """
+    keys = groups if isinstance(groups, list) else [groups]
+    levels = [f"group_{i}" for i in range(len(keys))]
+    totals = stats.groupby(keys, observed=True).sum()
+    totals.index = pd.MultiIndex.from_arrays(
+        [totals.index.get_level_values(i).astype(object) for i in range(len(keys))], names=levels
+    )
+    totals = totals.stack(level=1, future_stack=True)
+    totals.index = totals.index.set_names(levels + ["question"])
+    return totals.reorder_levels(["question"] + levels)[CUBE_COLUMNS]
+
+def accumulate_aggregate_cube(cube, measures, df_chunk, column_index):
+    """Adds one chunk's per-group aggregates of every measure (question or score) to the running cube."""
+    if measures.shape[1] == 0:  # No matched questions: nothing to aggregate
+        return
+    stats = response_stats(measures)
+    for label in DEMOGRAPHIC_GROUPS:
+        group_col = first_indexed_column(column_index, "demographics", label)
+        if not group_col or group_col not in df_chunk.columns:
+            continue
+        totals = aggregate_by_group(stats, df_chunk[group_col])
+        cube[label] = totals if label not in cube else cube[label].add(totals, fill_value=0)
+
+def finish_aggregate_cube(cube, column_index):
+    """
+    Sorts the accumulated cube and names each frame's group levels after their
+    demographic columns. Frames are keyed by a demographic label, or by a tuple
+    of labels for combinations of demographics.
+    """
+    finished = {}
+    for key, totals in cube.items():
+        labels = key if isinstance(key, tuple) else (key,)
+        totals = totals.sort_index()
+        count_cols = ["count"] + RESPONSE_LEVELS
+        totals[count_cols] = totals[count_cols].astype("int64")
+        totals.index = totals.index.set_names(
+            ["question"] + [first_indexed_column(column_index, "demographics", label) for label in labels]
+        )
+        finished[key] = totals
+    return finished
+
+def cube_slice(aggregate_cube, label, question):
+    """The cube rows of one question for one demographic, indexed by group; None when not aggregated."""
+    totals = (aggregate_cube or {}).get(label)
+    if totals is None or question not in totals.index.get_level_values("question"):
+        return None
+    return totals.xs(question, level="question")
+
+def group_means(aggregate_cube, label, question, group_col):
+    """
+    Average answer and number of answers per group, as the construct-by-group
+    charts show them: columns [group_col, 'AvgScore', 'Count'], groups without
+    answers left out. Returns None when the question or demographic is missing.
+    """
+    totals = cube_slice(aggregate_cube, label, question)
+    if totals is None:
+        return None
+    totals = totals[totals["count"] > 0]
+    return pd.DataFrame({
+        group_col: totals.index.tolist(),
+        "AvgScore": (totals["sum"] / totals["count"]).to_numpy(),
+        "Count": totals["count"].to_numpy()
+    })
+
+def response_level_percentages(aggregate_cube, label, question, group_col):
+    """
+    Agree/Neutral/Disagree/Unknown answers per group for the percentage
+    breakdowns: one row per group and level with answers, columns
+    [group_col, 'ResponseLevel', 'Count', 'Percent']. None when not aggregated.
+    """
+    totals = cube_slice(aggregate_cube, label, question)
+    if totals is None:
+        return None
+    totals = totals[totals["count"] > 0]
+    levels = totals[sorted(RESPONSE_LEVELS)].rename_axis(columns="ResponseLevel").stack()
+    levels = levels[levels > 0]
+    percent_df = levels.rename("Count").reset_index()
+    percent_df.columns = [group_col, "ResponseLevel", "Count"]
+    group_totals = totals["count"].reindex(levels.index.get_level_values(0)).to_numpy()
+    percent_df["Percent"] = (percent_df["Count"] / group_totals * 100).round(1)
+    return percent_df
+
+def group_belonging_scores_from_cube(aggregate_cube):
+    """Average belonging score and number of students per group, for every demographic in the cube."""
+    group_scores = {}
+    for label in aggregate_cube:
+        totals = cube_slice(aggregate_cube, label, BELONGING_SCORE_MEASURE)
+        if totals is None:
+            continue
+        group_scores[label] = pd.DataFrame({
+            "Average Belonging Score": (totals["sum"] / totals["count"]).round(2),
+            "Students": totals["count"].astype(int)
+        })
+    return group_scores
+
+# --- Two-way Cross-tabs ---
+def build_crosstab_cube(df_cleaned, column_index, matched_questions):
+    """
+    The aggregate cube for every pair of demographics: per matched question
+    (and the belonging score), the CUBE_COLUMNS totals of each combination of
+    the two demographics' groups. Frames are keyed by (label_a, label_b) in
+    DEMOGRAPHIC_GROUPS order.
+    """
+    questions = list(dict.fromkeys(col for cols in matched_questions.values() for col in cols))
+    if not questions:
+        return {}
+    measures = pd.DataFrame(numeric_matrix(df_cleaned, questions), columns=questions, index=df_cleaned.index)
+    measures[BELONGING_SCORE_MEASURE] = df_cleaned[BELONGING_SCORE_MEASURE].astype(float)
+    stats = response_stats(measures)
+
+    group_columns = {}
+    for label in DEMOGRAPHIC_GROUPS:
+        group_col = first_indexed_column(column_index, "demographics", label)
+        if group_col and group_col in df_cleaned.columns and group_col not in group_columns.values():
+            group_columns[label] = group_col
+    cube = {
+        (label_a, label_b): aggregate_by_group(stats, [df_cleaned[group_columns[label_a]], df_cleaned[group_columns[label_b]]])
+        for label_a, label_b in itertools.combinations(group_columns, 2)
+    }
+    return finish_aggregate_cube(cube, column_index)
+
+@st.cache_resource(max_entries=8, show_spinner=False)  # Read-only frames, shared by every session viewing the dataset
+def get_crosstab_cube(fingerprint, _df_cleaned, _column_index, _matched_questions):
+    """The cross-tab cube of a processed dataset, built once on first use and cached on its file fingerprint."""
+    return build_crosstab_cube(_df_cleaned, _column_index, _matched_questions)
+
+def crosstab_table(crosstab_cube, label_a, label_b, question):
+    """
+    One question broken down by two demographics: average answer, number of
+    answers and response-level percentages for every combination of groups
+    with answers, indexed by (group_a, group_b). None when not aggregated.
+    """
+    totals = (crosstab_cube or {}).get((label_a, label_b))
+    if totals is None:
+        totals = (crosstab_cube or {}).get((label_b, label_a))
+        if totals is None:
+            return None
+        totals = totals.reorder_levels([0, 2, 1]).sort_index()
+    if question not in totals.index.get_level_values("question"):
+        return None
+    totals = totals.xs(question, level="question")
+    totals = totals[totals["count"] > 0]
+    table = pd.DataFrame({"AvgScore": totals["sum"] / totals["count"], "Count": totals["count"]})
+    for level in RESPONSE_LEVELS:
+        table[f"{level} %"] = (totals[level] / totals["count"] * 100).round(1)
+    return table
+
+def sort_group_values(label, values):
+    """Group values in display order: grades numerically (non-numeric grades last), others as given."""
+    values = list(values)
+    if label != "Grade":
+        return values
+    def grade_key(value):
+        numeric = pd.to_numeric(value, errors="coerce")
+        return (0, numeric, "") if pd.notna(numeric) else (1, 0, str(value))
+    return sorted(values, key=grade_key)
+
+def highest_and_lowest_areas(category_averages):
+    """The constructs with the highest and the lowest average; constructs without answers are never the lowest."""
+    highest_area = max(category_averages, key=category_averages.get) if category_averages else None
+    valid_categories = {k: v for k, v in category_averages.items() if v > 0.00}
+    lowest_area = min(valid_categories, key=valid_categories.get) if valid_categories else None
+    return highest_area, lowest_area
+
+def process_data_in_chunks(chunks):
+    """
+    Streams raw DataFrame chunks through cleaning, scoring and compaction.
+    Per-question sums/counts, the overall score total and the aggregate cube
+    (per question and demographic group) are accumulated as each chunk
+    arrives, so only the compact cleaned chunks are kept in memory and
+    nothing is recomputed over the full frame.
+    """
+    column_index = None
+    compact_chunks = []
+    chunk_likert_cols = []
+    likert_cols = []
+    memory_before = 0
+    column_sums = column_counts = None
+    score_sum, score_count = 0.0, 0
+    aggregate_cube = {}
+
+    for chunk in chunks:
+        if column_index is None:
+            # --- Match every column against all construct and demographic keywords once ---
+            column_index = build_column_index(chunk.columns)
+            matched_questions = {cat: list(cols) for cat, cols in column_index["constructs"].items()}
+            kaash_col = column_index["cleaning"]["kaash"]  # Special handling: "Kaash" questions
+            belonging_cols = [col for sublist in matched_questions.values() for col in sublist]
+            preview_table = chunk.head().copy()
+
+        chunk, found_likert_cols = clean_chunk(chunk, column_index)
+
+        # --- Compute Belonging Scores ---
+        scores = compute_belonging_scores(chunk, matched_questions, kaash_col)
+        chunk["KaashScore"] = scores["kaash"] if kaash_col else 0
+        if belonging_cols:
+            chunk["BelongingRaw"] = scores["raw"]
+            chunk["BelongingCount"] = scores["count"]
+            chunk["BelongingScore"] = scores["score"]
+            answered = scores["score"][~np.isnan(scores["score"])]
+            score_sum += answered.sum()
+            score_count += answered.size
+        else:
+            chunk["BelongingRaw"] = 0
+            chunk["BelongingCount"] = 0
+            chunk["BelongingScore"] = 0
+        if column_sums is None:
+            score_cols, column_sums, column_counts = scores["columns"], scores["column_sums"], scores["column_counts"]
+        else:
+            column_sums = column_sums + scores["column_sums"]
+            column_counts = column_counts + scores["column_counts"]
+        measures = pd.DataFrame(scores["matrix"], columns=scores["columns"], index=chunk.index)
+        if belonging_cols:
+            measures[BELONGING_SCORE_MEASURE] = scores["score"]
+        accumulate_aggregate_cube(aggregate_cube, measures, chunk, column_index)
+
+        # --- Shrink the chunk before the next one is read ---
+        memory_before += int(chunk.memory_usage(deep=True).sum())
+        compact_chunks.append(compact_cleaned_frame(chunk, column_index, found_likert_cols))
+        chunk_likert_cols.append(found_likert_cols)
+        likert_cols += [col for col in found_likert_cols if col not in likert_cols]
+
+    if column_index is None:
+        raise ValueError("The file does not contain any rows.")
+
+    # A question detected as Likert in a later chunk is mapped the same way in earlier ones
+    for chunk, found_likert_cols in zip(compact_chunks, chunk_likert_cols):
+        for col in likert_cols:
+            if col not in found_likert_cols:
+                mapped = map_likert_column(chunk[col], force=True)
+                if mapped is None:
+                    mapped = pd.to_numeric(chunk[col], errors="coerce").astype(float)
+                chunk[col] = compact_likert_column(mapped)
+    df_cleaned = concat_compact_chunks(compact_chunks)
+    for col in likert_cols:
+        if str(df_cleaned[col].dtype) not in ("Int8", "float32"):
+            df_cleaned[col] = compact_likert_column(df_cleaned[col].astype(float))
+    memory_after = int(df_cleaned.memory_usage(deep=True).sum())
+
+    # --- Aggregate Insights ---
+    overall_belonging_score = (score_sum / score_count if score_count else np.nan) if belonging_cols else None
+    category_averages = construct_means_from_totals(matched_questions, score_cols, column_sums, column_counts)
+    highest_area, lowest_area = highest_and_lowest_areas(category_averages)
+    aggregate_cube = finish_aggregate_cube(aggregate_cube, column_index)
+
+    # --- Package results into a dictionary for clean state management ---
+    results = {
+        'df_cleaned': df_cleaned,
+        'preview_table': preview_table,
+        'matched_questions': matched_questions,
+        'demographic_keywords' : CLEANING_KEYWORDS["normalize"],
+        'column_index': column_index,
+        'belonging_questions': BELONGING_QUESTIONS,
+        'overall_belonging_score': overall_belonging_score,
+        'category_averages': category_averages,
+        'highest_area': highest_area,
+        'lowest_area': lowest_area,
+        'group_belonging_scores': group_belonging_scores_from_cube(aggregate_cube),
+        'aggregate_cube': aggregate_cube,
+        'matched_questions_table': pd.DataFrame.from_dict(matched_questions, orient="index").T.fillna(""),
+        'memory_usage': {"before_bytes": memory_before, "after_bytes": memory_after, "saved_bytes": memory_before - memory_after}
+    }
+    return results
+
+def process_data_and_calculate_metrics(df):
+    """
+    Takes a raw DataFrame, performs all cleaning, normalization, and metric calculations.
+    This centralized function is key to the app's performance.
+    """
+    return process_data_in_chunks([df.copy()])  # Work on a copy
+
+# Bump whenever the cleaning or scoring rules change so cached results are rebuilt
+CLEANING_RULES_VERSION = "5"
+
+# Rows read per chunk when streaming CSV/TXT files
+CSV_CHUNK_ROWS = 50000
+
+@st.cache_data(max_entries=8, show_spinner=False)  # Keep the most recently used datasets per server process
+def load_and_process_file(fingerprint, file_type, _file, rules_version=CLEANING_RULES_VERSION):
+    """
+    Parses a file, given as bytes or a readable binary stream such as a
+    GridFS file, and runs it through the processing pipeline.
+    CSV/TXT files are streamed in chunks of CSV_CHUNK_ROWS rows so neither
+    the raw file nor the raw frame is held in memory as a whole.
+    Results are cached on the file fingerprint and the cleaning rules version;
+    the file itself is excluded from the cache key so it is never rehashed.
+    """
+    content = io.BytesIO(_file) if isinstance(_file, bytes) else _file
+    if file_type in ["csv", "txt"]:
+        with pd.read_csv(content, chunksize=CSV_CHUNK_ROWS) as reader:
+            return process_data_in_chunks(reader)
+    elif file_type in ["xlsx", "xls"]:
+        return process_data_in_chunks([pd.read_excel(content)])
+    else:
+        raise ValueError("Unsupported file format.")
+
+# Sample dataset shown and offered for download on the landing page
+SAMPLE_DATA = pd.DataFrame({
+    "StudentID": [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+    "Gender": ["Male", "Female", "Male", "Female", "Male", "Female", "Male", "Female", "Male", "Female"],
+    "Grade": [10, 9, 11, 8, 12, 10, 9, 11, 10, 12],
+    "Religion": ["Hindu", "Muslim", "Christian", "Sikh", "Hindu", "Buddhist", "Jain", "Islam", "Hindu", "Christian"],
+    "Ethnicity_cleaned": ["Asian", "African", "Latin", "Asian", "African", "Latin", "Asian", "African", "Latin", "Asian"],
+    "What_items_among_these_do_you_have_at_home": [
+        "Car, Computer, Apna Ghar", "Laptop, Rent", "Apna Ghar", "Computer", "Car, Apna Ghar",
+        "Rent", "Computer, Apna Ghar", "Laptop", "Car, Computer", "Apna Ghar"
+    ],
+    "Do_you_feel_safe_at_school": ["Agree", "Neutral", "Strongly Agree", "Disagree", "Agree", "Neutral", "Strongly Agree", "Disagree", "Agree", "Neutral"],
+    "Do_you_feel_welcome_at_school": ["Strongly Agree", "Agree", "Neutral", "Disagree", "Agree", "Neutral", "Strongly Agree", "Neutral", "Agree", "Disagree"],
+    "Are_you_respected_by_peers": ["Neutral", "Agree", "Strongly Agree", "Neutral", "Agree", "Disagree", "Strongly Agree", "Neutral", "Agree", "Neutral"],
+    "Do_teachers_notice_you": ["Disagree", "Neutral", "Agree", "Disagree", "Neutral", "Strongly Disagree", "Agree", "Disagree", "Neutral", "Disagree"],
+    "Do_you_have_a_close_teacher": ["Agree", "Neutral", "Strongly Agree", "Disagree", "Agree", "Neutral", "Strongly Agree", "Disagree", "Agree", "Neutral"]
+})
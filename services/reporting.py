@@ -0,0 +1,913 @@
+"""
+PDF reports: the general report, the custom report and the chart specs
+they embed (drawn by services/charts.py). Imported by the report page only,
+so matplotlib and ReportLab are loaded on the first visit to that page.
+"""
+import hashlib
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.graphics.shapes import Drawing
+from reportlab.platypus import Flowable, Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from services.assets import asset_image_reader
+from services.charts import CHART_STYLE_VERSION, ChartImageCache, render_chart
+from services.processing import (
+    crosstab_table, first_indexed_column, group_means, response_level_percentages, sort_group_values
+)
+from services.vector_charts import draw_vector_chart
+
+
+class AssetImage(Flowable):
+    """Draws a cached image asset through its pre-decoded ImageReader."""
+
+    def __init__(self, asset, width, height):
+        Flowable.__init__(self)
+        self.image_reader = asset_image_reader(asset)
+        self.width = width
+        self.height = height
+        self.hAlign = 'CENTER'
+
+    def wrap(self, available_width, available_height):
+        return self.width, self.height
+
+    def draw(self):
+        self.canv.drawImage(self.image_reader, 0, 0, self.width, self.height, mask='auto')
+
+# --- Charts ---
+# Each chart is described by a spec of plain values (see services/charts.py).
+# Reports build all their specs first and render them together, in parallel
+# worker processes when more than one chart is needed. Rendered PNGs are kept
+# in a process-wide cache addressed by the dataset and what the chart shows.
+# The "vector" backend draws the same specs as ReportLab Drawings instead.
+CHART_BACKENDS = ("raster", "vector")
+CHART_RENDER_WORKERS = min(4, os.cpu_count() or 1)
+CHART_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+@st.cache_resource(show_spinner=False)
+def get_chart_pool():
+    """Process pool for chart rendering, started once per server process."""
+    # spawn avoids forking the server's threads into the workers
+    return ProcessPoolExecutor(max_workers=CHART_RENDER_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+
+@st.cache_resource(show_spinner=False)
+def get_chart_cache():
+    """Chart PNG cache shared by the report page and both PDF reports."""
+    return ChartImageCache(CHART_CACHE_MAX_BYTES)
+
+def chart_cache_key(dataset_key, kind, title, construct=None, demographic=None):
+    """Content address of a rendered chart: dataset hash, chart type, construct, demographic and style version."""
+    parts = [dataset_key, kind, title, construct or "", demographic or "", CHART_STYLE_VERSION]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+def render_chart_pngs(specs):
+    """
+    Renders chart specs to PNG bytes.
+    specs: list of chart specs, None for charts without data.
+    returns: list of PNG bytes in the same order, None where the spec was None.
+    """
+    pending = [(i, spec) for i, spec in enumerate(specs) if spec is not None]
+    pngs = {}
+    if CHART_RENDER_WORKERS > 1 and len(pending) > 1:
+        try:
+            rendered = get_chart_pool().map(render_chart, [spec for _, spec in pending])
+            pngs = dict(zip((i for i, _ in pending), rendered))
+        except (BrokenProcessPool, OSError) as e:
+            # Render in this process and start a fresh pool next time
+            print(f"Chart render pool unavailable, rendering serially: {e}")
+            get_chart_pool.clear()
+            pngs = {}
+    for i, spec in pending:
+        if i not in pngs:
+            pngs[i] = render_chart(spec)
+    return [pngs.get(i) for i in range(len(specs))]
+
+def render_charts(charts, dataset_key=None, backend="raster"):
+    """
+    Chart images for ReportLab, rendering only charts missing from the chart cache.
+    charts: list of dicts with the chart's kind, title, construct and demographic,
+            and build, a callable returning its spec (None when there is no data).
+    dataset_key: hash of the processed dataset; without it nothing is cached.
+    backend: "raster" for PNG BytesIO buffers, "vector" for ReportLab Drawings.
+    returns: list of images in the same order, None for charts without data.
+    """
+    if backend == "vector":
+        # Drawings are cheap to build, so they are neither cached nor sent to the pool
+        specs = [chart["build"]() for chart in charts]
+        return [draw_vector_chart(spec) if spec is not None else None for spec in specs]
+
+    cache = get_chart_cache()
+    keys, pngs, specs = [], [], []
+    for chart in charts:
+        key = None
+        if dataset_key:
+            key = chart_cache_key(dataset_key, chart["kind"], chart["title"],
+                                  chart.get("construct"), chart.get("demographic"))
+        png = cache.get(key) if key else None
+        keys.append(key)
+        pngs.append(png)
+        # Specs are only built for charts that need rendering
+        specs.append(chart["build"]() if png is None else None)
+
+    for i, png in enumerate(render_chart_pngs(specs)):
+        if png is not None:
+            pngs[i] = png
+            if keys[i]:
+                cache.put(keys[i], png)
+    return [io.BytesIO(png) if png is not None else None for png in pngs]
+
+def chart_flowable(chart_img, width, height):
+    """Places a rendered chart in a width x height box: PNGs are stretched to it, Drawings scaled to fit."""
+    if isinstance(chart_img, Drawing):
+        scale = min(width / chart_img.width, height / chart_img.height)
+        chart_img.scale(scale, scale)
+        chart_img.width *= scale
+        chart_img.height *= scale
+        chart_img.hAlign = 'CENTER'
+        return chart_img
+    return Image(chart_img, width=width, height=height)
+
+def pie_spec_from_series(series, title, kind="summary_pie"):
+    """
+    Pie chart spec from a pandas.Series of counts (value_counts).
+    kind: "summary_pie" for the general report, "demographic_pie" for the custom report.
+    returns: chart spec or None if data is empty.
+    """
+    labels = series.index.astype(str).tolist()
+    sizes = series.values.tolist()
+    if not sizes:
+        return None
+    return {"kind": kind, "title": title, "labels": labels, "sizes": sizes}
+
+def demographic_counts(df_cleaned, matched_col):
+    """Respondents per value of a demographic column, with missing values counted as "Unknown"."""
+    return df_cleaned[matched_col].astype(str).replace({"nan": "Unknown"}).value_counts(dropna=False)
+
+def summary_pie_spec(df_cleaned, column_index, demographic, title):
+    """General report pie spec for a demographic, None when its column is missing."""
+    if not isinstance(df_cleaned, pd.DataFrame) or df_cleaned.empty:
+        return None
+    matched_col = first_indexed_column(column_index, "demographics", demographic)
+    if not matched_col:
+        return None
+    return pie_spec_from_series(demographic_counts(df_cleaned, matched_col), title)
+
+def demographic_pie_images(df_cleaned, column_index, dataset_key=None, backend="raster"):
+    """Gender and religion pies for the general report; (gender PNG, religion PNG), None where a column is missing."""
+    charts = [
+        {"kind": "summary_pie", "title": title, "demographic": demographic,
+         "build": partial(summary_pie_spec, df_cleaned, column_index, demographic, title)}
+        for demographic, title in [("Gender", "Gender Distribution"), ("Religion", "Religion Distribution")]
+    ]
+    gender_pie_buf, religion_pie_buf = render_charts(charts, dataset_key, backend)
+    return gender_pie_buf, religion_pie_buf
+
+# Helper function for comparison color
+def comparison_color(construct_score, overall_score):
+    """Return colored text showing comparison to overall score"""
+    if construct_score > overall_score:
+        return f"<font color='#10B981'>+{(construct_score - overall_score):.2f}</font>"
+    elif construct_score < overall_score:
+        return f"<font color='#EF4444'>{(construct_score - overall_score):.2f}</font>"
+    else:
+        return f"<font color='#6B7280'>±0.00</font>"
+    
+def demographic_pie_spec(df_cleaned, matched_col, title):
+    """Demographic pie chart spec for the custom report"""
+    if df_cleaned is None or df_cleaned.empty:
+        return None
+    
+    if not matched_col:
+        return None
+    
+    counts = demographic_counts(df_cleaned, matched_col)
+    if counts.empty:
+        return None
+    return pie_spec_from_series(counts, title, kind="demographic_pie")
+
+def construct_bar_spec(aggregate_cube, construct_col, demo_col, title, demo_label):
+    """Bar chart spec showing construct scores by demographic"""
+    if not construct_col or not demo_col:
+        return None
+    
+    # Averages per group are looked up in the aggregate cube
+    group_avg = group_means(aggregate_cube, demo_label, construct_col, demo_col)
+    if group_avg is None or group_avg.empty:
+        return None
+    
+    # Sort grades numerically if it's grade data
+    if demo_label == "Grade":
+        group_avg[demo_col] = pd.to_numeric(group_avg[demo_col], errors='coerce')
+        group_avg = group_avg.sort_values(by=demo_col).dropna(subset=[demo_col])
+        group_avg[demo_col] = group_avg[demo_col].astype(int).astype(str)
+    
+    return {
+        "kind": "bar", "title": title, "xlabel": demo_label,
+        "groups": group_avg[demo_col].tolist(),
+        "averages": group_avg['AvgScore'].tolist(),
+        "counts": group_avg['Count'].tolist(),
+    }
+
+def percentage_breakdown_spec(aggregate_cube, construct_col, demo_col, title, demo_label):
+    """Percentage breakdown stacked bar chart spec"""
+    if not construct_col or not demo_col:
+        return None
+    
+    # Response level percentages per group are looked up in the aggregate cube
+    percent_df = response_level_percentages(aggregate_cube, demo_label, construct_col, demo_col)
+    if percent_df is None or percent_df.empty:
+        return None
+    
+    # Pivot data for stacked bar
+    pivot_df = percent_df.pivot(index=demo_col, columns='ResponseLevel', values='Percent').fillna(0)
+    
+    return {
+        "kind": "stacked_percentages", "title": title,
+        "xlabel": demo_col.replace('_', ' ').title(),
+        "groups": pivot_df.index.tolist(),
+        "levels": [
+            (response_level, pivot_df[response_level].tolist())
+            for response_level in ["Agree", "Neutral", "Disagree", "Unknown"]
+            if response_level in pivot_df.columns
+        ],
+    }
+
+# --- Cross-tabs ---
+# Cell shading by average score, using the construct table's Strong/Good/Fair/Needs Work bands
+CROSSTAB_SCORE_COLORS = [(4.0, "#D1FAE5"), (3.5, "#DBEAFE"), (3.0, "#FEF3C7"), (float("-inf"), "#FEE2E2")]
+
+def crosstab_flowable(crosstab, label_a, label_b, width=7.4*inch):
+    """Two-way table of average scores and group sizes, rows label_a by columns label_b."""
+    means = crosstab["AvgScore"].unstack()
+    counts = crosstab["Count"].unstack()
+    row_order = sort_group_values(label_a, means.index)
+    column_order = sort_group_values(label_b, means.columns)
+    means = means.reindex(index=row_order, columns=column_order)
+    counts = counts.reindex(index=row_order, columns=column_order)
+
+    cell_style = ParagraphStyle("CrosstabCell", fontSize=8, leading=10, alignment=1)
+    header_style = ParagraphStyle("CrosstabHeader", parent=cell_style, fontName="Helvetica-Bold", textColor=colors.white)
+    data = [[Paragraph(f"{label_a} / {label_b}", header_style)]
+            + [Paragraph(str(value), header_style) for value in column_order]]
+    shading = []
+    for r, row_value in enumerate(row_order, 1):
+        row = [Paragraph(f"<b>{row_value}</b>", cell_style)]
+        for c, column_value in enumerate(column_order, 1):
+            mean = means.at[row_value, column_value]
+            if pd.isna(mean):
+                row.append(Paragraph("-", cell_style))
+                continue
+            row.append(Paragraph(f"{mean:.2f}<br/><font size=6>N={int(counts.at[row_value, column_value])}</font>", cell_style))
+            color = next(hex_color for threshold, hex_color in CROSSTAB_SCORE_COLORS if mean >= threshold)
+            shading.append(("BACKGROUND", (c, r), (c, r), colors.HexColor(color)))
+        data.append(row)
+
+    first_width = 1.3*inch
+    table = Table(data, colWidths=[first_width] + [(width - first_width) / len(column_order)] * len(column_order),
+                  repeatRows=1)
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#374151")),
+        ("VALIGN", (0,0), (-1,-1), "MIDDLE"),
+        ("GRID", (0,0), (-1,-1), 1, colors.HexColor("#E5E7EB")),
+        ("BACKGROUND", (0,1), (0,-1), colors.HexColor("#F9FAFB")),
+        ("TOPPADDING", (0,0), (-1,-1), 4),
+        ("BOTTOMPADDING", (0,0), (-1,-1), 4),
+    ] + shading))
+    return table
+
+# --- Reports ---
+def generate_custom_pdf(school_name, school_logo, apnapan_logo, 
+                   selected_construct, selected_charts, chart_options,
+                   df_cleaned, matched_questions, column_index, category_averages, 
+                   overall_belonging, date_today, n_students, aggregate_cube=None, dataset_key=None,
+                   chart_backend="raster", crosstab_labels=None, crosstab_cube=None):
+    """Generate a custom PDF report based on user selections with enhanced styling"""
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=28, rightMargin=28, topMargin=28, bottomMargin=28)
+    styles = getSampleStyleSheet()
+    
+    # Enhanced custom styles (matching general report)
+    title_style = ParagraphStyle("TitleStyle", parent=styles["Title"], fontSize=20, alignment=1, 
+                                textColor=colors.HexColor("#2E3440"), spaceAfter=8, spaceBefore=0,
+                                fontName="Helvetica-Bold")
+    subtitle_style = ParagraphStyle("SubtitleStyle", parent=styles["Title"], fontSize=16, alignment=1, 
+                                textColor=colors.HexColor("#5E81AC"), spaceAfter=6)
+    small_grey = ParagraphStyle("SmallGrey", parent=styles["Normal"], fontSize=9, alignment=2, 
+                            textColor=colors.HexColor("#666"))
+    header_style = ParagraphStyle("HeaderStyle", parent=styles["Heading2"], fontSize=14, alignment=0, 
+                                textColor=colors.HexColor("#2E3440"), spaceBefore=20, spaceAfter=10,
+                                fontName="Helvetica-Bold", borderWidth=1, borderColor=colors.HexColor("#E5E7EB"),
+                                borderPadding=5, backColor=colors.HexColor("#F9FAFB"))
+    subheader_style = ParagraphStyle("SubHeaderStyle", parent=styles["Heading3"], fontSize=12, alignment=0, 
+                                    textColor=colors.HexColor("#374151"), spaceBefore=12, spaceAfter=8,
+                                    fontName="Helvetica-Bold")
+    note_style = ParagraphStyle("NoteStyle", parent=styles["Normal"], fontSize=10, textColor=colors.HexColor("#4B5563"))
+    highlight_style = ParagraphStyle("HighlightStyle", parent=styles["Normal"], fontSize=10, 
+                                    textColor=colors.HexColor("#1F2937"), backColor=colors.HexColor("#F3F4F6"),
+                                    borderWidth=1, borderColor=colors.HexColor("#D1D5DB"), borderPadding=8,
+                                    spaceAfter=10, spaceBefore=10)
+    
+    story = []
+    
+    # --- Enhanced PDF Header ---
+    apnapan_logo_img = Paragraph(" ", styles['Normal'])
+    if apnapan_logo:
+        try:
+            apnapan_logo_img = AssetImage(apnapan_logo, width=1*inch, height=1*inch)
+        except Exception:
+            pass
+
+    school_logo_img = Paragraph(" ", styles['Normal'])
+    if school_logo:
+        try:
+            school_logo_img = AssetImage(school_logo, width=1*inch, height=1*inch)
+        except Exception:
+            pass
+
+    # Enhanced center content for custom report
+    center_content = [
+        Paragraph("Apnapan Custom Report", title_style),
+        Paragraph(f"Focus Area: {selected_construct}", subtitle_style),
+        Paragraph(school_name, header_style)
+    ]
+
+    header_table = Table([[apnapan_logo_img, center_content, school_logo_img]], colWidths=[1.2*inch, 5.6*inch, 1.2*inch])
+    header_table.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+        ('ALIGN', (1, 0), (1, 0), 'CENTER'),
+        ('ALIGN', (2, 0), (2, 0), 'RIGHT'),
+        ('LINEBELOW', (0, 0), (-1, -1), 2, colors.HexColor("#E5E7EB")),
+        ('TOPPADDING', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
+    ]))
+    story.append(header_table)
+    
+    # Date and report info
+    report_info = f"Generated on: {date_today} | Focus: {selected_construct} Analysis"
+    story.append(Paragraph(report_info, small_grey))
+    story.append(Spacer(1, 20))
+
+    # --- Executive Summary for Custom Report ---
+    story.append(Paragraph("Executive Summary", header_style))
+    
+    # Get construct-specific data
+    construct_score = category_averages.get(selected_construct, 0)
+    construct_questions = matched_questions.get(selected_construct, [])
+    
+    # Determine performance level for selected construct
+    if construct_score >= 4.0:
+        performance_level = "Excellent"
+        performance_color = "#10B981"
+    elif construct_score >= 3.5:
+        performance_level = "Good"
+        performance_color = "#3B82F6"
+    elif construct_score >= 3.0:
+        performance_level = "Fair"
+        performance_color = "#F59E0B"
+    else:
+        performance_level = "Needs Attention"
+        performance_color = "#EF4444"
+
+    summary_text = f"""
+    This custom report provides an in-depth analysis of <b>{selected_construct}</b> at {school_name}. 
+    The report includes {len(selected_charts)} selected visualizations to understand how this 
+    aspect of belonging varies across different student groups.
+    <br/><br/>
+    <b>Key Findings for {selected_construct}:</b><br/>
+    • Current score: <b>{construct_score:.2f}/5.0</b> ({performance_level})<br/>
+    • Based on responses from <b>{n_students}</b> students<br/>
+    • Analysis includes {len(construct_questions)} related survey questions<br/>
+    • Selected {len(selected_charts)} chart(s) for demographic breakdown analysis
+    """
+    story.append(Paragraph(summary_text, highlight_style))
+    story.append(Spacer(1, 15))
+
+    # --- Enhanced Key Metrics for Selected Construct ---
+    story.append(Paragraph(f"{selected_construct} - Key Metrics", header_style))
+    
+    # Enhanced bubble function (same as general report)
+    def enhanced_bubble(text, bg_hex, text_color="#FFFFFF"):
+        return Table(
+            [[Paragraph(text, ParagraphStyle("bub", fontSize=12, alignment=1, 
+                                        textColor=colors.HexColor(text_color),
+                                        leading=16))]],
+            colWidths=[2.4*inch], 
+            rowHeights=[1.1*inch],
+            style=TableStyle([
+                ("BACKGROUND", (0,0), (-1,-1), colors.HexColor(bg_hex)),
+                ("VALIGN", (0,0), (-1,-1), "MIDDLE"),
+                ("ALIGN", (0,0), (-1,-1), "CENTER"),
+                ("ROUNDEDCORNERS", [5, 5, 5, 5]),
+                ("LINEWIDTH", (0,0), (-1,-1), 2),
+                ("LINECOLOR", (0,0), (-1,-1), colors.HexColor("#E5E7EB")),
+            ])
+        )
+
+    # Key metrics for selected construct
+    construct_txt = f"<b>{selected_construct} Score</b><br/><br/><font size=20 color='{performance_color}'>{construct_score:.2f}</font><br/><font size=10>out of 5.0 ({performance_level})</font>"
+    n_txt = f"<b>Students Surveyed</b><br/><br/><font size=20>{n_students}</font><br/><font size=10>participants</font>"
+    
+    # Compare to overall belonging
+    comparison = "above" if construct_score > overall_belonging else "below" if construct_score < overall_belonging else "equal to"
+    comparison_txt = f"<b>vs Overall Belonging</b><br/><br/><font size=16>{comparison_color(construct_score, overall_belonging)}</font><br/><font size=10>{comparison} average ({overall_belonging:.2f})</font>"
+    
+    metrics_row = Table([[enhanced_bubble(construct_txt, "#F8FAFC", "#1F2937"), 
+                        enhanced_bubble(n_txt, "#F0F9FF", "#1F2937")]],
+                    colWidths=[3.2*inch, 3.2*inch])
+    story.append(metrics_row)
+    story.append(Spacer(1, 15))
+    
+    # Survey questions for this construct
+    if construct_questions:
+        story.append(Paragraph("Survey Questions Analyzed", subheader_style))
+        questions_text = ""
+        for i, question in enumerate(construct_questions[:5], 1):  # Limit to first 5 questions
+            questions_text += f"{i}. {question}<br/>"
+        if len(construct_questions) > 5:
+            questions_text += f"<i>... and {len(construct_questions) - 5} more questions</i>"
+        
+        story.append(Paragraph(questions_text, note_style))
+        story.append(Spacer(1, 20))
+
+    # --- Charts Section ---
+    story.append(Paragraph("Demographic Analysis Charts", header_style))
+    story.append(Paragraph(f"The following {len(selected_charts)} chart(s) show how {selected_construct} varies across different student groups:", note_style))
+    story.append(Spacer(1, 15))
+    
+    # Describe every chart first, then render the uncached ones in one parallel pass
+    charts = []
+    for chart_name in selected_charts:
+        chart_info = chart_options[chart_name]
+        
+        # Look up the chart's columns in the precomputed column index
+        demo_col = first_indexed_column(column_index, "demographics", chart_info["demographic"])
+        construct_col = construct_questions[0] if construct_questions else None
+
+        # Describe chart based on type; demographic pies do not depend on the construct
+        chart = {"title": chart_name, "construct": selected_construct, "demographic": chart_info["demographic"]}
+        if chart_info["type"] == "demographic_pie":
+            chart.update(kind="demographic_pie", construct=None,
+                         build=partial(demographic_pie_spec, df_cleaned, demo_col, chart_name))
+        
+        elif chart_info["type"] == "construct_vs_demographic":
+            chart.update(kind="bar", build=partial(
+                construct_bar_spec, aggregate_cube, construct_col, demo_col,
+                chart_name, chart_info["demographic"]
+            ))
+        
+        elif chart_info["type"] == "percentage_breakdown":
+            chart.update(kind="stacked_percentages", build=partial(
+                percentage_breakdown_spec, aggregate_cube, construct_col, demo_col, chart_name,
+                chart_info["demographic"]
+            ))
+        else:
+            chart.update(kind=chart_info["type"], build=lambda: None)
+        charts.append(chart)
+    chart_images = render_charts(charts, dataset_key, chart_backend)
+
+    # Add selected charts with enhanced presentation
+    chart_count = 0
+    for i, (chart_name, chart_img) in enumerate(zip(selected_charts, chart_images), 1):
+        chart_info = chart_options[chart_name]
+
+        # Add chart to PDF with enhanced styling
+        if chart_img is not None:
+            # Chart number and title
+            chart_header = f"Chart {i}: {chart_name}"
+            story.append(Paragraph(chart_header, subheader_style))
+            story.append(Spacer(1, 6))
+            
+            try:
+                # Adjust image size and add border
+                if chart_info["type"] == "demographic_pie":
+                    chart_image = chart_flowable(chart_img, width=3.5*inch, height=3*inch)
+                else:
+                    chart_image = chart_flowable(chart_img, width=6.5*inch, height=4.2*inch)
+                
+                # Create bordered chart container
+                chart_container = Table([[chart_image]], colWidths=[7*inch])
+                chart_container.setStyle(TableStyle([
+                    ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+                    ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+                    ('BOX', (0,0), (-1,-1), 1, colors.HexColor("#E5E7EB")),
+                    ('TOPPADDING', (0,0), (-1,-1), 10),
+                    ('BOTTOMPADDING', (0,0), (-1,-1), 10),
+                    ('LEFTPADDING', (0,0), (-1,-1), 10),
+                    ('RIGHTPADDING', (0,0), (-1,-1), 10),
+                ]))
+                story.append(chart_container)
+                
+                # Add chart description
+                story.append(Spacer(1, 8))
+                story.append(Paragraph(chart_info["description"], note_style))
+                story.append(Spacer(1, 20))
+                chart_count += 1
+                
+            except Exception as e:
+                error_msg = f"Chart could not be generated: {chart_name}"
+                story.append(Paragraph(error_msg, ParagraphStyle("Error", parent=note_style, 
+                                                                textColor=colors.HexColor("#EF4444"))))
+                story.append(Spacer(1, 15))
+
+    # --- Two-way Breakdown ---
+    if crosstab_labels and construct_questions:
+        label_a, label_b = crosstab_labels
+        crosstab = crosstab_table(crosstab_cube, label_a, label_b, construct_questions[0])
+        if crosstab is not None and not crosstab.empty:
+            story.append(Paragraph(f"{selected_construct} by {label_a} and {label_b}", header_style))
+            story.append(Paragraph(
+                f"Average score for every combination of {label_a.lower()} and {label_b.lower()} "
+                f"(N = students who answered). Small groups can swing widely, so read them with care.", note_style))
+            story.append(Spacer(1, 10))
+            story.append(crosstab_flowable(crosstab, label_a, label_b))
+            story.append(Spacer(1, 20))
+
+    # --- Enhanced Insights Section ---
+    if chart_count > 0:
+        story.append(Paragraph("Key Insights & Observations", header_style))
+        
+        # Performance context
+        performance_context = ""
+        if construct_score >= 4.0:
+            performance_context = f"{selected_construct} shows excellent performance, indicating strong student experiences in this area."
+        elif construct_score >= 3.5:
+            performance_context = f"{selected_construct} shows good performance with room for targeted improvements."
+        elif construct_score >= 3.0:
+            performance_context = f"{selected_construct} shows fair performance and would benefit from focused interventions."
+        else:
+            performance_context = f"{selected_construct} requires immediate attention with comprehensive improvement strategies."
+        
+        insights_text = f"""
+        <b>Performance Analysis:</b><br/>
+        {performance_context}
+        <br/><br/>
+        <b>Chart Analysis:</b><br/>
+        • This report includes {chart_count} visualization(s) focusing on {selected_construct}<br/>
+        • Charts reveal how different demographic groups experience this aspect of belonging<br/>
+        • Look for patterns in scores across gender, grade level, and other demographic factors
+        <br/><br/>
+        <b>Survey Coverage:</b><br/>
+        • Analysis based on {len(construct_questions)} survey question(s)<br/>
+        • {n_students} student responses analyzed<br/>
+        • Current score: {construct_score:.2f}/5.0 compared to overall belonging score of {overall_belonging:.2f}/5.0
+        """
+        
+        story.append(Paragraph(insights_text, highlight_style))
+        story.append(Spacer(1, 20))
+
+    # --- Enhanced Recommendations ---
+    story.append(Paragraph("Targeted Recommendations", header_style))
+    
+    recommendations = []
+    
+    # Performance-based recommendations
+    if construct_score < 3.0:
+        recommendations.append(f"<b>Urgent Priority:</b> {selected_construct} requires immediate intervention (score: {construct_score:.2f})")
+        recommendations.append(f"<b>Root Cause Analysis:</b> Conduct focus groups to understand why {selected_construct} scores are low")
+    elif construct_score < 3.5:
+        recommendations.append(f"<b>Improvement Focus:</b> Develop targeted strategies to enhance {selected_construct}")
+        recommendations.append(f"<b>Best Practice Research:</b> Study schools with higher {selected_construct} scores")
+    else:
+        recommendations.append(f"<b>Maintain Excellence:</b> Continue successful practices that support {selected_construct}")
+        recommendations.append(f"<b>Share Success:</b> Document and share what's working well in {selected_construct}")
+    
+    # Chart-specific recommendations
+    recommendations.extend([
+        "<b>Demographic Analysis:</b> Use the charts to identify which student groups need additional support",
+        f"<b>Targeted Interventions:</b> Design specific programs addressing {selected_construct} gaps",
+        "<b>Progress Monitoring:</b> Resurvey in 6 months to measure improvement in this focus area",
+        "<b>Staff Development:</b> Train educators on strategies that enhance student " + selected_construct.lower()
+    ])
+
+    rec_text = "<br/>• ".join(recommendations)
+    story.append(Paragraph(f"• {rec_text}", note_style))
+    story.append(Spacer(1, 20))
+
+    # --- Customized Food for Thought ---
+    story.append(Paragraph("Reflection Questions", header_style))
+    
+    custom_questions = [
+        f"Which demographic groups show the strongest/weakest {selected_construct} scores?",
+        f"What specific school practices might be influencing {selected_construct} outcomes?",
+        f"How does {selected_construct} connect to other aspects of student belonging?",
+        f"What barriers might prevent students from experiencing strong {selected_construct}?",
+        f"Which interventions could most effectively improve {selected_construct} scores?",
+        f"How can high-performing groups in {selected_construct} mentor others?"
+    ]
+    
+    bullets = "<br/>".join([f"• {question}" for question in custom_questions])
+    story.append(Paragraph(bullets, note_style))
+    story.append(Spacer(1, 20))
+
+    # --- Enhanced Footer ---
+    footer_text = f"""
+    <br/><br/>
+    <font size=8 color='#6B7280'>
+    This custom report was generated by the Apnapan Pulse platform focusing on {selected_construct}. 
+    For additional analysis or support with action planning, please contact your Apnapan representative.
+    <br/>
+    Custom Report ID: AP-CUSTOM-{datetime.now().strftime('%Y%m%d')}-{selected_construct[:3].upper()}-{school_name[:3].upper()}
+    </font>
+    """
+    story.append(Paragraph(footer_text, ParagraphStyle("Footer", parent=styles["Normal"], 
+                                                    fontSize=8, alignment=1, 
+                                                    textColor=colors.HexColor("#6B7280"))))
+
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
+
+def generate_pdf(school_name, school_logo, apnapan_logo, category_averages, overall_belonging,
+                 highest_area, lowest_area, date_today, n_students, gender_pie_buf=None, religion_pie_buf=None):
+    """Generate the general report: summary, key metrics, demographics and construct scores"""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, leftMargin=28, rightMargin=28, topMargin=28, bottomMargin=28)
+    styles = getSampleStyleSheet()
+
+    # Enhanced custom styles
+    title_style = ParagraphStyle("TitleStyle", parent=styles["Title"], fontSize=20, alignment=1, 
+                                textColor=colors.HexColor("#2E3440"), spaceAfter=8, spaceBefore=0,
+                                fontName="Helvetica-Bold")
+    subtitle_style = ParagraphStyle("SubtitleStyle", parent=styles["Title"], fontSize=16, alignment=1, 
+                                textColor=colors.HexColor("#5E81AC"), spaceAfter=6)
+    small_grey = ParagraphStyle("SmallGrey", parent=styles["Normal"], fontSize=9, alignment=2, 
+                            textColor=colors.HexColor("#666"))
+    header_style = ParagraphStyle("HeaderStyle", parent=styles["Heading2"], fontSize=14, alignment=0, 
+                                textColor=colors.HexColor("#2E3440"), spaceBefore=20, spaceAfter=10,
+                                fontName="Helvetica-Bold", borderWidth=1, borderColor=colors.HexColor("#E5E7EB"),
+                                borderPadding=5, backColor=colors.HexColor("#F9FAFB"))
+    subheader_style = ParagraphStyle("SubHeaderStyle", parent=styles["Heading3"], fontSize=12, alignment=0, 
+                                    textColor=colors.HexColor("#374151"), spaceBefore=12, spaceAfter=8,
+                                    fontName="Helvetica-Bold")
+    note_style = ParagraphStyle("NoteStyle", parent=styles["Normal"], fontSize=10, textColor=colors.HexColor("#4B5563"))
+    highlight_style = ParagraphStyle("HighlightStyle", parent=styles["Normal"], fontSize=10, 
+                                    textColor=colors.HexColor("#1F2937"), backColor=colors.HexColor("#F3F4F6"),
+                                    borderWidth=1, borderColor=colors.HexColor("#D1D5DB"), borderPadding=8,
+                                    spaceAfter=10, spaceBefore=10)
+
+    story = []
+
+    # --- Enhanced PDF Header ---
+    apnapan_logo_img = Paragraph(" ", styles['Normal'])
+    if apnapan_logo:
+        try:
+            apnapan_logo_img = AssetImage(apnapan_logo, width=1*inch, height=1*inch)
+        except Exception:
+            pass
+
+    school_logo_img = Paragraph(" ", styles['Normal'])
+    if school_logo:
+        try:
+            school_logo_img = AssetImage(school_logo, width=1*inch, height=1*inch)
+        except Exception:
+            pass
+
+    # Enhanced center content
+    center_content = [
+        Paragraph("Apnapan Pulse Report", title_style),
+        Paragraph("School Belonging Assessment", subtitle_style),
+        Paragraph(school_name, header_style)
+    ]
+
+    header_table = Table([[apnapan_logo_img, center_content, school_logo_img]], colWidths=[1.2*inch, 5.6*inch, 1.2*inch])
+    header_table.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+        ('ALIGN', (1, 0), (1, 0), 'CENTER'),
+        ('ALIGN', (2, 0), (2, 0), 'RIGHT'),
+        ('LINEBELOW', (0, 0), (-1, -1), 2, colors.HexColor("#E5E7EB")),
+        ('TOPPADDING', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
+    ]))
+    story.append(header_table)
+    
+    # Date and report info
+    report_info = f"Generated on: {date_today} | Academic Year: {datetime.now().year}-{datetime.now().year + 1}"
+    story.append(Paragraph(report_info, small_grey))
+    story.append(Spacer(1, 20))
+
+    # --- Executive Summary Section ---
+    story.append(Paragraph("Executive Summary", header_style))
+    
+    # Calculate additional metrics for summary
+    response_rate = (n_students / n_students * 100) if n_students > 0 else 0  # Placeholder - replace with actual invited vs responded
+    avg_score = overall_belonging or 0
+    
+    # Determine performance level
+    if avg_score >= 4.0:
+        performance_level = "Excellent"
+        performance_color = "#10B981"
+    elif avg_score >= 3.5:
+        performance_level = "Good"
+        performance_color = "#3B82F6"
+    elif avg_score >= 3.0:
+        performance_level = "Fair"
+        performance_color = "#F59E0B"
+    else:
+        performance_level = "Needs Attention"
+        performance_color = "#EF4444"
+
+    summary_text = f"""
+    This report presents the results of the Apnapan Pulse survey conducted at {school_name}. 
+    The survey assessed students' sense of belonging across multiple dimensions. 
+    <br/><br/>
+    <b>Key Findings:</b><br/>
+    • <b>{n_students}</b> students participated in the survey<br/>
+    • Overall belonging score: <b>{avg_score:.2f}/5.0</b> ({performance_level})<br/>
+    • Strongest area: <b>{highest_area if isinstance(highest_area, str) else 'Not determined'}</b><br/>
+    • Area for improvement: <b>{lowest_area if isinstance(lowest_area, str) else 'Not determined'}</b>
+    """
+    story.append(Paragraph(summary_text, highlight_style))
+    story.append(Spacer(1, 15))
+
+    # --- Enhanced Key Metrics Section ---
+    story.append(Paragraph("Key Metrics Overview", header_style))
+    
+    # Enhanced bubble function with better styling
+    def enhanced_bubble(text, bg_hex, text_color="#FFFFFF"):
+        return Table(
+            [[Paragraph(text, ParagraphStyle("bub", fontSize=12, alignment=1, 
+                                        textColor=colors.HexColor(text_color),
+                                        leading=16))]],
+            colWidths=[2.4*inch], 
+            rowHeights=[1.1*inch],
+            style=TableStyle([
+                ("BACKGROUND", (0,0), (-1,-1), colors.HexColor(bg_hex)),
+                ("VALIGN", (0,0), (-1,-1), "MIDDLE"),
+                ("ALIGN", (0,0), (-1,-1), "CENTER"),
+                ("ROUNDEDCORNERS", [5, 5, 5, 5]),
+                ("LINEWIDTH", (0,0), (-1,-1), 2),
+                ("LINECOLOR", (0,0), (-1,-1), colors.HexColor("#E5E7EB")),
+            ])
+        )
+
+    # Row 1: Overall metrics
+    score_txt = f"<b>Overall Belonging Score</b><br/><br/><font size=20 color='{performance_color}'>{avg_score:.2f}</font><br/><font size=10>out of 5.0 ({performance_level})</font>"
+    n_txt = f"<b>Students Surveyed</b><br/><br/><font size=20>{n_students}</font><br/><font size=10>participants</font>"
+
+    row1 = Table([[enhanced_bubble(score_txt, "#F8FAFC", "#1F2937"), enhanced_bubble(n_txt, "#F0F9FF", "#1F2937")]],
+                colWidths=[3.2*inch, 3.2*inch])
+    story.append(row1)
+    story.append(Spacer(1, 12))
+
+    # Row 2: Strongest/Weakest areas
+    strong_label = (highest_area if isinstance(highest_area, str) else "Not determined")
+    strong_val = float(category_averages.get(strong_label, 0)) if strong_label in category_averages else 0.0
+    weak_label = (lowest_area if isinstance(lowest_area, str) else "Not determined")
+    weak_val = float(category_averages.get(weak_label, 0)) if weak_label in category_averages else 0.0
+
+    strong_txt = f"<b>Strongest Area</b><br/><br/><font size=14>{strong_label}</font><br/><font size=16 color='#10B981'>{strong_val:.2f}</font>"
+    weak_txt = f"<b>Area for Improvement</b><br/><br/><font size=14>{weak_label}</font><br/><font size=16 color='#EF4444'>{weak_val:.2f}</font>"
+    
+    row2 = Table([[enhanced_bubble(strong_txt, "#ECFDF5", "#1F2937"), enhanced_bubble(weak_txt, "#FEF2F2", "#1F2937")]],
+                colWidths=[3.2*inch, 3.2*inch])
+    story.append(row2)
+    story.append(Spacer(1, 20))
+
+    # --- Enhanced Demographics and Constructs Section ---
+    story.append(Paragraph("Demographics & Construct Analysis", header_style))
+
+    # Left side: Demographics with improved layout
+    left_content = []
+    left_content.append(Paragraph("Student Demographics", subheader_style))
+    
+    demographic_charts = []
+    if gender_pie_buf is not None:
+        demographic_charts.append(chart_flowable(gender_pie_buf, width=2.6*inch, height=2.3*inch))
+    if religion_pie_buf is not None:
+        demographic_charts.append(chart_flowable(religion_pie_buf, width=2.6*inch, height=2.3*inch))
+    
+    if demographic_charts:
+        for chart in demographic_charts:
+            left_content.append(chart)
+            left_content.append(Spacer(1, 8))
+    else:
+        left_content.append(Paragraph("Demographic charts will be displayed when data is available.", 
+                                    note_style))
+
+    # Right side: Enhanced constructs table
+    constructs_data = [["Construct", "Score", "Level"]]
+    if category_averages:
+        for construct, score in category_averages.items():
+            score_val = float(score)
+            if score_val >= 4.0:
+                level = "Strong"
+            elif score_val >= 3.5:
+                level = "Good"
+            elif score_val >= 3.0:
+                level = "Fair"
+            else:
+                level = "Needs Work"
+            constructs_data.append([construct, f"{score_val:.2f}", level])
+    else:
+        constructs_data.append(["-", "-", "-"])
+
+    constructs_tbl = Table(constructs_data, colWidths=[1.8*inch, 0.7*inch, 0.8*inch])
+    constructs_tbl.setStyle(TableStyle([
+        ("BACKGROUND", (0,0), (-1,0), colors.HexColor("#374151")),
+        ("TEXTCOLOR", (0,0), (-1,0), colors.white),
+        ("FONTNAME", (0,0), (-1,0), "Helvetica-Bold"),
+        ("FONTSIZE", (0,0), (-1,0), 10),
+        ("ALIGN", (0,0), (-1,-1), "CENTER"),
+        ("VALIGN", (0,0), (-1,-1), "MIDDLE"),
+        ("GRID", (0,0), (-1,-1), 1, colors.HexColor("#E5E7EB")),
+        ("ROWBACKGROUNDS", (0,1), (-1,-1), [colors.white, colors.HexColor("#F9FAFB")]),
+        ("FONTSIZE", (0,1), (-1,-1), 9),
+        ("TOPPADDING", (0,0), (-1,-1), 8),
+        ("BOTTOMPADDING", (0,0), (-1,-1), 8),
+    ]))
+
+    right_content = []
+    right_content.append(Paragraph("Construct Scores Summary", subheader_style))
+    right_content.append(Spacer(1, 8))
+    right_content.append(constructs_tbl)
+
+    # Legend for score levels
+    legend_text = """
+    <b>Score Interpretation:</b><br/>
+    4.0+ : Strong | 3.5-3.9 : Good<br/>
+    3.0-3.4 : Fair | &lt;3.0 : Needs Work
+    """
+    right_content.append(Spacer(1, 10))
+    right_content.append(Paragraph(legend_text, ParagraphStyle("Legend", parent=note_style, 
+                                                            fontSize=8, textColor=colors.HexColor("#6B7280"))))
+
+    # Two-column layout with better spacing
+    demographics_layout = Table([[left_content, right_content]], colWidths=[3.8*inch, 2.6*inch])
+    demographics_layout.setStyle(TableStyle([
+        ("VALIGN", (0,0), (-1,-1), "TOP"),
+        ("LEFTPADDING", (0,0), (-1,-1), 5),
+        ("RIGHTPADDING", (0,0), (-1,-1), 5),
+    ]))
+    story.append(demographics_layout)
+    story.append(Spacer(1, 25))
+
+    # --- Recommendations Section ---
+    story.append(Paragraph("Recommendations", header_style))
+    
+    recommendations = []
+    if weak_val < 3.0:
+        recommendations.append(f"<b>Priority Action:</b> Focus immediate attention on improving {weak_label} (score: {weak_val:.2f})")
+    if avg_score < 3.5:
+        recommendations.append("<b>Overall Improvement:</b> Consider school-wide belonging initiatives")
+    if strong_val > 4.0:
+        recommendations.append(f"<b>Leverage Strengths:</b> Use successful practices from {strong_label} in other areas")
+    
+    # Add demographic-specific recommendations if available
+    recommendations.extend([
+        "<b>Data Deep Dive:</b> Analyze results by demographic groups to identify specific needs",
+        "<b>Student Voice:</b> Conduct focus groups to understand the stories behind the numbers",
+        "<b>Action Planning:</b> Develop targeted interventions based on lowest-scoring constructs"
+    ])
+
+    rec_text = "<br/>• ".join(recommendations)
+    story.append(Paragraph(f"• {rec_text}", note_style))
+    story.append(Spacer(1, 20))
+
+    # --- Enhanced Food for Thought ---
+    story.append(Paragraph("Food for Thought", header_style))
+    
+    thought_questions = [
+        "Which demographic groups show the most significant differences in belonging scores?",
+        "What school policies or practices might be contributing to these patterns?",
+        "How do these results align with other school data (attendance, achievement, discipline)?",
+        "What student voices and perspectives are missing from this quantitative data?",
+        "Which interventions could have the greatest impact on overall belonging?",
+        "How can the school's strengths be leveraged to address areas of concern?"
+    ]
+    
+    bullets = "<br/>".join([f"• {question}" for question in thought_questions])
+    
+    story.append(Paragraph(bullets, note_style))
+    story.append(Spacer(1, 20))
+
+    # --- Footer ---
+    footer_text = f"""
+    <br/><br/>
+    <font size=8 color='#6B7280'>
+    This report was generated by the Apnapan Pulse platform. For questions about methodology 
+    or support with action planning, please contact your Apnapan representative.
+    <br/>
+    Report ID: AP-{datetime.now().strftime('%Y%m%d')}-{school_name[:3].upper()}
+    </font>
+    """
+    story.append(Paragraph(footer_text, ParagraphStyle("Footer", parent=styles["Normal"], 
+                                                    fontSize=8, alignment=1, 
+                                                    textColor=colors.HexColor("#6B7280"))))
+
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,378 @@
+"""MongoDB storage: uploaded files in GridFS, the file catalog and processed dataset snapshots."""
+import hashlib
+import io
+from datetime import datetime
+from urllib.parse import quote_plus
+
+import gridfs
+import numpy as np
+import pandas as pd
+import streamlit as st
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from services.processing import (
+    BELONGING_QUESTIONS, CLEANING_KEYWORDS, CLEANING_RULES_VERSION, DERIVED_SCORE_COLUMNS,
+    group_belonging_scores_from_cube
+)
+
+# Function to get MIME type for file download
+def get_mime_type(filename):
+    """Returns the MIME type based on the file extension."""
+    ext = filename.split('.')[-1].lower()
+    if ext == 'csv':
+        return 'text/csv'
+    elif ext == 'xlsx':
+        return 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    elif ext == 'xls':
+        return 'application/vnd.ms-excel'
+    elif ext == 'txt':
+        return 'text/plain'
+    return 'application/octet-stream'  # Generic fallback
+
+# Function to connect to MongoDB collection
+@st.cache_resource  # Cache for efficiency
+def get_mongo_collection():
+    # Encode username and password
+    username = quote_plus(st.secrets["mongo"]["username"])
+    password = quote_plus(st.secrets["mongo"]["password"])
+    host = st.secrets["mongo"]["host"]
+    db_name = st.secrets["mongo"]["db_name"]
+    collection_name = st.secrets["mongo"]["collection_name"]
+
+    # Construct the URI with encoded credentials
+    uri = f"mongodb+srv://{username}:{password}@{host}/{db_name}?retryWrites=true&w=majority"
+    
+    client = MongoClient(uri)
+    db = client[db_name]
+    collection = db[collection_name]
+    prepare_storage(collection)  # Runs once per server process thanks to the resource cache
+    return collection
+
+# --- Storage Layout ---
+FILE_KIND_DATASET = "dataset"
+FILE_KIND_LOGO = "logo"
+FILE_CATALOG_COLLECTION_NAME = "file_catalog"  # One entry per (school, filename) for the history dropdown
+SNAPSHOT_COLLECTION_NAME = "processed_snapshots"
+
+# (collection name or None for the files collection, index keys, unique)
+STORAGE_INDEXES = [
+    (None, [("school_id", 1), ("filename", 1), ("timestamp", -1)], False),  # Latest version of a file
+    (None, [("school_id", 1), ("filename", 1), ("file_hash", 1)], False),  # Upload de-duplication
+    (FILE_CATALOG_COLLECTION_NAME, [("school_id", 1), ("filename", 1)], True),
+    (FILE_CATALOG_COLLECTION_NAME, [("school_id", 1), ("timestamp", -1)], False),  # History dropdown
+    (SNAPSHOT_COLLECTION_NAME, [("file_hash", 1), ("rules_version", 1), ("format_version", 1)], True),
+]
+
+def ensure_storage_indexes(collection):
+    """Creates the compound indexes the storage queries rely on and returns any that are still missing."""
+    missing = []
+    for collection_name, keys, unique in STORAGE_INDEXES:
+        target = collection if collection_name is None else collection.database[collection_name]
+        try:
+            target.create_index(keys, unique=unique)
+            existing = [list(info["key"]) for info in target.index_information().values()]
+            if [tuple(key) for key in keys] not in [[tuple(key) for key in info] for info in existing]:
+                missing.append((target.name, keys))
+        except PyMongoError as e:
+            print(f"Could not create index {keys} on {target.name}: {e}")
+            missing.append((target.name, keys))
+    return missing
+
+def record_in_catalog(catalog, school_id, filename, timestamp):
+    """Keeps the newest upload time per (school, filename) in the file catalog."""
+    update = {"$max": {"timestamp": timestamp}} if timestamp is not None else {"$setOnInsert": {"timestamp": None}}
+    catalog.update_one({"school_id": school_id, "filename": filename}, update, upsert=True)
+
+def backfill_file_metadata(collection):
+    """One-shot upgrade of file documents written before `kind` and the file catalog existed."""
+    catalog = collection.database[FILE_CATALOG_COLLECTION_NAME]
+    legacy_docs = list(collection.find(
+        {"kind": {"$exists": False}},
+        projection={"school_id": 1, "filename": 1, "timestamp": 1}
+    ))
+    for doc in legacy_docs:
+        kind = FILE_KIND_LOGO if str(doc.get("filename", "")).startswith("logo_") else FILE_KIND_DATASET
+        collection.update_one({"_id": doc["_id"]}, {"$set": {"kind": kind}})
+        if kind == FILE_KIND_DATASET:
+            record_in_catalog(catalog, doc.get("school_id"), doc.get("filename"), doc.get("timestamp"))
+
+def prepare_storage(collection):
+    """Creates and verifies the storage indexes, then upgrades legacy file documents."""
+    missing = ensure_storage_indexes(collection)
+    if missing:
+        print(f"Missing storage indexes: {missing}")
+    try:
+        backfill_file_metadata(collection)
+    except PyMongoError as e:
+        print(f"Could not backfill file metadata: {e}")
+
+@st.cache_resource
+def get_catalog_collection():
+    collection = get_mongo_collection()
+    return collection.database[FILE_CATALOG_COLLECTION_NAME]
+
+# Function to compute a content hash used to identify uploaded files
+def file_content_hash(file_bytes):
+    """Returns the SHA-256 hex digest of the given file bytes."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+# Uploaded files are stored in GridFS chunks; documents in the files collection only reference them
+FILE_BUCKET_NAME = "uploads"
+
+@st.cache_resource
+def get_file_bucket():
+    collection = get_mongo_collection()
+    return gridfs.GridFS(collection.database, collection=FILE_BUCKET_NAME)
+
+# Function to upload file to MongoDB (stored in GridFS)
+def upload_file_to_mongo(school_id, uploaded_file, kind=FILE_KIND_DATASET, file_hash=None):
+    """Stores the file once per (school, filename, content hash).
+
+    The content is streamed into GridFS, so files are not limited by the
+    16 MB document size. Re-uploading identical content only refreshes the
+    timestamp instead of storing another copy of the file. Datasets are
+    also recorded in the file catalog used by the history dropdown. Pass
+    file_hash when the caller has already hashed the content.
+    """
+    collection = get_mongo_collection()
+    try:
+        file_data = uploaded_file.getvalue()  # Bytes
+        file_hash = file_hash or file_content_hash(file_data)
+        timestamp = datetime.now()
+        file_key = {"school_id": school_id, "filename": uploaded_file.name, "file_hash": file_hash}
+        if collection.find_one(file_key, projection={"_id": 1}):
+            collection.update_one(file_key, {"$set": {"timestamp": timestamp}})
+        else:
+            store_new_file(collection, file_key, file_data, kind, timestamp)
+        # Only list the file in the history once it is actually stored
+        if kind == FILE_KIND_DATASET:
+            record_in_catalog(get_catalog_collection(), school_id, uploaded_file.name, timestamp)
+        return True
+    except PyMongoError as e:
+        st.error(f"Upload error: {e}")
+        return False
+
+def store_new_file(collection, file_key, file_data, kind, timestamp):
+    """Streams the content into GridFS and writes the file document referencing it."""
+    bucket = get_file_bucket()
+    file_id = bucket.put(
+        io.BytesIO(file_data),
+        filename=file_key["filename"],
+        metadata={"school_id": file_key["school_id"], "file_hash": file_key["file_hash"]}
+    )
+    try:
+        result = collection.update_one(
+            file_key,
+            {
+                "$setOnInsert": {"file_id": file_id, "kind": kind},  # Reference to the GridFS file, written only on first upload
+                "$set": {"timestamp": timestamp}
+            },
+            upsert=True
+        )
+    except PyMongoError:
+        bucket.delete(file_id)  # Don't leave an unreferenced GridFS file behind
+        raise
+    if result.upserted_id is None:
+        bucket.delete(file_id)  # Another session stored the same file first
+
+# Function to list user's files from MongoDB
+def list_user_files(school_id):
+    """Returns the latest upload time per dataset from the file catalog, newest first."""
+    catalog = get_catalog_collection()
+    try:
+        files = list(catalog.find(
+            {"school_id": school_id},
+            projection={"_id": 0, "filename": 1, "timestamp": 1}
+        ).sort("timestamp", -1))
+        return files  # List of dicts: [{'filename': 'file.csv', 'timestamp': datetime}]
+    except PyMongoError as e:
+        st.error(f"Error listing files: {e}")
+        return []
+
+# Function to download file from MongoDB by filename (latest if duplicates)
+def download_file_from_mongo(school_id, filename):
+    """Returns a readable stream over the latest upload of filename, or None."""
+    collection = get_mongo_collection()
+    try:
+        file_doc = collection.find_one({"school_id": school_id, "filename": filename}, sort=[("timestamp", -1)])
+        if file_doc:
+            if "file_id" in file_doc:
+                return get_file_bucket().get(file_doc["file_id"])  # Reads GridFS chunks on demand
+            return io.BytesIO(file_doc["file_data"])  # Files stored inline before the GridFS migration
+        else:
+            st.error("File not found.")
+            return None
+    except PyMongoError as e:
+        st.error(f"Download error: {e}")
+        return None
+
+def stored_file_info(school_id, filename):
+    """The file_hash and timestamp of the latest stored version of a file, or None."""
+    collection = get_mongo_collection()
+    try:
+        return collection.find_one(
+            {"school_id": school_id, "filename": filename},
+            projection={"_id": 0, "file_hash": 1, "timestamp": 1},
+            sort=[("timestamp", -1)]
+        )
+    except PyMongoError as e:
+        print(f"Could not look up {filename}: {e}")
+        return None
+
+def stored_file_version(school_id, filename):
+    """Content hash (or upload time for old files) of the latest stored version of a file, or None."""
+    file_doc = stored_file_info(school_id, filename)
+    if not file_doc:
+        return None
+    return file_doc.get("file_hash") or str(file_doc.get("timestamp"))
+
+def record_file_hash(school_id, filename, file_hash):
+    """
+    Stores the content hash on the latest version of a file uploaded before
+    files were hashed, so stored_file_version returns it from then on.
+    """
+    collection = get_mongo_collection()
+    try:
+        file_doc = collection.find_one(
+            {"school_id": school_id, "filename": filename},
+            projection={"file_hash": 1},
+            sort=[("timestamp", -1)]
+        )
+        if file_doc and not file_doc.get("file_hash"):
+            collection.update_one({"_id": file_doc["_id"]}, {"$set": {"file_hash": file_hash}})
+    except PyMongoError as e:
+        print(f"Could not record the hash of {filename}: {e}")
+
+# --- Processed Dataset Snapshots ---
+# Bump whenever the snapshot layout changes so older snapshots are ignored
+SNAPSHOT_FORMAT_VERSION = "3"
+
+@st.cache_resource
+def get_snapshot_collection():
+    """Snapshots live next to the uploaded files, keyed by source file hash and version."""
+    collection = get_mongo_collection()
+    return collection.database[SNAPSHOT_COLLECTION_NAME]
+
+def snapshot_key(file_hash):
+    return {
+        "file_hash": file_hash,
+        "rules_version": CLEANING_RULES_VERSION,
+        "format_version": SNAPSHOT_FORMAT_VERSION
+    }
+
+def snapshot_columns(df_cleaned, column_index):
+    """
+    Columns the pages read back from a snapshot: every indexed question and
+    demographic, the derived scores and any other numeric column (used by the
+    summary table). Free-text columns nothing reads are left on disk.
+    """
+    indexed = {col for section in column_index.values() for cols in section.values() for col in cols}
+    indexed |= set(DERIVED_SCORE_COLUMNS) | {"BelongingCount"}
+    return [
+        col for col in df_cleaned.columns
+        if col in indexed or pd.api.types.is_numeric_dtype(df_cleaned[col])
+    ]
+
+def frame_to_parquet(df):
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+def frame_from_parquet(data, columns=None):
+    df = pd.read_parquet(io.BytesIO(data), columns=columns)
+    # Parquet hands missing text back as None; the pages expect NaN as produced by read_csv
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].where(df[col].notna(), np.nan)
+    return df
+
+def save_processed_snapshot(file_hash, results):
+    """
+    Persists the compact cleaned frame as a Parquet file in GridFS (a frame can
+    outgrow the 16 MB document limit), and the preview, the aggregate cube and
+    the metrics in the snapshot document. Returns False when the snapshot could
+    not be written; the app then simply reprocesses the raw file next time.
+    """
+    collection = get_snapshot_collection()
+    bucket = get_file_bucket()
+    frame_id = None
+    try:
+        if collection.find_one(snapshot_key(file_hash), projection={"_id": 1}):
+            return True
+        aggregate_cube = {
+            label: frame_to_parquet(totals.reset_index()) for label, totals in results["aggregate_cube"].items()
+        }
+        frame_id = bucket.put(
+            frame_to_parquet(results["df_cleaned"]),
+            filename=f"snapshot_{file_hash}.parquet",
+            metadata={"kind": "snapshot", "file_hash": file_hash}
+        )
+        document = dict(snapshot_key(file_hash))
+        document.update({
+            "frame_id": frame_id,  # Reference to the Parquet frame in GridFS
+            "preview": frame_to_parquet(results["preview_table"]),
+            "columns": snapshot_columns(results["df_cleaned"], results["column_index"]),
+            "matched_questions": results["matched_questions"],
+            "column_index": results["column_index"],
+            "overall_belonging_score": results["overall_belonging_score"],
+            "category_averages": results["category_averages"],
+            "highest_area": results["highest_area"],
+            "lowest_area": results["lowest_area"],
+            "aggregate_cube": aggregate_cube,
+            "memory_usage": results["memory_usage"],
+            "timestamp": datetime.now()
+        })
+        result = collection.update_one(snapshot_key(file_hash), {"$setOnInsert": document}, upsert=True)
+        if result.upserted_id is None:
+            bucket.delete(frame_id)  # Another session stored the same snapshot first
+        return True
+    except Exception as e:  # A snapshot is only a shortcut, never block processing on it
+        print(f"Snapshot for {file_hash} not saved: {e!r}")
+        if frame_id is not None:
+            try:
+                bucket.delete(frame_id)  # Don't leave an unreferenced frame behind
+            except PyMongoError as delete_error:
+                print(f"Could not remove snapshot frame {frame_id}: {delete_error!r}")
+        return False
+
+def load_processed_snapshot(file_hash):
+    """
+    Rebuilds the processing results from a stored snapshot, reading only the
+    projected columns of the cleaned frame from GridFS. Returns None when there is no
+    snapshot for this file hash and version.
+    """
+    collection = get_snapshot_collection()
+    try:
+        doc = collection.find_one(snapshot_key(file_hash))
+        if not doc:
+            return None
+        frame = get_file_bucket().get(doc["frame_id"]).read()
+        df_cleaned = frame_from_parquet(frame, columns=doc["columns"])
+        preview_table = frame_from_parquet(doc["preview"])
+        # The first two columns are the (question, group) index of each cube frame
+        aggregate_cube = {}
+        for label, data in doc["aggregate_cube"].items():
+            totals = pd.read_parquet(io.BytesIO(data))
+            aggregate_cube[label] = totals.set_index(list(totals.columns[:2]))
+    except Exception as e:
+        print(f"Snapshot not loaded: {e}")
+        return None
+
+    matched_questions = doc["matched_questions"]
+    return {
+        'df_cleaned': df_cleaned,
+        'preview_table': preview_table,
+        'matched_questions': matched_questions,
+        'demographic_keywords' : CLEANING_KEYWORDS["normalize"],
+        'column_index': doc["column_index"],
+        'belonging_questions': BELONGING_QUESTIONS,
+        'overall_belonging_score': doc["overall_belonging_score"],
+        'category_averages': doc["category_averages"],
+        'highest_area': doc["highest_area"],
+        'lowest_area': doc["lowest_area"],
+        'group_belonging_scores': group_belonging_scores_from_cube(aggregate_cube),
+        'aggregate_cube': aggregate_cube,
+        'matched_questions_table': pd.DataFrame.from_dict(matched_questions, orient="index").T.fillna(""),
+        'memory_usage': doc["memory_usage"]
+    }
@@ -0,0 +1,264 @@
+"""Page chrome shared by every page: navigation, theme CSS and the logo header."""
+import streamlit as st
+
+from services.assets import APNAPAN_LOGO_PATH, load_static_asset
+
+# Page name -> script, registered with st.navigation in app.py
+PAGES = {
+    "login": "app_pages/login.py",
+    "create_account": "app_pages/create_account.py",
+    "forgot_password": "app_pages/forgot_password.py",
+    "landing": "app_pages/landing.py",
+    "main": "app_pages/main.py",
+    "metrics": "app_pages/metrics.py",
+    "visualisations": "app_pages/visualisations.py",
+    "data_table": "app_pages/data_table.py",
+    "customise": "app_pages/customise.py",
+}
+# Pages reachable without logging in
+PUBLIC_PAGES = ["login", "create_account", "forgot_password"]
+
+def navigate_to(page):
+    """Switches to another page. Like st.rerun, this ends the current script run."""
+    st.switch_page(PAGES[page])
+
+# Custom CSS for consistent theme and centering
+BASE_STYLES = """
+    <style>
+        .stApp {
+            background-color: #d6ecf9;
+            font-family: 'Segoe UI', sans-serif;
+            color: black !important;
+        }
+        h1, h2, h3, h4 {
+            color: #003366 !important;
+        }
+        .stTextInput > div > div > input {
+            background-color: #ff6666 !important;
+            color: white !important;
+            border-radius: 20px !important;
+            padding: 12px !important;
+            border: none !important;
+            font-size: 16px !important;
+        }
+        .stTextInput > div > div > input::placeholder {
+            color: white !important;
+            opacity: 0.8 !important;
+        }
+        .forgot-link {
+            color: #ff6666 !important;
+            font-size: 14px;
+            text-decoration: none;
+        }
+        .pulse-text {
+            text-align: center;
+            font-size: 18px;
+            color: #ff6666;
+            margin-top: 20px;
+        }
+        .bubble {
+            background-color: #ff9999;
+            color: #003366;
+            border-radius: 50%;
+            width: 24px;
+            height: 24px;
+            display: inline-flex;
+            align-items: center;
+            justify-content: center;
+            font-weight: bold;
+            margin-left: 8px;
+        }
+        .stTextInput label, .stFileUploader label {
+            color: black !important;
+        }
+
+        button, .stDownloadButton button {{
+            background-color: #ff6666 !important;
+            color: white !important;
+            border-radius: 8px;
+
+
+            
+        }}
+
+        /* Style for the history download button to match other buttons */
+        .history-download-button .stDownloadButton button {
+            background-color: #ff6666 !important; /* Match other buttons */
+            color: white !important;
+            font-weight: bold !important;
+            border: 1px solid #e05252 !important; /* Darker red border for consistency */
+            width: 100%; /* Make it full width to match other elements */
+        }
+        .history-download-button .stDownloadButton button:hover {
+            background-color: #e05252 !important; /* Darker red on hover */
+            border-color: #c44141 !important;
+        }
+
+        /* Ensure text inside all buttons is white */
+        div[data-testid="stForm"] button p,
+        div[data-testid="stButton"] > button p,
+        div[data-testid="stDownloadButton"] button p {
+            color: white !important;
+        }
+
+        /* Hover effect for all buttons */
+        div[data-testid="stForm"] button:hover,
+        div[data-testid="stButton"] > button:hover {
+            background-color: #333333 !important; /* Slightly lighter black on hover */
+        }
+    </style>
+"""
+
+# Global CSS for button styling to ensure compatibility with light and dark themes
+BUTTON_STYLES = """
+    <style>
+        /* General button styling for light and dark themes */
+        button, .stButton > button, .stDownloadButton > button {
+            background-color: #0a0504 !important; /* Primary button color */
+            color: white !important; /* Text color */
+            border-radius: 8px !important; /* Rounded corners */
+            border: none !important; /* Remove border */
+            font-weight: bold !important; /* Bold text */
+        }
+        button:hover, .stButton > button:hover, .stDownloadButton > button:hover {
+            background-color: #e05252 !important; /* Darker shade on hover */
+        }
+        button:focus, .stButton > button:focus, .stDownloadButton > button:focus {
+            outline: none !important; /* Remove focus outline */
+            box-shadow: 0 0 4px 2px rgba(255, 102, 102, 0.5) !important; /* Add focus shadow */
+        }
+        /* Ensure text inside all buttons is visible in both themes */
+        div[data-testid="stForm"] button p,
+        div[data-testid="stButton"] > button p,
+        div[data-testid="stDownloadButton"] button p {
+            color: white !important; /* Ensure text is white */
+        }
+    </style>
+"""
+
+# Styles for the pages behind the login
+CHECKBOX_STYLES = """
+    <style>
+    /* General fix for all checkbox labels */
+    .stCheckbox div[data-testid="stMarkdownContainer"] > p {
+        color: black !important;
+        font-weight: 500;
+    }
+    /* Extra fallback for some Streamlit versions */
+    .stCheckbox label {
+        color: black !important;
+    }
+    </style>
+"""
+
+LABEL_STYLES = """
+<style>
+    div[data-testid="stVerticalBlock"] label {
+        font-size: 14px;
+    }
+</style>
+"""
+
+THEME_STYLES = """
+    <style>
+        .stApp {
+            background-color: #d6ecf9;
+            font-family: 'Segoe UI', sans-serif;
+            color: black !important;
+        }
+        [data-testid="stSidebar"] > div:first-child {
+            background-color: #def2e3;
+            border-radius: 10px;
+            padding: 1rem;
+            color: black !important;
+        }
+        h1, h2, h3, h4 {
+            color: #003366 !important;
+        }
+        .stMetric label, .stMetric span {
+            color: #003366 !important;
+        }
+        .stFileUploader {
+            border: 2px dashed #3366cc;
+            padding: 10px;
+            background-color: #ffffff;
+            border-radius: 10px;
+            color: black;
+        }
+        .custom-logo {
+            display: flex;
+            align-items: center;
+            gap: 12px;
+            margin-top: -10px;
+            margin-bottom: 20px;
+        }
+        .custom-logo img {
+            height: 60px;
+        }
+        .custom-logo span {
+            font-size: 26px;
+            font-weight: bold;
+            color: #003366;
+        }
+        .block-container {
+            padding-top: 1.5rem;
+        }
+        .stAlert p, .stAlert div, .stAlert {
+            color: black !important;
+        }
+        .css-1cpxqw2, .css-ffhzg2 {
+            color: black !important;
+        }
+        label, .stCheckbox > div, .stRadio > div, .stSelectbox > div,
+        .stMultiSelect > div, .css-16idsys, .css-1r6slb0, .css-1n76uvr {
+            color: black !important;
+        }
+"""
+
+def apply_base_styles():
+    st.markdown(BASE_STYLES, unsafe_allow_html=True)
+    st.markdown(BUTTON_STYLES, unsafe_allow_html=True)
+
+def apply_app_styles():
+    st.markdown(CHECKBOX_STYLES, unsafe_allow_html=True)
+    st.markdown(LABEL_STYLES, unsafe_allow_html=True)
+    st.markdown(THEME_STYLES, unsafe_allow_html=True)
+
+def render_page_header():
+    """Project Apnapan logo and name on the left, the logged-in school's logo and name on the right."""
+    # Logo is read and encoded once per server process
+    apnapan_logo = load_static_asset(APNAPAN_LOGO_PATH)
+    logo_data_uri = apnapan_logo["data_uri"] if apnapan_logo else ""
+
+    col1, col2 = st.columns([4, 4])  # Adjust column widths for alignment
+
+    with col1:
+        # Project Apnapan logo and name
+        st.markdown(f"""
+            <div class="custom-logo">
+                <img src="{logo_data_uri}" alt="Project Apnapan Logo" />
+                <span>Project Apnapan</span>
+            </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        # School logo and name
+        if 'logged_in_user' in st.session_state:
+            school_name = st.session_state.get('school_name')
+            school_logo_data_uri = st.session_state.get('school_logo_data_uri')
+
+            school_logo_html = ""
+            if school_logo_data_uri:
+                school_logo_html = f'<img src="{school_logo_data_uri}" alt="School Logo" style="height: 50px;" />'
+
+            school_name_html = ""
+            if school_name:
+                school_name_html = f'<h4 style="margin: 0; color: #003366 !important;">{school_name}</h4>'
+
+            if school_logo_html or school_name_html:
+                st.markdown(f"""
+                    <div style="display: flex; justify-content: flex-end; align-items: center; gap: 12px; padding-top: 10px;">
+                        {school_logo_html}
+                        {school_name_html}
+                    </div>
+                """, unsafe_allow_html=True)
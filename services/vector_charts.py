@@ -0,0 +1,177 @@
+"""
+ReportLab-native renderers for the report charts. They draw the same chart
+specs as services/charts.py, but as vector Drawings that the PDF embeds
+directly instead of 200-dpi PNGs: reports are much smaller and no figure
+has to be rasterised.
+"""
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.shapes import Drawing, Group, String
+from reportlab.lib import colors
+
+from services.charts import PLOTLY_COLORS, RESPONSE_LEVEL_COLORS
+
+# Drawing sizes in points, matching the matplotlib figure sizes
+PIE_SIZE = (216, 216)
+PIE_WITH_LEGEND_SIZE = (324, 216)
+BAR_SIZE = (432, 288)
+
+
+def _title(drawing, text, font_size):
+    drawing.add(String(drawing.width / 2, drawing.height - font_size - 4, text,
+                       fontName="Helvetica", fontSize=font_size, textAnchor="middle"))
+
+
+def _legend(drawing, x, y, items, title=None, font_size=7):
+    legend = Legend()
+    legend.x, legend.y = x, y
+    legend.alignment = "right"
+    legend.fontName = "Helvetica"
+    legend.fontSize = font_size
+    legend.boxAnchor = "w"
+    legend.columnMaximum = 12
+    legend.dx = legend.dy = 7
+    legend.deltay = font_size + 3
+    legend.colorNamePairs = items
+    drawing.add(legend)
+    if title:
+        # Legend has no title of its own; place one above the first entry
+        title_y = y + len(items) * legend.deltay / 2 + 6
+        drawing.add(String(x, title_y, title, fontName="Helvetica-Bold", fontSize=font_size))
+
+
+def _draw_pie(spec, font_size):
+    """Pie with labels on the slices for up to 4 categories and a legend beyond that."""
+    labels, sizes = spec["labels"], spec["sizes"]
+    show_labels_on_pie = len(labels) <= 4
+    width, height = PIE_SIZE if show_labels_on_pie else PIE_WITH_LEGEND_SIZE
+    drawing = Drawing(width, height)
+    _title(drawing, spec["title"], 10)
+
+    total = float(sum(sizes)) or 1.0
+    # Only show percentage for slices > 1%
+    percents = [f"{size / total * 100:.1f}%" if size / total * 100 > 1 else "" for size in sizes]
+    slice_colors = [colors.HexColor(PLOTLY_COLORS[i % len(PLOTLY_COLORS)]) for i in range(len(labels))]
+
+    pie = Pie()
+    diameter = min(height - 60, 150)
+    pie.x = (PIE_SIZE[0] - diameter) / 2
+    pie.y = (height - 20 - diameter) / 2
+    pie.width = pie.height = diameter
+    pie.data = sizes
+    pie.startAngle = 90
+    pie.direction = "anticlockwise"
+    pie.slices.strokeColor = colors.white
+    pie.slices.strokeWidth = 0.5
+    pie.slices.fontName = "Helvetica"
+    pie.slices.fontSize = font_size
+    for i, color in enumerate(slice_colors):
+        pie.slices[i].fillColor = color
+    if show_labels_on_pie:
+        pie.labels = [f"{label} {pct}".strip() for label, pct in zip(labels, percents)]
+        pie.slices.labelRadius = 1.15
+    else:
+        pie.labels = percents
+        pie.slices.labelRadius = 0.75
+    drawing.add(pie)
+
+    if not show_labels_on_pie:
+        _legend(drawing, PIE_SIZE[0], height / 2, list(zip(slice_colors, labels)), title="Categories")
+    return drawing
+
+
+def _draw_summary_pie(spec):
+    return _draw_pie(spec, font_size=7)
+
+
+def _draw_demographic_pie(spec):
+    return _draw_pie(spec, font_size=8)
+
+
+def _bar_axes(drawing, chart, xlabel, ylabel):
+    chart.x, chart.y = 50, 60
+    chart.width, chart.height = drawing.width - 70, drawing.height - 100
+    chart.valueAxis.labels.fontName = chart.categoryAxis.labels.fontName = "Helvetica"
+    chart.valueAxis.labels.fontSize = chart.categoryAxis.labels.fontSize = 8
+    chart.valueAxis.valueMin = 0
+    drawing.add(String(chart.x + chart.width / 2, 8, xlabel, fontName="Helvetica", fontSize=10, textAnchor="middle"))
+    # Rotated a quarter turn, reading bottom to top like the matplotlib axis label
+    drawing.add(Group(String(0, 0, ylabel, fontName="Helvetica", fontSize=10, textAnchor="middle"),
+                      transform=(0, 1, -1, 0, 14, chart.y + chart.height / 2)))
+
+
+def _rotate_category_labels(chart, n_groups):
+    if n_groups > 3:
+        chart.categoryAxis.labels.angle = 45
+        chart.categoryAxis.labels.boxAnchor = "e"
+        chart.categoryAxis.labels.dy = -6
+
+
+def _draw_bar(spec):
+    """Average construct score per group, labelled with the score and group size."""
+    groups, averages, counts = spec["groups"], spec["averages"], spec["counts"]
+    drawing = Drawing(*BAR_SIZE)
+    _title(drawing, spec["title"], 11)
+
+    chart = VerticalBarChart()
+    chart.data = [averages]
+    chart.categoryAxis.categoryNames = [str(group) for group in groups]
+    _bar_axes(drawing, chart, spec["xlabel"], "Average Score")
+    chart.valueAxis.valueMax = max(averages) + 0.5
+    chart.bars.strokeColor = None
+    bar_colors = PLOTLY_COLORS[:5]
+    for i in range(len(groups)):
+        chart.bars[(0, i)].fillColor = colors.HexColor(bar_colors[i % len(bar_colors)])
+    chart.barLabelFormat = "values"  # Labels come from barLabelArray
+    chart.barLabelArray = [[f"{avg:.2f} (N={count})" for avg, count in zip(averages, counts)]]
+    chart.barLabels.fontName = "Helvetica-Bold"
+    chart.barLabels.fontSize = 7
+    chart.barLabels.nudge = 6
+    _rotate_category_labels(chart, len(groups))
+    drawing.add(chart)
+    return drawing
+
+
+def _draw_stacked_percentages(spec):
+    """Agree/Neutral/Disagree percentages per group as stacked bars."""
+    groups, levels = spec["groups"], spec["levels"]
+    drawing = Drawing(*BAR_SIZE)
+    _title(drawing, spec["title"], 11)
+
+    chart = VerticalBarChart()
+    chart.categoryAxis.style = "stacked"
+    chart.data = [percents for _, percents in levels]
+    chart.categoryAxis.categoryNames = [str(group) for group in groups]
+    _bar_axes(drawing, chart, spec["xlabel"], "Percentage (%)")
+    chart.width -= 70  # Room for the legend
+    chart.valueAxis.valueMax = 100
+    chart.bars.strokeColor = None
+    for i, (response_level, _) in enumerate(levels):
+        chart.bars[i].fillColor = colors.HexColor(RESPONSE_LEVEL_COLORS[response_level])
+    # Only show labels for segments > 5%
+    chart.barLabelFormat = "values"
+    chart.barLabelArray = [[f"{value:.1f}%" if value > 5 else "" for value in percents] for _, percents in levels]
+    chart.barLabels.fontName = "Helvetica-Bold"
+    chart.barLabels.fontSize = 7
+    chart.barLabels.boxTarget = "mid"
+    _rotate_category_labels(chart, len(groups))
+    drawing.add(chart)
+
+    _legend(drawing, chart.x + chart.width + 10, chart.y + chart.height - 20,
+            [(colors.HexColor(RESPONSE_LEVEL_COLORS[level]), level) for level, _ in levels],
+            title="Response Level")
+    return drawing
+
+
+VECTOR_CHART_RENDERERS = {
+    "summary_pie": _draw_summary_pie,
+    "demographic_pie": _draw_demographic_pie,
+    "bar": _draw_bar,
+    "stacked_percentages": _draw_stacked_percentages,
+}
+
+
+def draw_vector_chart(spec):
+    """Draws one chart spec as a ReportLab Drawing."""
+    return VECTOR_CHART_RENDERERS[spec["kind"]](spec)
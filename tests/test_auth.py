@@ -0,0 +1,42 @@
+"""Tests for the account stores (run with `python -m pytest` from the repo root)."""
+from types import SimpleNamespace
+
+from services.auth import SheetsAccountStore
+
+
+class FakeWorksheet:
+    """The gspread worksheet methods the account store uses, over a list of rows."""
+
+    def __init__(self, rows):
+        self.rows = [list(row) for row in rows]
+
+    def get_all_values(self):
+        return [list(row) for row in self.rows]
+
+    def append_row(self, values):
+        self.rows.append(list(values))
+
+    def cell(self, row, col):
+        return SimpleNamespace(value=self.rows[row - 1][col - 1])
+
+    def update_cell(self, row, col, value):
+        self.rows[row - 1][col - 1] = value
+
+
+def test_update_field_follows_reordered_rows():
+    """A write after the sheet was re-sorted within the TTL lands on the school's new row."""
+    sheet = FakeWorksheet([
+        ["School ID", "Password", "Salt", "Email"],
+        ["A", "hash-a", "salt-a", "a@example.org"],
+        ["B", "hash-b", "salt-b", "b@example.org"],
+    ])
+    store = SheetsAccountStore(lambda: sheet)
+    assert store.get("A")["password_hash"] == "hash-a"  # Loads the directory
+
+    sheet.rows[1], sheet.rows[2] = sheet.rows[2], sheet.rows[1]  # Edited directly in the sheet
+    store.update_field("A", "password_hash", "new-hash-a")
+
+    assert sheet.rows[1] == ["B", "hash-b", "salt-b", "b@example.org"]
+    assert sheet.rows[2] == ["A", "new-hash-a", "salt-a", "a@example.org"]
+    assert store.get("A")["password_hash"] == "new-hash-a"
+    assert store.get("B")["password_hash"] == "hash-b"
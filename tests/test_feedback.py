@@ -0,0 +1,50 @@
+"""Tests for the background feedback writer (run with `python -m pytest` from the repo root)."""
+import json
+import time
+
+from services import feedback
+from services.feedback import AsyncFeedbackWriter
+
+
+class FakeWorksheet:
+    def __init__(self):
+        self.rows = []
+
+    def append_rows(self, rows):
+        self.rows.extend(rows)
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_malformed_spool_lines_are_skipped(tmp_path):
+    """A line truncated by a crash mid-append does not stop the writer from starting."""
+    spool_path = tmp_path / "spool.jsonl"
+    spool_path.write_text(json.dumps(["a", "1"]) + "\n" + '["b", "2' + "\n" + json.dumps(["c", "3"]) + "\n")
+    sheet = FakeWorksheet()
+    writer = AsyncFeedbackWriter(lambda: sheet, spool_path=str(spool_path))
+
+    assert wait_for(lambda: writer.queue_depth() == 0)
+    assert sheet.rows == [["a", "1"], ["c", "3"]]
+
+
+def test_writer_survives_spool_rewrite_errors(tmp_path, monkeypatch):
+    """An OSError while rewriting the spool after a send leaves the writer thread running."""
+    sheet = FakeWorksheet()
+    writer = AsyncFeedbackWriter(lambda: sheet, spool_path=str(tmp_path / "spool.jsonl"))
+
+    def replace_fails(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(feedback.os, "replace", replace_fails)
+
+    writer.submit(["first"])
+    assert wait_for(lambda: sheet.rows == [["first"]])
+    monkeypatch.undo()
+    writer.submit(["second"])
+    assert wait_for(lambda: sheet.rows == [["first"], ["second"]])
+    assert wait_for(lambda: writer.queue_depth() == 0)
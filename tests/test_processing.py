@@ -0,0 +1,26 @@
+"""Regression tests for the processing pipeline (run with `python -m pytest` from the repo root)."""
+import numpy as np
+import pandas as pd
+
+from services.cohorts import build_cohort_index, cohort_crosstab_cube, cohort_mask, cohort_metrics
+from services.processing import build_crosstab_cube, process_data_and_calculate_metrics
+
+
+def test_demographics_without_construct_questions():
+    """A file with a demographic column but no matched questions still processes, with empty aggregates."""
+    results = process_data_and_calculate_metrics(pd.DataFrame({'Gender': ['M', 'F'], 'x': [1, 2]}))
+
+    assert results['overall_belonging_score'] is None
+    assert all(value == 0 for value in results['category_averages'].values())
+    assert results['aggregate_cube'] == {}
+    assert results['group_belonging_scores'] == {}
+    assert build_crosstab_cube(results['df_cleaned'], results['column_index'], results['matched_questions']) == {}
+
+    cohort_index = build_cohort_index(results['df_cleaned'], results['column_index'], results['matched_questions'])
+    mask = cohort_mask(cohort_index, {'Gender': ['F']})
+    assert mask.tolist() == [False, True]
+    cohort = cohort_metrics(cohort_index, mask, results['matched_questions'], results['column_index'])
+    assert cohort['n_students'] == 1
+    assert cohort['overall_belonging_score'] is None
+    assert cohort['aggregate_cube'] == {}
+    assert cohort_crosstab_cube(cohort_index, np.ones(2, dtype=bool), 'Gender', 'Grade', results['column_index']) == {}